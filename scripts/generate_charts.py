@@ -4,15 +4,35 @@ import argparse
 from pathlib import Path
 
 from time_copilot_demo.charts import generate_chart_pack
+from time_copilot_demo.profiling import maybe_profile
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate executive and analytical benchmark chart packs.")
     parser.add_argument("--artifacts-dir", default="artifacts/dual_market", help="Benchmark artifact directory.")
     parser.add_argument("--output-dir", default="reports/charts", help="Chart output directory.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for rendering (default: one per changed chart, up to the core count).",
+    )
+    parser.add_argument("--force", action="store_true", help="Redraw every chart even if its inputs are unchanged.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write per-stage cProfile stats and collapsed stacks to <artifacts-dir>/profile/generate_charts.",
+    )
     args = parser.parse_args()
 
-    generate_chart_pack(artifacts_dir=Path(args.artifacts_dir), output_dir=Path(args.output_dir))
+    with maybe_profile(Path(args.artifacts_dir) / "profile" / "generate_charts", enabled=args.profile):
+        drawn = generate_chart_pack(
+            artifacts_dir=Path(args.artifacts_dir),
+            output_dir=Path(args.output_dir),
+            max_workers=args.jobs,
+            force=args.force,
+        )
+    print(f"Drew {len(drawn)} chart(s): {', '.join(drawn) or 'all up to date'}")
 
 
 if __name__ == "__main__":
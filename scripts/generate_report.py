@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
+from time_copilot_demo.profiling import maybe_profile
 from time_copilot_demo.reporting import write_dual_market_report
 
 
@@ -10,9 +11,15 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Generate dual-market benchmark report.")
     parser.add_argument("--artifacts-dir", default="artifacts/dual_market", help="Directory with benchmark artifacts.")
     parser.add_argument("--output", default="reports/dual_market_benchmark.md", help="Output report path.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write per-stage cProfile stats and collapsed stacks to <artifacts-dir>/profile/generate_report.",
+    )
     args = parser.parse_args()
 
-    write_dual_market_report(Path(args.artifacts_dir), Path(args.output))
+    with maybe_profile(Path(args.artifacts_dir) / "profile" / "generate_report", enabled=args.profile):
+        write_dual_market_report(Path(args.artifacts_dir), Path(args.output))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from time_copilot_demo.serving import ServiceClient
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test a running serve_forecasts.py service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Service address.")
+    parser.add_argument("--port", type=int, default=8765, help="Service TCP port.")
+    parser.add_argument("--unix-socket", default=None, help="Connect to this Unix socket instead of TCP.")
+    parser.add_argument("--markets", default="PJM,NP", help="Markets to spread requests over.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent keep-alive connections.")
+    parser.add_argument("--requests", type=int, default=10_000, help="Total forecast requests.")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_load_test(args)), indent=2))
+
+
+async def _load_test(args: argparse.Namespace) -> dict[str, object]:
+    markets = [m.strip() for m in args.markets.split(",") if m.strip()]
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    remaining = iter(range(args.requests))
+
+    async def client_loop(i: int) -> None:
+        client = await ServiceClient.connect(args.host, args.port, unix_socket=args.unix_socket)
+        try:
+            for n in remaining:
+                market = markets[(i + n) % len(markets)]
+                start = time.perf_counter()
+                status, _ = await client.request("GET", f"/forecast?market={market}")
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    client = await ServiceClient.connect(args.host, args.port, unix_socket=args.unix_socket)
+    try:
+        _, server_stats = await client.request("GET", "/stats")
+    finally:
+        await client.close()
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "statuses": statuses,
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "server": server_stats,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,17 @@ from pathlib import Path
 
 import pandas as pd
 
-from time_copilot_demo.data import load_epf_market
+from time_copilot_demo.data import ingest_price_csv, load_price_parquet, price_parquet_is_current
+from time_copilot_demo.feature_cache import FeatureCache
+from time_copilot_demo.job_queue import start_local_workers, stop_workers
+from time_copilot_demo.history import KEEP_PREDICTION_RUNS
 from time_copilot_demo.pipeline import run_dual_market_benchmark, synthetic_pjm_like
+from time_copilot_demo.profiling import maybe_profile, profile_span
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run dual-market benchmark pipeline.")
-    parser.add_argument("--markets", default="PJM,NP", help="Comma-separated markets (e.g. PJM,NP).")
+    parser.add_argument("--markets", default="PJM,NP", help="Comma-separated markets (e.g. PJM,NP,BE,FR,DE).")
     parser.add_argument(
         "--source",
         choices=["public", "synthetic", "csv"],
@@ -19,34 +23,190 @@ def main() -> None:
         help="Data source mode.",
     )
     parser.add_argument("--csv-path", default=None, help="CSV path for --source=csv (single-market mode).")
+    parser.add_argument(
+        "--csv-chunksize",
+        type=int,
+        default=None,
+        help="Stream --csv-path in chunks of this many rows into <data-dir>/csv_<market>.parquet.",
+    )
+    parser.add_argument("--csv-timestamp-format", default=None, help="Explicit strftime format of the timestamp column.")
+    parser.add_argument(
+        "--price-dtype",
+        choices=["float64", "float32"],
+        default="float64",
+        help="Price dtype for streamed CSV ingestion.",
+    )
     parser.add_argument("--data-dir", default="datasets", help="Cache directory for public datasets.")
     parser.add_argument("--artifacts-dir", default="artifacts/dual_market", help="Output directory.")
     parser.add_argument("--horizon", type=int, default=24, help="Forward horizon for rally target.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parallel model fits per market (1 = serial; BLAS/torch threads are split across jobs).",
+    )
+    parser.add_argument(
+        "--market-jobs",
+        type=int,
+        default=1,
+        help="Markets loaded and benchmarked concurrently; their model fits share one --jobs sized pool.",
+    )
+    parser.add_argument(
+        "--memory-limit-mb",
+        type=float,
+        default=None,
+        help="Cap on the estimated memory of markets benchmarked at once (with --market-jobs > 1).",
+    )
+    parser.add_argument(
+        "--backtest-folds",
+        type=int,
+        default=0,
+        help="Also run a walk-forward backtest with this many folds (0 = holdout only).",
+    )
+    parser.add_argument(
+        "--feature-cache-dir",
+        default=None,
+        help="Supervised-frame cache directory (default: <data-dir>/feature_cache).",
+    )
+    parser.add_argument("--feature-cache-max-mb", type=float, default=2048, help="Feature cache size before eviction.")
+    parser.add_argument("--no-feature-cache", action="store_true", help="Always rebuild features and labels.")
+    parser.add_argument(
+        "--no-model-store",
+        action="store_true",
+        help="Do not persist fitted models under <artifacts-dir>/<market>/models.",
+    )
+    parser.add_argument(
+        "--tune",
+        action="store_true",
+        help="Search hyperparameters for models without tuned values in <artifacts-dir>/<market>/tuned_params.json.",
+    )
+    parser.add_argument("--retune", action="store_true", help="Search hyperparameters again for every tunable model.")
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=2000,
+        help="Block-bootstrap resamples of the holdout for champion CIs and win probabilities (0 = off).",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Do not append this run to the run-history store under <artifacts-dir>/history.",
+    )
+    parser.add_argument(
+        "--keep-prediction-runs",
+        type=int,
+        default=KEEP_PREDICTION_RUNS,
+        help=(
+            "Keep predictions of only the last N runs in the history store (metrics of all runs stay; "
+            "0 keeps every run's predictions)."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse per-model checkpoints under <artifacts-dir>/<market>/checkpoints from an interrupted run.",
+    )
+    parser.add_argument(
+        "--job-queue",
+        default=None,
+        help="Enqueue all model jobs in the SQLite job queue under this directory for run_worker.py workers.",
+    )
+    parser.add_argument(
+        "--queue-workers",
+        type=int,
+        default=0,
+        help="With --job-queue, also start this many local workers for the run (0 = external workers only).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write per-stage cProfile stats and collapsed stacks to <artifacts-dir>/profile/run_benchmark.",
+    )
     args = parser.parse_args()
 
+    with maybe_profile(Path(args.artifacts_dir) / "profile" / "run_benchmark", enabled=args.profile):
+        _run(args)
+
+
+def _run(args: argparse.Namespace) -> None:
     markets = [m.strip() for m in args.markets.split(",") if m.strip()]
-    market_frames: dict[str, pd.DataFrame]
+    market_frames: dict[str, pd.DataFrame] | None
 
     if args.source == "public":
-        market_frames = {market: load_epf_market(market, data_dir=args.data_dir) for market in markets}
+        # Loaded inside the benchmark so downloads can overlap with fitting other markets.
+        market_frames = None
     elif args.source == "synthetic":
-        market_frames = {market: synthetic_pjm_like() for market in markets}
+        with profile_span("load.synthetic"):
+            market_frames = {market: synthetic_pjm_like() for market in markets}
     else:
         if not args.csv_path:
             raise ValueError("--csv-path is required when --source=csv")
         if len(markets) != 1:
             raise ValueError("--source=csv supports a single market name")
-        market_frames = {markets[0]: pd.read_csv(args.csv_path, parse_dates=["timestamp"])}
+        with profile_span(f"load.{markets[0]}"):
+            market_frames = _load_csv_market(args, markets[0])
+
+    feature_cache = None
+    if not args.no_feature_cache:
+        cache_dir = Path(args.feature_cache_dir or Path(args.data_dir) / "feature_cache")
+        feature_cache = FeatureCache(cache_dir, max_bytes=int(args.feature_cache_max_mb * 2**20))
 
+    workers = []
+    if args.job_queue and args.queue_workers > 0:
+        workers = start_local_workers(Path(args.job_queue), args.queue_workers)
+    try:
+        _benchmark(args, markets, market_frames, feature_cache)
+    finally:
+        stop_workers(workers)
+
+
+def _benchmark(
+    args: argparse.Namespace,
+    markets: list[str],
+    market_frames: dict[str, pd.DataFrame] | None,
+    feature_cache: FeatureCache | None,
+) -> None:
     run_dual_market_benchmark(
         market_frames=market_frames,
         artifacts_dir=Path(args.artifacts_dir),
         horizon=args.horizon,
         markets=markets,
         data_dir=args.data_dir,
+        max_workers=args.jobs,
+        market_workers=args.market_jobs,
+        memory_limit_mb=args.memory_limit_mb,
+        backtest_folds=args.backtest_folds,
+        feature_cache=feature_cache,
+        persist_models=not args.no_model_store,
+        tune=args.tune,
+        retune=args.retune,
+        bootstrap_resamples=args.bootstrap_resamples,
+        record_history=not args.no_history,
+        keep_prediction_runs=args.keep_prediction_runs or None,
+        resume=args.resume,
+        job_queue=Path(args.job_queue) if args.job_queue else None,
     )
 
 
+def _load_csv_market(args: argparse.Namespace, market: str) -> dict[str, pd.DataFrame]:
+    if not args.csv_chunksize:
+        return {market: pd.read_csv(args.csv_path, parse_dates=["timestamp"])}
+    csv_path = Path(args.csv_path)
+    parquet_path = Path(args.data_dir) / f"csv_{market}.parquet"
+    # Keyed on the CSV itself and the parsing options, not just on which file is newer.
+    if not price_parquet_is_current(
+        csv_path, parquet_path, timestamp_format=args.csv_timestamp_format, price_dtype=args.price_dtype
+    ):
+        ingest_price_csv(
+            csv_path,
+            parquet_path,
+            chunksize=args.csv_chunksize,
+            timestamp_format=args.csv_timestamp_format,
+            price_dtype=args.price_dtype,
+        )
+    return {market: load_price_parquet(parquet_path)}
+
+
 if __name__ == "__main__":
     main()
 
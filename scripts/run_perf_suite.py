@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from time_copilot_demo.perf import PERF_SIZES, compare_to_baseline, load_baseline, run_perf_suite, write_baseline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on scaled synthetic data.")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(PERF_SIZES),
+        help=f"Comma-separated data sizes to run ({', '.join(PERF_SIZES)}).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest run of each stage is kept.")
+    parser.add_argument("--forecast-models", default=None, help="Comma-separated forecast models (default: all).")
+    parser.add_argument("--rally-models", default=None, help="Comma-separated rally models (default: all).")
+    parser.add_argument("--output", default="reports/perf/latest.json", help="Where to write this run's timings.")
+    parser.add_argument("--baseline", default="perf/baseline.json", help="Baseline JSON to compare against.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed fractional slowdown or memory growth per stage before failing.",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite --baseline with this run.")
+    args = parser.parse_args()
+
+    sizes = {}
+    for size in (s.strip() for s in args.sizes.split(",") if s.strip()):
+        if size not in PERF_SIZES:
+            parser.error(f"unknown size {size!r}; choose from {', '.join(PERF_SIZES)}")
+        sizes[size] = PERF_SIZES[size]
+
+    baseline_path = Path(args.baseline)
+    # Checked before the (long) run: without a baseline nothing could be flagged, so that is a failure.
+    if not args.update_baseline and not baseline_path.exists():
+        sys.exit(f"No baseline at {baseline_path}; rerun with --update-baseline to create one.")
+
+    def split(value: str | None) -> list[str] | None:
+        return None if value is None else [v.strip() for v in value.split(",") if v.strip()]
+
+    def show(result) -> None:
+        print(
+            f"{result.size:>5} {result.stage:<32} {result.seconds:9.3f}s "
+            f"{result.peak_rss_mb:9.1f} MB peak {result.rss_growth_mb:+8.1f} MB",
+            flush=True,
+        )
+
+    current = run_perf_suite(
+        sizes,
+        repeat=args.repeat,
+        forecast_models=split(args.forecast_models),
+        rally_models=split(args.rally_models),
+        progress=show,
+    )
+    write_baseline(Path(args.output), current)
+
+    if args.update_baseline:
+        write_baseline(baseline_path, current)
+        print(f"Baseline written to {baseline_path}")
+        return
+
+    regressions = compare_to_baseline(current, load_baseline(baseline_path), tolerance=args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print(f"No stage regressed beyond {args.tolerance:.0%} of {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from time_copilot_demo.history import KEEP_PREDICTION_RUNS
+from time_copilot_demo.pipeline import run_incremental_benchmark
+from time_copilot_demo.profiling import maybe_profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run benchmark, report and charts as one stage graph, re-executing only changed stages."
+    )
+    parser.add_argument("--markets", default="PJM,NP", help="Comma-separated markets (e.g. PJM,NP,BE,FR,DE).")
+    parser.add_argument("--source", choices=["public", "synthetic"], default="public", help="Data source mode.")
+    parser.add_argument("--data-dir", default="datasets", help="Cache directory for public datasets.")
+    parser.add_argument("--artifacts-dir", default="artifacts/dual_market", help="Output directory.")
+    parser.add_argument("--report", default="reports/dual_market_benchmark.md", help="Output report path.")
+    parser.add_argument("--charts-dir", default="reports/charts", help="Chart output directory.")
+    parser.add_argument("--horizon", type=int, default=24, help="Forward horizon for rally target.")
+    parser.add_argument("--jobs", type=int, default=1, help="Stale stages of one depth run in this many processes.")
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=2000,
+        help="Block-bootstrap resamples of the holdout for champion CIs and win probabilities (0 = off).",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Do not append runs to the run-history store under <artifacts-dir>/history.",
+    )
+    parser.add_argument(
+        "--keep-prediction-runs",
+        type=int,
+        default=KEEP_PREDICTION_RUNS,
+        help=(
+            "Keep predictions of only the last N runs in the history store (metrics of all runs stay; "
+            "0 keeps every run's predictions)."
+        ),
+    )
+    parser.add_argument("--force", action="store_true", help="Re-execute every stage even if its inputs are unchanged.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write per-stage cProfile stats and collapsed stacks to <artifacts-dir>/profile/run_pipeline.",
+    )
+    args = parser.parse_args()
+
+    markets = [m.strip() for m in args.markets.split(",") if m.strip()]
+    with maybe_profile(Path(args.artifacts_dir) / "profile" / "run_pipeline", enabled=args.profile):
+        executed = run_incremental_benchmark(
+            artifacts_dir=Path(args.artifacts_dir),
+            report_path=Path(args.report),
+            charts_dir=Path(args.charts_dir),
+            markets=markets,
+            source=args.source,
+            data_dir=args.data_dir,
+            horizon=args.horizon,
+            bootstrap_resamples=args.bootstrap_resamples,
+            record_history=not args.no_history,
+            keep_prediction_runs=args.keep_prediction_runs or None,
+            max_workers=args.jobs,
+            force=args.force,
+        )
+    rerun = [name for name in executed if not name.startswith("load.")]
+    print(f"Executed {len(rerun)} stage(s): {', '.join(rerun) or 'all up to date'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from time_copilot_demo.job_queue import LEASE_SECONDS, start_local_workers, work
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run benchmark jobs from a job queue (see run_benchmark.py --job-queue) on this host."
+    )
+    parser.add_argument("--job-queue", required=True, help="Job-queue directory shared with run_benchmark.py.")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to run on this host.")
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=LEASE_SECONDS,
+        help="Lease length; a crashed worker's job is handed out again after this long.",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="Exit after this many seconds without a job to claim (default: keep polling).",
+    )
+    args = parser.parse_args()
+
+    options = {"lease_seconds": args.lease_seconds, "idle_timeout": args.idle_timeout}
+    if args.processes <= 1:
+        n_done = work(Path(args.job_queue), **options)
+        print(f"Ran {n_done} job(s)")
+        return
+    workers = start_local_workers(Path(args.job_queue), args.processes, **options)
+    for process in workers:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
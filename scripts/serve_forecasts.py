@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from time_copilot_demo.data import load_epf_market
+from time_copilot_demo.pipeline import synthetic_pjm_like
+from time_copilot_demo.serving import ForecastService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve champion forecasts and rally probabilities over HTTP.")
+    parser.add_argument("--markets", default="PJM,NP", help="Comma-separated markets (e.g. PJM,NP,BE,FR,DE).")
+    parser.add_argument("--source", choices=["public", "synthetic"], default="public", help="Price history source.")
+    parser.add_argument("--data-dir", default="datasets", help="Cache directory for public datasets.")
+    parser.add_argument(
+        "--artifacts-dir",
+        default="artifacts/dual_market",
+        help="Benchmark output directory (run_benchmark.py without --no-model-store).",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on.")
+    parser.add_argument("--unix-socket", default=None, help="Listen on this Unix socket path instead of TCP.")
+    parser.add_argument("--max-batch", type=int, default=64, help="Most requests scored in one predict call.")
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=2.0,
+        help="How long a batch waits for more concurrent requests after the first arrives.",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=1024,
+        help="Pending requests per market before new ones are rejected with 503.",
+    )
+    args = parser.parse_args()
+
+    markets = [m.strip() for m in args.markets.split(",") if m.strip()]
+    if args.source == "synthetic":
+        histories = {market: synthetic_pjm_like() for market in markets}
+    else:
+        histories = {market: load_epf_market(market, data_dir=args.data_dir) for market in markets}
+    service = ForecastService(
+        Path(args.artifacts_dir),
+        histories,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        queue_size=args.queue_size,
+    )
+    asyncio.run(_serve(service, args))
+
+
+async def _serve(service: ForecastService, args: argparse.Namespace) -> None:
+    server = await service.start(args.host, args.port, unix_socket=args.unix_socket)
+    print(f"Serving {', '.join(service.markets)} on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def _temp_path(path: Path) -> Path:
+    # Unique per process, thread and call: concurrent writers of one path never share a temp file.
+    # Dot-prefixed, so dataset scans (pyarrow skips hidden files) and ``*.parquet`` globs ignore it.
+    return path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}.tmp")
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """A fresh temp path to write ``path``'s content to; renamed over ``path`` when the block succeeds.
+
+    Readers see the old file or the new one, never a partial write, and of concurrent
+    writers of the same path the last rename wins. On error the temp file is removed.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_text(text, encoding="utf-8")
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from time_copilot_demo.contracts import TimeSplit, validate_time_split
+from time_copilot_demo.evaluate import (
+    FORECAST_METRICS,
+    RALLY_METRICS,
+    batch_classification_metrics,
+    batch_forecast_metrics,
+)
+from time_copilot_demo.model_registry import predict_task, rally_decision_threshold
+from time_copilot_demo.parallel import run_jobs
+from time_copilot_demo.shared_frame import shared_inputs
+
+
+@dataclass(frozen=True)
+class BacktestFold:
+    fold: int
+    split: TimeSplit
+    train: slice
+    test: slice
+
+
+def walk_forward_folds(
+    timestamps: pd.Series,
+    *,
+    n_folds: int = 5,
+    test_size: int | None = None,
+    gap: int = 24,
+    expanding: bool = True,
+    train_size: int | None = None,
+) -> list[BacktestFold]:
+    """Rolling-origin folds whose test windows tile the tail of the series.
+
+    ``gap`` rows between train and test purge targets that look into the test window;
+    they form the validation window of each fold's ``TimeSplit``. With
+    ``expanding=False`` every fold trains on the latest ``train_size`` rows.
+    """
+    n = len(timestamps)
+    if n_folds < 1:
+        raise ValueError("n_folds must be at least 1")
+    if gap < 1:
+        raise ValueError("gap must be at least 1 row to keep train and test windows apart")
+    if test_size is None:
+        test_size = int(n * 0.2) // n_folds
+    first_test_start = n - n_folds * test_size
+    first_train_stop = first_test_start - gap
+    if test_size < 1 or first_train_stop < 1:
+        raise ValueError("not enough rows for the requested folds")
+    if train_size is None:
+        train_size = first_train_stop
+
+    ts = pd.to_datetime(timestamps).reset_index(drop=True)
+    folds: list[BacktestFold] = []
+    for fold in range(n_folds):
+        test_start = first_test_start + fold * test_size
+        train_stop = test_start - gap
+        train_start = 0 if expanding else max(0, train_stop - train_size)
+        split = TimeSplit(
+            train_end=ts.iloc[train_stop - 1],
+            val_start=ts.iloc[train_stop],
+            val_end=ts.iloc[test_start - 1],
+            test_start=ts.iloc[test_start],
+        )
+        validate_time_split(split)
+        folds.append(
+            BacktestFold(
+                fold=fold,
+                split=split,
+                train=slice(train_start, train_stop),
+                test=slice(test_start, test_start + test_size),
+            )
+        )
+    return folds
+
+
+def aggregate_folds(fold_table: pd.DataFrame, metrics: tuple[str, ...]) -> pd.DataFrame:
+    """Mean metrics per model (same column names as the holdout tables) plus ``<metric>_std``."""
+    grouped = fold_table.groupby("model", sort=False)[list(metrics)]
+    table = grouped.mean()
+    table = table.join(grouped.std(ddof=0).add_suffix("_std"))
+    table["n_folds"] = fold_table.groupby("model", sort=False)["fold"].nunique()
+    return table.reset_index()
+
+
+def run_backtest(
+    frame: pd.DataFrame,
+    feature_cols: list[str],
+    folds: list[BacktestFold],
+    *,
+    forecast_models: list[str],
+    rally_models: list[str],
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+    params: dict[str, dict[str, dict[str, Any]]] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Evaluate every model on every fold of one shared supervised frame.
+
+    Folds are positional slices of ``frame``, so features are never rebuilt. ``params``
+    optionally overrides hyperparameters per task and model (e.g. tuned values).
+    """
+    params = params or {}
+    X = frame[feature_cols]
+    y = {"forecast": frame["target_price"], "rally": frame["target_rally"]}
+    specs = [(fold, "forecast", name) for fold in folds for name in forecast_models]
+    specs += [(fold, "rally", name) for fold in folds for name in rally_models]
+    with shared_inputs(
+        frame,
+        {"X": feature_cols, "forecast": "target_price", "rally": "target_rally"},
+        max_workers=max_workers,
+        executor=executor,
+    ) as inputs:
+        jobs = [
+            (
+                task,
+                name,
+                inputs["X"].iloc[fold.train],
+                inputs[task].iloc[fold.train],
+                inputs["X"].iloc[fold.test],
+                params.get(task, {}).get(name),
+            )
+            for fold, task, name in specs
+        ]
+        outputs = run_jobs(predict_task, jobs, max_workers=max_workers, executor=executor)
+
+    # Score each (fold, task) block of models with one batched metric call.
+    rows: dict[str, list[dict[str, float | str]]] = {"forecast": [], "rally": []}
+    preds = iter(outputs)
+    for task, names in (("forecast", forecast_models), ("rally", rally_models)):
+        for fold in folds:
+            if not names:
+                continue
+            y_test = y[task].iloc[fold.test]
+            matrix = np.vstack([next(preds) for _ in names])
+            if task == "forecast":
+                metrics = batch_forecast_metrics(y_test, matrix)
+            else:
+                y_train = y[task].iloc[fold.train]
+                thresholds = [rally_decision_threshold(name, y_train) for name in names]
+                metrics = batch_classification_metrics(y_test, matrix, threshold=thresholds)
+            for i, name in enumerate(names):
+                rows[task].append(
+                    {
+                        "fold": fold.fold,
+                        "train_end": fold.split.train_end,
+                        "test_start": fold.split.test_start,
+                        "model": name,
+                        **{metric: float(values[i]) for metric, values in metrics.items()},
+                    }
+                )
+
+    forecast_folds = pd.DataFrame(rows["forecast"])
+    rally_folds = pd.DataFrame(rows["rally"])
+    forecast_table = aggregate_folds(forecast_folds, FORECAST_METRICS)
+    rally_table = aggregate_folds(rally_folds, RALLY_METRICS)
+    return {
+        "forecast_folds": forecast_folds,
+        "forecast": forecast_table.sort_values(["smape", "mae"], ascending=[True, True]).reset_index(drop=True),
+        "rally_folds": rally_folds,
+        "rally": rally_table.sort_values(["pr_auc", "brier"], ascending=[False, True]).reset_index(drop=True),
+    }
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import math
+import warnings
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from time_copilot_demo.evaluate import FORECAST_METRICS
+
+BOOTSTRAP_RALLY_METRICS = ("pr_auc", "roc_auc", "brier")
+# Blocks keep at least one day of hourly rows so resamples preserve the daily price cycle.
+MIN_BLOCK_LENGTH = 24
+# Upper bound on elements per intermediate array; resamples are processed in chunks under it.
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def default_block_length(n_rows: int) -> int:
+    """Rule-of-thumb ``n ** (1/3)`` block length, at least one day and at most the window."""
+    return max(1, min(n_rows, max(MIN_BLOCK_LENGTH, round(n_rows ** (1 / 3)))))
+
+
+def moving_block_starts(n_rows: int, n_resamples: int, block_length: int, seed: int = 7) -> np.ndarray:
+    """(resamples × blocks) start rows of a moving-block bootstrap of an ``n_rows`` window.
+
+    Each resample concatenates ``ceil(n_rows / block_length)`` blocks of consecutive rows
+    drawn uniformly from the window, so autocorrelation inside a block is preserved.
+    """
+    if not 1 <= block_length <= n_rows:
+        raise ValueError(f"block_length must be in [1, {n_rows}], got {block_length}")
+    n_blocks = math.ceil(n_rows / block_length)
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, n_rows - block_length + 1, size=(n_resamples, n_blocks), dtype=np.int64)
+
+
+def _row_weights(starts: np.ndarray, n_rows: int, block_length: int) -> np.ndarray:
+    """How often each row appears in each resample, as a (resamples × rows) int32 matrix."""
+    n_resamples = len(starts)
+    offsets = (np.arange(n_resamples) * (n_rows + 1))[:, None]
+    size = n_resamples * (n_rows + 1)
+    # Difference array: +1 where a block starts, -1 one past its end, then a running sum.
+    edges = np.bincount((starts + offsets).ravel(), minlength=size)
+    edges -= np.bincount((starts + block_length + offsets).ravel(), minlength=size)
+    return np.cumsum(edges.reshape(n_resamples, n_rows + 1)[:, :n_rows], axis=1, dtype=np.int32)
+
+
+def _start_counts(starts: np.ndarray, n_starts: int) -> np.ndarray:
+    """How often each block start is drawn in each resample, as a (resamples × starts) matrix."""
+    offsets = (np.arange(len(starts)) * n_starts)[:, None]
+    counts = np.bincount((starts + offsets).ravel(), minlength=len(starts) * n_starts)
+    return counts.reshape(len(starts), n_starts).astype(float)
+
+
+def _window_sums(values: np.ndarray, block_length: int) -> np.ndarray:
+    """Sum of each row of ``values`` over every block, as (rows × block starts)."""
+    prefix = np.zeros((len(values), values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=prefix[:, 1:])
+    return prefix[:, block_length:] - prefix[:, :-block_length]
+
+
+def _chunks(n_resamples: int, elements_per_resample: int) -> list[slice]:
+    step = max(1, _CHUNK_ELEMENTS // max(1, elements_per_resample))
+    return [slice(start, min(start + step, n_resamples)) for start in range(0, n_resamples, step)]
+
+
+def bootstrap_forecast_metrics(
+    y_true: ArrayLike, y_pred: ArrayLike, starts: np.ndarray, block_length: int
+) -> dict[str, np.ndarray]:
+    """MAE, RMSE and sMAPE of every model on every resample, each shaped (models × resamples).
+
+    The metrics are means of per-row losses, so a resample's value is its block-start counts
+    times each block's summed losses: one matrix product per chunk scores every model.
+    """
+    y = np.asarray(y_true, dtype=float)
+    pred = np.atleast_2d(np.asarray(y_pred, dtype=float))
+    error = y - pred
+    denom = np.maximum(np.abs(y) + np.abs(pred), 1e-8)
+    losses = _window_sums(np.vstack([np.abs(error), error**2, 2.0 * np.abs(error) / denom * 100.0]), block_length)
+    resample_rows = starts.shape[1] * block_length
+
+    means = np.empty((len(losses), len(starts)))
+    for chunk in _chunks(len(starts), losses.shape[1]):
+        means[:, chunk] = losses @ _start_counts(starts[chunk], losses.shape[1]).T / resample_rows
+    mae, mse, smape = np.split(means, 3)
+    return {"mae": mae, "rmse": np.sqrt(mse), "smape": smape}
+
+
+def bootstrap_classification_metrics(
+    y_true: ArrayLike, y_prob: ArrayLike, starts: np.ndarray, block_length: int
+) -> dict[str, np.ndarray]:
+    """PR-AUC, ROC-AUC and Brier of every model on every resample, each (models × resamples).
+
+    Every model column is sorted once. A resample only changes row weights, and the ranking
+    metrics need the resampled running counts just at each positive's tie group, so each
+    model's sorted rows are cut into segments at those groups and one sparse product sums
+    the weights of every segment of every model for a chunk of resamples. Ties are grouped
+    as in ``evaluate.batch_classification_metrics``; resamples drawing a single class get
+    NaN ranking metrics.
+    """
+    from scipy import sparse
+
+    y = np.asarray(y_true, dtype=float)
+    prob = np.atleast_2d(np.asarray(y_prob, dtype=float))
+    n_models, n_rows = prob.shape
+    resample_rows = starts.shape[1] * block_length
+
+    order = np.argsort(-prob, axis=1, kind="stable")
+    scores = np.take_along_axis(prob, order, axis=1)
+    is_positive = y[order] == 1
+    n_positive_rows = int(is_positive[0].sum()) if n_models else 0
+    position = np.arange(n_rows)
+    group_end = np.empty((n_models, n_rows), dtype=bool)
+    group_end[:, :-1] = scores[:, :-1] != scores[:, 1:]
+    group_end[:, -1] = True
+    end_index = np.minimum.accumulate(np.where(group_end, position, n_rows)[:, ::-1], axis=1)[:, ::-1]
+    group_start = np.ones((n_models, n_rows), dtype=bool)
+    group_start[:, 1:] = group_end[:, :-1]
+    start_index = np.maximum.accumulate(np.where(group_start, position, 0), axis=1)
+
+    # Per model: sorted positions of the positives, and the tie group around each.
+    pos_rank = np.argsort(~is_positive, axis=1, kind="stable")[:, :n_positive_rows]
+    pos_rows = np.take_along_axis(order, pos_rank, axis=1)
+    pos_start = np.take_along_axis(start_index, pos_rank, axis=1)
+    pos_end = np.take_along_axis(end_index, pos_rank, axis=1) + 1
+    # Cut each model's sorted rows where a positive's tie group starts or ends; a row's
+    # weight then lands in one segment per model, and running totals are segment prefixes.
+    segment_rows, segment_of_row, cut_before, cut_end, count_before, count_end = [], [], [], [], [], []
+    model_offset = np.zeros(n_models, dtype=np.int64)
+    n_segments = 0
+    for j in range(n_models):
+        model_offset[j] = n_segments
+        cuts = np.unique(np.concatenate([[0], pos_start[j], pos_end[j]]))
+        cuts = cuts[cuts < n_rows]
+        segment_of_rank = np.searchsorted(cuts, position, side="right") - 1
+        segment_rows.append(n_segments + segment_of_rank)
+        segment_of_row.append(order[j])
+        cut_before.append(n_segments + np.searchsorted(cuts, pos_start[j]))
+        cut_end.append(n_segments + np.searchsorted(cuts, pos_end[j]))
+        count_before.append(np.searchsorted(pos_rank[j], pos_start[j], side="left"))
+        count_end.append(np.searchsorted(pos_rank[j], pos_end[j], side="left"))
+        n_segments += len(cuts)
+    membership = sparse.csr_matrix(
+        (
+            np.ones(n_models * n_rows, dtype=np.float32),
+            (np.concatenate(segment_rows), np.concatenate(segment_of_row)),
+        ),
+        shape=(n_segments, n_rows),
+    )
+    shape = (n_models, n_positive_rows)
+    cut_before = np.asarray(cut_before).reshape(shape)
+    cut_end = np.asarray(cut_end).reshape(shape)
+    count_before = np.asarray(count_before).reshape(shape)
+    count_end = np.asarray(count_end).reshape(shape)
+
+    squared = _window_sums((prob - y) ** 2, block_length)
+    pr_auc = np.empty((n_models, len(starts)))
+    roc_auc = np.empty_like(pr_auc)
+    brier = np.empty_like(pr_auc)
+    for chunk in _chunks(len(starts), n_rows):
+        weights = _row_weights(starts[chunk], n_rows, block_length)
+        weights_t = np.ascontiguousarray(weights.T)
+        brier[:, chunk] = squared @ _start_counts(starts[chunk], squared.shape[1]).T / resample_rows
+        # Segment sums are integers below 2**24, exact in float32; prefixes use float64.
+        segments = (membership @ weights_t.astype(np.float32)).astype(float)
+        prefix = np.zeros((n_segments + 1, len(weights)))
+        np.cumsum(segments, axis=0, out=prefix[1:])
+        base = prefix[model_offset][:, None, :]
+        total_before = prefix[cut_before] - base
+        total_end = prefix[cut_end] - base
+
+        positive = np.moveaxis(weights[:, pos_rows], 0, -1).astype(float)
+        running = np.zeros((n_models, n_positive_rows + 1, len(weights)))
+        np.cumsum(positive, axis=1, out=running[:, 1:])
+        tps_before = np.take_along_axis(running, count_before[:, :, None], axis=1)
+        tps_end = np.take_along_axis(running, count_end[:, :, None], axis=1)
+
+        n_pos = running[:, -1]
+        n_neg = resample_rows - n_pos
+        neg_end = total_end - tps_end
+        neg_before = total_before - tps_before
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Average precision: each positive adds its threshold's precision, weighted 1/n_pos.
+            ap = (positive * tps_end / np.maximum(total_end, 1)).sum(axis=1) / n_pos
+            # ROC-AUC: each positive adds the negatives ranked below it, ties counting half.
+            below = n_neg[:, None] - neg_end + 0.5 * (neg_end - neg_before)
+            auc = (positive * below).sum(axis=1) / (n_pos * n_neg)
+        defined = (n_pos > 0) & (n_neg > 0)
+        pr_auc[:, chunk] = np.where(defined, ap, np.nan)
+        roc_auc[:, chunk] = np.where(defined, auc, np.nan)
+    return {"pr_auc": pr_auc, "roc_auc": roc_auc, "brier": brier}
+
+
+def summarize_bootstrap(
+    models: list[str],
+    samples: dict[str, np.ndarray],
+    *,
+    rank_metric: str,
+    higher_is_better: bool,
+    confidence: float = 0.95,
+) -> dict[str, dict[str, Any]]:
+    """Percentile intervals per model and metric, plus each model's win probability.
+
+    ``win_prob`` is the share of resamples (where ``rank_metric`` is defined for some model)
+    in which the model ranks first; ties go to the earlier model, as in the champion tables.
+    """
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    summary: dict[str, dict[str, Any]] = {name: {} for name in models}
+    for metric, values in samples.items():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows: single-class windows
+            bounds = np.nanpercentile(values, [tail, 100.0 - tail], axis=1)
+        for i, name in enumerate(models):
+            low, high = (float(bound) for bound in bounds[:, i])
+            summary[name][f"{metric}_ci"] = [None if math.isnan(low) else low, None if math.isnan(high) else high]
+
+    ranked = samples[rank_metric]
+    valid = ~np.isnan(ranked).all(axis=0)
+    if len(models) and valid.any():
+        filled = np.where(np.isnan(ranked[:, valid]), -np.inf if higher_is_better else np.inf, ranked[:, valid])
+        winners = filled.argmax(axis=0) if higher_is_better else filled.argmin(axis=0)
+        wins = np.bincount(winners, minlength=len(models)) / valid.sum()
+    else:
+        wins = np.full(len(models), np.nan)
+    for name, win in zip(models, wins):
+        summary[name]["win_prob"] = None if math.isnan(win) else float(win)
+    return summary
+
+
+def champion_bootstrap(
+    *,
+    y_forecast: ArrayLike,
+    forecast_preds: ArrayLike,
+    forecast_models: list[str],
+    y_rally: ArrayLike,
+    rally_probs: ArrayLike,
+    rally_models: list[str],
+    n_resamples: int,
+    block_length: int | None = None,
+    confidence: float = 0.95,
+    seed: int = 7,
+) -> dict[str, Any]:
+    """The ``champions.json`` ``bootstrap`` section for one market's holdout predictions.
+
+    Both tasks share one matrix of block starts, so forecast and rally metrics are paired
+    on the same resampled windows. Forecasts are ranked by sMAPE, rallies by PR-AUC.
+    """
+    n_rows = len(np.asarray(y_forecast))
+    block_length = block_length or default_block_length(n_rows)
+    starts = moving_block_starts(n_rows, n_resamples, block_length, seed=seed)
+    forecast = bootstrap_forecast_metrics(y_forecast, forecast_preds, starts, block_length)
+    rally = bootstrap_classification_metrics(y_rally, rally_probs, starts, block_length)
+    return {
+        "n_resamples": n_resamples,
+        "block_length": block_length,
+        "confidence": confidence,
+        "forecast": summarize_bootstrap(
+            forecast_models,
+            {metric: forecast[metric] for metric in FORECAST_METRICS},
+            rank_metric="smape",
+            higher_is_better=False,
+            confidence=confidence,
+        ),
+        "rally": summarize_bootstrap(
+            rally_models,
+            {metric: rally[metric] for metric in BOOTSTRAP_RALLY_METRICS},
+            rank_metric="pr_auc",
+            higher_is_better=True,
+            confidence=confidence,
+        ),
+    }
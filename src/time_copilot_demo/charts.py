@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
 
-import matplotlib
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import seaborn as sns
-from sklearn.calibration import calibration_curve
 
-matplotlib.use("Agg")
+from time_copilot_demo.atomic import atomic_write_text
+from time_copilot_demo.history import load_summary_tables
+from time_copilot_demo.parallel import cpu_count, run_jobs
+from time_copilot_demo.profiling import profile_span
+from time_copilot_demo.summaries import CALIBRATION_FILE, calibration_bins
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
 
 EXEC_FILES = [
     "01_champion_scorecard.png",
@@ -19,9 +27,25 @@ ANALYTICAL_FILES = [
     "04_forecast_efficiency.png",
     "05_rally_calibration.png",
 ]
+CHART_MANIFEST_FILE = "chart_manifest.json"
+# Bump when chart code or styling changes so every chart is redrawn once.
+CHART_CODE_VERSION = "1"
+
+
+@lru_cache(maxsize=None)
+def _plotting() -> tuple[Any, Any]:
+    """Import matplotlib (headless) and seaborn on first use; they dominate import time."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    return plt, sns
 
 
 def _style() -> None:
+    plt, sns = _plotting()
     sns.set_theme(style="whitegrid", context="talk")
     plt.rcParams.update(
         {
@@ -36,23 +60,23 @@ def _style() -> None:
     )
 
 
-def _load_market_tables(artifacts_dir: Path, market: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def _load_market_tables(artifacts_dir: Path, market: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     forecast = pd.read_csv(artifacts_dir / market / "forecast_benchmark.csv")
     rally = pd.read_csv(artifacts_dir / market / "rally_benchmark.csv")
-    preds = pd.read_parquet(artifacts_dir / market / "rally_predictions.parquet")
     forecast["market"] = market
     rally["market"] = market
-    preds["market"] = market
-    return forecast, rally, preds
+    return forecast, rally
 
 
 def _save(fig: plt.Figure, path: Path) -> None:
+    plt, _ = _plotting()
     fig.tight_layout()
     fig.savefig(path, bbox_inches="tight")
     plt.close(fig)
 
 
 def _chart_champion_scorecard(champion_summary: pd.DataFrame, output_dir: Path) -> None:
+    plt, sns = _plotting()
     forecast = champion_summary[champion_summary["task"] == "forecast"].copy()
     rally = champion_summary[champion_summary["task"] == "rally"].copy()
 
@@ -72,6 +96,7 @@ def _chart_champion_scorecard(champion_summary: pd.DataFrame, output_dir: Path)
 
 
 def _chart_forecast_smape(forecast_all: pd.DataFrame, output_dir: Path) -> None:
+    plt, sns = _plotting()
     order = (
         forecast_all.groupby("model", as_index=False)["smape"]
         .mean()
@@ -95,6 +120,7 @@ def _chart_forecast_smape(forecast_all: pd.DataFrame, output_dir: Path) -> None:
 
 
 def _chart_rally_prauc(rally_all: pd.DataFrame, output_dir: Path) -> None:
+    plt, sns = _plotting()
     order = (
         rally_all.groupby("model", as_index=False)["pr_auc"]
         .mean()
@@ -118,46 +144,72 @@ def _chart_rally_prauc(rally_all: pd.DataFrame, output_dir: Path) -> None:
     _save(fig, output_dir / "03_rally_prauc.png")
 
 
+def _pareto_frontier(points: pd.DataFrame, cost: str, error: str) -> pd.DataFrame:
+    """Rows not beaten on both ``cost`` and ``error`` by another row, ordered by cost."""
+    ranked = points.sort_values([cost, error])
+    return ranked[ranked[error] < ranked[error].cummin().shift(fill_value=float("inf"))]
+
+
 def _chart_forecast_efficiency(forecast_all: pd.DataFrame, output_dir: Path) -> None:
+    plt, sns = _plotting()
     fig, ax = plt.subplots(figsize=(10.5, 6))
+    if "fit_seconds" not in forecast_all.columns:
+        # Artifacts written before cost columns existed: fall back to an error-vs-error view.
+        sns.scatterplot(
+            data=forecast_all,
+            x="mae",
+            y="smape",
+            hue="model",
+            style="market",
+            size="rmse",
+            sizes=(80, 280),
+            palette="tab10",
+            ax=ax,
+        )
+        ax.set_title("Analytical View: Forecast Efficiency Frontier")
+        ax.set_xlabel("MAE (Lower Better)")
+        ax.set_ylabel("sMAPE (Lower Better)")
+        _save(fig, output_dir / "04_forecast_efficiency.png")
+        return
+
     sns.scatterplot(
         data=forecast_all,
-        x="mae",
+        x="fit_seconds",
         y="smape",
         hue="model",
         style="market",
-        size="rmse",
+        size="peak_mem_mb",
         sizes=(80, 280),
         palette="tab10",
         ax=ax,
     )
-    ax.set_title("Analytical View: Forecast Efficiency Frontier")
-    ax.set_xlabel("MAE (Lower Better)")
+    for _, points in forecast_all.groupby("market"):
+        frontier = _pareto_frontier(points, "fit_seconds", "smape")
+        ax.plot(frontier["fit_seconds"], frontier["smape"], linestyle="--", linewidth=1.2, color="#4a4a4a")
+    ax.set_xscale("log")
+    ax.set_title("Analytical View: Forecast Accuracy vs Retrain Cost")
+    ax.set_xlabel("Fit Time, seconds (log scale, Lower Better)")
     ax.set_ylabel("sMAPE (Lower Better)")
+    ax.legend(loc="upper left", bbox_to_anchor=(1.02, 1.0), frameon=True)
     _save(fig, output_dir / "04_forecast_efficiency.png")
 
 
-def _chart_rally_calibration(rally_preds_all: pd.DataFrame, rally_all: pd.DataFrame, output_dir: Path) -> None:
-    markets = sorted(rally_preds_all["market"].unique().tolist())
+def _chart_rally_calibration(calibration_all: pd.DataFrame, rally_all: pd.DataFrame, output_dir: Path) -> None:
+    plt, _ = _plotting()
+    markets = sorted(calibration_all["market"].unique().tolist())
     fig, axes = plt.subplots(1, len(markets), figsize=(13, 5), sharey=True)
     if len(markets) == 1:
         axes = [axes]
 
     for ax, market in zip(axes, markets):
-        pred_df = rally_preds_all[rally_preds_all["market"] == market]
+        bins = calibration_all[calibration_all["market"] == market]
         model_table = rally_all[rally_all["market"] == market].sort_values("pr_auc", ascending=False)
         models = model_table["model"].tolist()
         for model in models:
-            prob_col = f"{model}_prob"
-            if prob_col not in pred_df.columns:
+            curve = bins[bins["model"] == model]
+            if curve.empty:
                 continue
-            frac_pos, mean_pred = calibration_curve(
-                pred_df["y_true"].to_numpy(),
-                pred_df[prob_col].to_numpy(),
-                n_bins=10,
-                strategy="quantile",
-            )
-            ax.plot(mean_pred, frac_pos, marker="o", linewidth=2, label=model)
+            ax.plot(curve["mean_pred"], curve["frac_pos"], marker="o", linewidth=2, label=model)
         ax.plot([0, 1], [0, 1], linestyle="--", color="#4a4a4a", linewidth=1)
         ax.set_title(f"{market} Calibration")
         ax.set_xlabel("Predicted Probability")
@@ -170,6 +222,23 @@ def _chart_rally_calibration(rally_preds_all: pd.DataFrame, rally_all: pd.DataFr
     _save(fig, output_dir / "05_rally_calibration.png")
 
 
+def _load_calibration(artifacts_dir: Path, market: str) -> pd.DataFrame:
+    """Pre-binned calibration data; artifacts from before the summaries are binned here."""
+    path = artifacts_dir / market / CALIBRATION_FILE
+    if path.exists():
+        calibration = pd.read_csv(path)
+    else:
+        preds = pd.read_parquet(artifacts_dir / market / "rally_predictions.parquet")
+        models = [c[: -len("_prob")] for c in preds.columns if c.endswith("_prob")]
+        calibration = calibration_bins(preds["y_true"], preds[[f"{m}_prob" for m in models]].to_numpy().T, models)
+    return calibration.assign(market=market)
+
+
+def _calibration_input(artifacts_dir: Path, market: str) -> Path:
+    path = artifacts_dir / market / CALIBRATION_FILE
+    return path if path.exists() else artifacts_dir / market / "rally_predictions.parquet"
+
+
 def _write_chart_index(output_dir: Path) -> None:
     lines = [
         "# Benchmark Chart Pack",
@@ -190,29 +259,152 @@ def _write_chart_index(output_dir: Path) -> None:
     (output_dir / "README.md").write_text("\n".join(lines), encoding="utf-8")
 
 
-def generate_chart_pack(artifacts_dir: Path, output_dir: Path) -> None:
-    _style()
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _frame_digest(frame: pd.DataFrame, columns: list[str]) -> str:
+    columns = [c for c in columns if c in frame.columns]
+    digest = hashlib.sha256(json.dumps(columns).encode())
+    digest.update(pd.util.hash_pandas_object(frame[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+_FORECAST_EFFICIENCY_COLUMNS = ["market", "model", "smape", "mae", "rmse", "fit_seconds", "peak_mem_mb"]
+
+
+def _coarse_costs(frame: pd.DataFrame) -> pd.DataFrame:
+    # Fit time and memory differ a little on every run, even with identical results. The
+    # chart draws them on a log axis and as marker sizes, so they are fingerprinted in
+    # steps of 0.1 in log10 (about 26%) and run-to-run jitter does not trigger a redraw.
+    costs = [c for c in ("fit_seconds", "peak_mem_mb") if c in frame.columns]
+    return frame.assign(**{c: np.log10(frame[c].clip(lower=1e-3)).round(1) for c in costs})
+
+# Per chart: the values it plots, so a chart is redrawn only when those change. Charts
+# read only the benchmark CSVs; the calibration chart also digests each market's
+# calibration summary instead of loading it.
+_CHART_INPUTS: dict[str, Callable[[Path, pd.DataFrame, pd.DataFrame, pd.DataFrame], list[str]]] = {
+    "01_champion_scorecard.png": lambda root, summary, forecast, rally: [
+        _frame_digest(summary, ["market", "task", "model", "primary_value"])
+    ],
+    "02_forecast_smape.png": lambda root, summary, forecast, rally: [
+        _frame_digest(forecast, ["market", "model", "smape"])
+    ],
+    "03_rally_prauc.png": lambda root, summary, forecast, rally: [_frame_digest(rally, ["market", "model", "pr_auc"])],
+    "04_forecast_efficiency.png": lambda root, summary, forecast, rally: [
+        _frame_digest(_coarse_costs(forecast), _FORECAST_EFFICIENCY_COLUMNS)
+    ],
+    "05_rally_calibration.png": lambda root, summary, forecast, rally: [
+        _frame_digest(rally, ["market", "model", "pr_auc"]),
+        *(
+            f"{market}:{_file_digest(_calibration_input(root, market))}"
+            for market in sorted(rally["market"].unique())
+        ),
+    ],
+}
+
+
+def _chart_fingerprint(
+    file_name: str, root: Path, summary: pd.DataFrame, forecast: pd.DataFrame, rally: pd.DataFrame
+) -> str:
+    parts = [CHART_CODE_VERSION, file_name, *_CHART_INPUTS[file_name](root, summary, forecast, rally)]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:24]
+
+
+def _render_chart(
+    file_name: str,
+    artifacts_dir: Path,
+    output_dir: Path,
+    champion_summary: pd.DataFrame,
+    forecast_all: pd.DataFrame,
+    rally_all: pd.DataFrame,
+) -> str:
+    """Draw one chart; runs in a pool worker, so styling is applied per process."""
+    with profile_span(f"chart.{Path(file_name).stem}"):
+        _style()
+        if file_name == "01_champion_scorecard.png":
+            _chart_champion_scorecard(champion_summary, output_dir)
+        elif file_name == "02_forecast_smape.png":
+            _chart_forecast_smape(forecast_all, output_dir)
+        elif file_name == "03_rally_prauc.png":
+            _chart_rally_prauc(rally_all, output_dir)
+        elif file_name == "04_forecast_efficiency.png":
+            _chart_forecast_efficiency(forecast_all, output_dir)
+        else:
+            calibration_all = pd.concat(
+                [_load_calibration(artifacts_dir, market) for market in sorted(rally_all["market"].unique())],
+                ignore_index=True,
+            )
+            _chart_rally_calibration(calibration_all, rally_all, output_dir)
+    return file_name
+
+
+def _load_manifest(output_dir: Path) -> dict[str, str]:
+    path = output_dir / CHART_MANIFEST_FILE
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def _save_manifest(output_dir: Path, manifest: dict[str, str]) -> None:
+    atomic_write_text(output_dir / CHART_MANIFEST_FILE, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def generate_chart_pack(
+    artifacts_dir: Path, output_dir: Path, *, max_workers: int | None = None, force: bool = False
+) -> list[str]:
+    """Render the chart pack, redrawing only charts whose inputs changed since the last call.
+
+    Each chart's fingerprint (the values it plots, see ``_CHART_INPUTS``) is kept in
+    ``chart_manifest.json`` next to the PNGs; a chart whose fingerprint matches and whose
+    file exists is skipped, so a one-market rerun redraws only charts whose plotted
+    values moved. Stale charts render in a process pool, one figure per worker
+    (``max_workers`` defaults to one per stale chart, capped at the core count).
+    ``force`` redraws everything. Benchmark tables are read from the run-history store
+    when the summary's run is recorded there. Returns the file names that were drawn.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    champion_summary = pd.read_csv(artifacts_dir / "champion_summary.csv")
-    forecast_frames = []
-    rally_frames = []
-    rally_preds = []
-
-    for market in sorted(champion_summary["market"].unique().tolist()):
-        forecast, rally, preds = _load_market_tables(artifacts_dir, market)
-        forecast_frames.append(forecast)
-        rally_frames.append(rally)
-        rally_preds.append(preds)
-
-    forecast_all = pd.concat(forecast_frames, ignore_index=True)
-    rally_all = pd.concat(rally_frames, ignore_index=True)
-    rally_preds_all = pd.concat(rally_preds, ignore_index=True)
-
-    _chart_champion_scorecard(champion_summary, output_dir)
-    _chart_forecast_smape(forecast_all, output_dir)
-    _chart_rally_prauc(rally_all, output_dir)
-    _chart_forecast_efficiency(forecast_all, output_dir)
-    _chart_rally_calibration(rally_preds_all, rally_all, output_dir)
+    with profile_span("charts.load"):
+        champion_summary = pd.read_csv(artifacts_dir / "champion_summary.csv")
+        stored = load_summary_tables(artifacts_dir, champion_summary)
+        if stored is not None:
+            forecast_all, rally_all = stored["forecast"], stored["rally"]
+        else:
+            forecast_frames = []
+            rally_frames = []
+            for market in sorted(champion_summary["market"].unique().tolist()):
+                forecast, rally = _load_market_tables(artifacts_dir, market)
+                forecast_frames.append(forecast)
+                rally_frames.append(rally)
+            forecast_all = pd.concat(forecast_frames, ignore_index=True)
+            rally_all = pd.concat(rally_frames, ignore_index=True)
+
+    with profile_span("charts.fingerprint"):
+        fingerprints = {
+            name: _chart_fingerprint(name, artifacts_dir, champion_summary, forecast_all, rally_all)
+            for name in [*EXEC_FILES, *ANALYTICAL_FILES]
+        }
+        previous = {} if force else _load_manifest(output_dir)
+        stale = [
+            name
+            for name, fingerprint in fingerprints.items()
+            if previous.get(name) != fingerprint or not (output_dir / name).exists()
+        ]
+
+    jobs = [(name, artifacts_dir, output_dir, champion_summary, forecast_all, rally_all) for name in stale]
+    workers = max_workers if max_workers is not None else min(len(jobs), cpu_count())
+    drawn = run_jobs(_render_chart, jobs, max_workers=workers)
+
+    manifest = {name: fingerprint for name, fingerprint in fingerprints.items() if name not in stale}
+    manifest.update({name: fingerprints[name] for name in drawn})
+    _save_manifest(output_dir, manifest)
     _write_chart_index(output_dir)
-
+    return drawn
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from time_copilot_demo.atomic import atomic_path
+from time_copilot_demo.model_registry import model_params
+from time_copilot_demo.model_store import MODEL_CODE_VERSION, training_data_hash
+from time_copilot_demo.shared_frame import materialize
+
+CHECKPOINT_DIR = "checkpoints"
+
+
+def job_key(
+    task: str,
+    model_name: str,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_test: pd.DataFrame,
+    params: dict[str, Any] | None = None,
+) -> str:
+    """Key of one fit/predict job: what the model store keys a fit by, plus the rows it predicts."""
+    X_train, y_train, X_test = materialize(X_train), materialize(y_train), materialize(X_test)
+    payload = {
+        "task": task,
+        "model": model_name,
+        "params": model_params(task, model_name, params),
+        "data": training_data_hash(X_train, y_train),
+        "code_version": MODEL_CODE_VERSION,
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode())
+    digest.update(pd.util.hash_pandas_object(X_test, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:24]
+
+
+class JobCheckpoints:
+    """Finished fit/predict outputs of one market's benchmark, one file per task and model.
+
+    Files live under ``artifacts/<market>/checkpoints/`` as ``<task>_<model>.joblib`` and
+    hold the job key next to the output (predictions, cost, training info), so a file
+    left by a different training set, test set or hyperparameters is never reused.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def path(self, task: str, model_name: str) -> Path:
+        return self.root / f"{task}_{model_name}.joblib"
+
+    def load(self, task: str, model_name: str, key: str) -> dict[str, Any] | None:
+        import joblib
+
+        try:
+            saved = joblib.load(self.path(task, model_name))
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            return None
+        if not isinstance(saved, dict) or saved.get("key") != key:
+            return None
+        return saved["output"]
+
+    def save(self, task: str, model_name: str, key: str, output: dict[str, Any]) -> None:
+        import joblib
+
+        # Written to a temp file and renamed, so a crash mid-write never leaves a partial checkpoint.
+        with atomic_path(self.path(task, model_name)) as tmp:
+            joblib.dump({"key": key, "output": output}, tmp)
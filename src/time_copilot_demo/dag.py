@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from time_copilot_demo.atomic import atomic_path, atomic_write_text
+from time_copilot_demo.parallel import run_jobs
+from time_copilot_demo.profiling import profile_span
+
+DAG_MANIFEST_FILE = "dag_manifest.json"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of a stage graph: ``fn(*outputs of inputs, **params)``.
+
+    A stage is fingerprinted by its name, ``version``, ``params`` and the digests of its
+    inputs' outputs, and re-executed only when that fingerprint changes, one of its
+    ``targets`` (files it writes) is missing or its stored output is gone. A ``source``
+    stage (e.g. loading data) runs every time and is not stored; its digest is a hash of
+    its output, so unchanged data leaves everything downstream untouched. Other stages'
+    digests are their fingerprints. ``fn`` must be picklable when stages run in worker
+    processes.
+    """
+
+    name: str
+    fn: Callable[..., Any]
+    inputs: tuple[str, ...] = ()
+    params: dict[str, Any] = field(default_factory=dict)
+    version: str = "1"
+    source: bool = False
+    targets: tuple[Path, ...] = ()
+
+
+def _fingerprint(stage: Stage, input_digests: list[str]) -> str:
+    payload = {
+        "name": stage.name,
+        "version": stage.version,
+        "params": stage.params,
+        "inputs": dict(zip(stage.inputs, input_digests)),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+def _levels(stages: Sequence[Stage]) -> list[list[Stage]]:
+    # Stages grouped by depth: every stage's inputs sit in earlier groups.
+    depth: dict[str, int] = {}
+    for stage in stages:
+        if stage.name in depth:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        missing = [name for name in stage.inputs if name not in depth]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on {missing}, which must be listed before it")
+        depth[stage.name] = 1 + max((depth[name] for name in stage.inputs), default=-1)
+    levels: list[list[Stage]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for stage in stages:
+        levels[depth[stage.name]].append(stage)
+    return levels
+
+
+def _run_stage(stage: Stage, inputs: list[Any]) -> Any:
+    with profile_span(f"stage.{stage.name}"):
+        return stage.fn(*inputs, **stage.params)
+
+
+class StageStore:
+    """Stage outputs (joblib files) and the manifest of fingerprints under ``root``."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.manifest: dict[str, dict[str, str]] = {}
+        path = self.root / DAG_MANIFEST_FILE
+        if path.exists():
+            try:
+                self.manifest = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                self.manifest = {}
+
+    def output_path(self, name: str) -> Path:
+        return self.root / "outputs" / f"{name}.joblib"
+
+    def load(self, name: str) -> Any:
+        import joblib
+
+        return joblib.load(self.output_path(name))
+
+    def save(self, name: str, output: Any) -> None:
+        import joblib
+
+        with atomic_path(self.output_path(name)) as tmp:
+            joblib.dump(output, tmp)
+
+    def save_manifest(self) -> None:
+        atomic_write_text(self.root / DAG_MANIFEST_FILE, json.dumps(self.manifest, indent=2, sort_keys=True))
+
+
+def run_stages(
+    stages: Sequence[Stage], state_dir: Path, *, max_workers: int | None = None, force: bool = False
+) -> list[str]:
+    """Run the stage graph, re-executing only stale stages and everything downstream of them.
+
+    Stages are taken depth by depth; the stale stages of one depth run through
+    ``run_jobs`` (a process pool when ``max_workers`` > 1). Outputs are stored under
+    ``state_dir/outputs`` and fingerprints in ``state_dir/dag_manifest.json``, saved
+    after every depth so an interrupted run keeps finished stages. Outputs of skipped
+    stages are loaded only if a stale stage needs them. ``force`` re-executes everything.
+    Returns the names of the executed stages, in graph order.
+    """
+    store = StageStore(state_dir)
+    digests: dict[str, str] = {}
+    outputs: dict[str, Any] = {}
+    executed: list[str] = []
+
+    def output(name: str) -> Any:
+        if name not in outputs:
+            outputs[name] = store.load(name)
+        return outputs[name]
+
+    for level in _levels(stages):
+        fingerprints = {stage.name: _fingerprint(stage, [digests[name] for name in stage.inputs]) for stage in level}
+        stale = [
+            stage
+            for stage in level
+            if force
+            or stage.source
+            or store.manifest.get(stage.name, {}).get("fingerprint") != fingerprints[stage.name]
+            or not store.output_path(stage.name).exists()
+            or not all(Path(target).exists() for target in stage.targets)
+        ]
+        stale_names = {stage.name for stage in stale}
+        for stage in level:
+            if stage.name not in stale_names:
+                digests[stage.name] = store.manifest[stage.name]["digest"]
+
+        jobs = [(stage, [output(name) for name in stage.inputs]) for stage in stale]
+        results = run_jobs(_run_stage, jobs, max_workers=max_workers)
+        for stage, result in zip(stale, results):
+            if stage.source:
+                import joblib
+
+                # Sources run every time, so their outputs are hashed rather than stored.
+                digest = joblib.hash(result)
+            else:
+                digest = fingerprints[stage.name]
+                store.save(stage.name, result)
+            store.manifest[stage.name] = {"fingerprint": fingerprints[stage.name], "digest": digest}
+            outputs[stage.name] = result
+            digests[stage.name] = digest
+            executed.append(stage.name)
+        store.save_manifest()
+    return executed
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
+from typing import Sequence
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from time_copilot_demo.atomic import atomic_path
 
 EPF_ZENODO_BASE = "https://zenodo.org/records/4624805/files"
 
+# Bump when the normalized market table layout changes; older parquet caches are rebuilt.
+EPF_SCHEMA_VERSION = "1"
+_SCHEMA_KEY = b"time_copilot.schema_version"
 
-def normalize_epf_frame(raw: pd.DataFrame) -> pd.DataFrame:
-    """Normalize EPF-style frame to the project schema."""
+
+def _market_table(raw: pd.DataFrame) -> pd.DataFrame:
+    """Normalized frame with ``timestamp``, ``price`` and the remaining columns, names stripped."""
     working = raw.copy()
     working.columns = [str(c).strip() for c in working.columns]
     price_candidates = [c for c in working.columns if "price" in c.lower()]
@@ -20,21 +30,192 @@ def normalize_epf_frame(raw: pd.DataFrame) -> pd.DataFrame:
     timestamp_col = out.columns[0]
     out = out.rename(columns={timestamp_col: "timestamp", price_col: "price"})
     out["timestamp"] = pd.to_datetime(out["timestamp"])
-    return out[["timestamp", "price"]]
+    extras = [c for c in out.columns if c not in {"timestamp", "price"}]
+    return out[["timestamp", "price", *extras]]
+
+
+def normalize_epf_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """Normalize EPF-style frame to the project schema."""
+    return _market_table(raw)[["timestamp", "price"]]
 
 
-def load_epf_market(dataset: str = "PJM", data_dir: str = "datasets") -> pd.DataFrame:
-    """Load market data from local cache or EPF Zenodo source."""
+def _write_market_parquet(table: pd.DataFrame, path: Path) -> None:
+    arrow = pa.Table.from_pandas(table, preserve_index=False)
+    metadata = {**(arrow.schema.metadata or {}), _SCHEMA_KEY: EPF_SCHEMA_VERSION.encode()}
+    with atomic_path(path) as tmp:
+        pq.write_table(arrow.replace_schema_metadata(metadata), tmp)
+
+
+def _parquet_is_current(path: Path) -> bool:
+    if not path.exists():
+        return False
+    metadata = pq.read_schema(path).metadata or {}
+    return metadata.get(_SCHEMA_KEY) == EPF_SCHEMA_VERSION.encode()
+
+
+def load_epf_market(
+    dataset: str = "PJM",
+    data_dir: str = "datasets",
+    columns: Sequence[str] = ("timestamp", "price"),
+) -> pd.DataFrame:
+    """Load market data from the local parquet cache or the EPF Zenodo source.
+
+    The cache holds the normalized table (``timestamp``, ``price`` and exogenous columns)
+    as typed parquet and is read memory-mapped with only ``columns`` decoded. A legacy
+    ``<dataset>.csv`` cache is migrated to parquet on first use.
+    """
     data_path = Path(data_dir)
     data_path.mkdir(parents=True, exist_ok=True)
+    parquet_file = data_path / f"{dataset}.parquet"
+
+    if not _parquet_is_current(parquet_file):
+        local_file = data_path / f"{dataset}.csv"
+        source = local_file if local_file.exists() else f"{EPF_ZENODO_BASE}/{dataset}.csv"
+        raw = pd.read_csv(source, index_col=0)
+        raw.index = pd.to_datetime(raw.index)
+        _write_market_parquet(_market_table(raw), parquet_file)
+
+    return pq.read_table(parquet_file, columns=list(columns), memory_map=True).to_pandas()
+
+
+def market_frame_bytes(
+    dataset: str = "PJM",
+    data_dir: str = "datasets",
+    columns: Sequence[str] = ("timestamp", "price"),
+) -> int | None:
+    """Approximate in-memory size of ``load_epf_market``'s frame, without loading it.
+
+    From the parquet cache's row count and column widths, or else from the size of a
+    local CSV that loading would parse in full; None when the market would be downloaded.
+    """
+    data_path = Path(data_dir)
+    parquet_file = data_path / f"{dataset}.parquet"
+    if parquet_file.exists():
+        schema = pq.read_schema(parquet_file)
+        widths = [
+            schema.field(name).type.bit_width // 8 if pa.types.is_primitive(schema.field(name).type) else 8
+            for name in columns
+            if name in schema.names
+        ]
+        return pq.read_metadata(parquet_file).num_rows * sum(widths)
     local_file = data_path / f"{dataset}.csv"
+    return local_file.stat().st_size if local_file.exists() else None
+
+
+_SORTED_KEY = b"time_copilot.sorted"
+_SOURCE_KEY = b"time_copilot.source"
+
+
+def _ingest_source(
+    csv_path: str | Path, *, timestamp_col: str, price_col: str, timestamp_format: str | None, price_dtype: str
+) -> bytes:
+    """Identity of an ingestion: which CSV (path, size, mtime) and the options that shape the output."""
+    csv_path = Path(csv_path).resolve()
+    stat = csv_path.stat()
+    source = {
+        "path": str(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "timestamp_col": timestamp_col,
+        "price_col": price_col,
+        "timestamp_format": timestamp_format,
+        "price_dtype": price_dtype,
+    }
+    return json.dumps(source, sort_keys=True).encode()
+
+
+def price_parquet_is_current(
+    csv_path: str | Path,
+    parquet_path: str | Path,
+    *,
+    timestamp_col: str = "timestamp",
+    price_col: str = "price",
+    timestamp_format: str | None = None,
+    price_dtype: str = "float64",
+) -> bool:
+    """Whether ``parquet_path`` was ingested from this very CSV with these options (see ``ingest_price_csv``)."""
+    parquet_path = Path(parquet_path)
+    if not parquet_path.exists():
+        return False
+    metadata = pq.read_metadata(parquet_path).metadata or {}
+    expected = _ingest_source(
+        csv_path,
+        timestamp_col=timestamp_col,
+        price_col=price_col,
+        timestamp_format=timestamp_format,
+        price_dtype=price_dtype,
+    )
+    return metadata.get(_SCHEMA_KEY) == EPF_SCHEMA_VERSION.encode() and metadata.get(_SOURCE_KEY) == expected
+
+
+def ingest_price_csv(
+    csv_path: str | Path,
+    parquet_path: str | Path,
+    *,
+    timestamp_col: str = "timestamp",
+    price_col: str = "price",
+    chunksize: int = 1_000_000,
+    timestamp_format: str | None = None,
+    price_dtype: str = "float64",
+) -> Path:
+    """Stream a ``timestamp,price`` CSV into a compact parquet file with bounded memory.
+
+    Each chunk is parsed with an explicit timestamp format, cast to ``price_dtype``,
+    sorted, de-duplicated (first row wins) and written as one row group, so peak memory
+    is about one chunk. If chunks overlap in time the file is flagged unsorted and
+    ``load_price_parquet`` finishes the sort on read. The CSV's path, size and mtime and
+    the parsing options are recorded, so ``price_parquet_is_current`` can tell a stale file.
+    """
+    parquet_path = Path(parquet_path)
+    source = _ingest_source(
+        csv_path,
+        timestamp_col=timestamp_col,
+        price_col=price_col,
+        timestamp_format=timestamp_format,
+        price_dtype=price_dtype,
+    )
+    schema = pa.schema([("timestamp", pa.timestamp("ns")), ("price", pa.from_numpy_dtype(price_dtype))])
+
+    is_sorted = True
+    last_ts: pd.Timestamp | None = None
+    reader = pd.read_csv(
+        csv_path,
+        usecols=[timestamp_col, price_col],
+        dtype={price_col: price_dtype},
+        chunksize=chunksize,
+    )
+    with atomic_path(parquet_path) as tmp, pq.ParquetWriter(tmp, schema) as writer:
+        for chunk in reader:
+            chunk = pd.DataFrame(
+                {
+                    "timestamp": pd.to_datetime(chunk[timestamp_col], format=timestamp_format).astype("datetime64[ns]"),
+                    "price": chunk[price_col].to_numpy(),
+                }
+            )
+            chunk = chunk.sort_values("timestamp", kind="stable").drop_duplicates("timestamp", keep="first")
+            if last_ts is not None:
+                chunk = chunk[chunk["timestamp"] != last_ts]
+                if len(chunk) and chunk["timestamp"].iloc[0] < last_ts:
+                    is_sorted = False
+            if not len(chunk):
+                continue
+            last_ts = chunk["timestamp"].iloc[-1] if last_ts is None else max(last_ts, chunk["timestamp"].iloc[-1])
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        # The footer is written on close, so the sortedness flag can still be recorded here.
+        writer.add_key_value_metadata(
+            {
+                _SCHEMA_KEY: EPF_SCHEMA_VERSION.encode(),
+                _SORTED_KEY: b"1" if is_sorted else b"0",
+                _SOURCE_KEY: source,
+            }
+        )
+    return parquet_path
 
-    if local_file.exists():
-        raw = pd.read_csv(local_file, index_col=0)
-    else:
-        url = f"{EPF_ZENODO_BASE}/{dataset}.csv"
-        raw = pd.read_csv(url, index_col=0)
-        raw.to_csv(local_file)
 
-    raw.index = pd.to_datetime(raw.index)
-    return normalize_epf_frame(raw)
+def load_price_parquet(path: str | Path, columns: Sequence[str] = ("timestamp", "price")) -> pd.DataFrame:
+    """Memory-map an ingested price file, finishing sort/de-duplication if ingestion could not."""
+    frame = pq.read_table(path, columns=list(columns), memory_map=True).to_pandas()
+    if (pq.read_metadata(path).metadata or {}).get(_SORTED_KEY) == b"0":
+        frame = frame.sort_values("timestamp", kind="stable").drop_duplicates("timestamp", keep="first")
+        frame = frame.reset_index(drop=True)
+    return frame
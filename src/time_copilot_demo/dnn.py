@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import copy
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterator
+
 import numpy as np
 import pandas as pd
-from sklearn.neural_network import MLPClassifier, MLPRegressor
+
+from time_copilot_demo.parallel import thread_budget
 
 
+@lru_cache(maxsize=None)
 def _torch_available() -> bool:
+    # Probed once per process: a failed torch import is slow and never starts succeeding.
     try:
         import torch  # noqa: F401
 
@@ -26,96 +36,248 @@ def _device_name() -> str:
     return "cpu"
 
 
-def fit_predict_dnn_regression(
-    X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame
-) -> np.ndarray:
-    if _torch_available():
+def _build_net(n_features: int) -> Any:
+    from torch import nn
+
+    return nn.Sequential(
+        nn.Linear(n_features, 64),
+        nn.ReLU(),
+        nn.Linear(64, 32),
+        nn.ReLU(),
+        nn.Linear(32, 1),
+    )
+
+
+class TorchDNN:
+    """Fitted torch MLP kept as a CPU state dict so it pickles without the module graph."""
+
+    def __init__(self, task: str, n_features: int, state_dict: dict[str, Any]) -> None:
+        self.task = task
+        self.n_features = n_features
+        self.state_dict = state_dict
+        self._net: Any = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(self.__dict__)
+        state.pop("_net", None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._net = None
+
+    def _raw_output(self, X: pd.DataFrame) -> np.ndarray:
         import torch
-        from torch import nn
-
-        device = torch.device(_device_name())
-        Xtr = torch.tensor(X_train.to_numpy(dtype=np.float32), dtype=torch.float32, device=device)
-        ytr = torch.tensor(y_train.to_numpy(dtype=np.float32).reshape(-1, 1), dtype=torch.float32, device=device)
-        Xte = torch.tensor(X_test.to_numpy(dtype=np.float32), dtype=torch.float32, device=device)
-
-        model = nn.Sequential(
-            nn.Linear(Xtr.shape[1], 64),
-            nn.ReLU(),
-            nn.Linear(64, 32),
-            nn.ReLU(),
-            nn.Linear(32, 1),
-        ).to(device)
-        opt = torch.optim.Adam(model.parameters(), lr=1e-3)
-        loss_fn = nn.MSELoss()
-
-        model.train()
-        for _ in range(60):
-            opt.zero_grad()
-            pred = model(Xtr)
-            loss = loss_fn(pred, ytr)
-            loss.backward()
-            opt.step()
-
-        model.eval()
+
+        if self._net is None:
+            self._net = _build_net(self.n_features)
+            self._net.load_state_dict(self.state_dict)
+            self._net.eval()
         with torch.no_grad():
-            out = model(Xte).squeeze(-1).detach().cpu().numpy()
-        return out
+            out = self._net(torch.tensor(np.asarray(X, dtype=np.float32)))
+            if self.task == "rally":
+                out = torch.sigmoid(out)
+        return out.squeeze(-1).numpy()
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self._raw_output(X)
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        prob = self._raw_output(X)
+        return np.column_stack([1.0 - prob, prob])
+
+
+@dataclass(frozen=True)
+class DNNTrainConfig:
+    max_epochs: int = 60
+    batch_size: int = 512
+    learning_rate: float = 1e-3
+    # Trailing share of the training rows held out for early stopping (0 disables it).
+    validation_fraction: float = 0.1
+    patience: int = 5
+    # Intra-op thread budget; None takes ``parallel.thread_budget()`` (a pool worker's cap, else every core).
+    num_threads: int | None = None
+    seed: int = 7
+
+
+# Below this many validation rows early stopping is too noisy to trust, so all epochs run.
+_MIN_VALIDATION_ROWS = 64
+
+
+def _validation_rows(n_rows: int, config: DNNTrainConfig) -> int:
+    n_val = int(n_rows * config.validation_fraction)
+    return n_val if config.patience > 0 and n_val >= _MIN_VALIDATION_ROWS else 0
+
+
+def _num_threads(config: DNNTrainConfig) -> int:
+    return config.num_threads if config.num_threads is not None else thread_budget()
+
+
+@contextmanager
+def _blas_threads(n_threads: int) -> Iterator[None]:
+    from threadpoolctl import threadpool_limits
+
+    with threadpool_limits(limits=n_threads):
+        yield
+
+
+@contextmanager
+def _torch_threads(n_threads: int) -> Iterator[None]:
+    import torch
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(n_threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
 
+
+def _fit_torch(task: str, X_train: pd.DataFrame, y_train: pd.Series, config: DNNTrainConfig) -> TorchDNN:
+    import torch
+    from torch import nn
+
+    started = time.perf_counter()
+    device = torch.device(_device_name())
+    generator = torch.Generator().manual_seed(config.seed)
+    torch.manual_seed(config.seed)
+
+    # One float32 copy of the data, pinned (on CUDA) so batch host-to-device copies use DMA.
+    X_all = torch.from_numpy(np.ascontiguousarray(X_train.to_numpy(dtype=np.float32)))
+    y_all = torch.from_numpy(np.ascontiguousarray(y_train.to_numpy(dtype=np.float32).reshape(-1, 1)))
+    if device.type == "cuda":
+        X_all, y_all = X_all.pin_memory(), y_all.pin_memory()
+
+    n_val = _validation_rows(len(X_all), config)
+    n_fit = len(X_all) - n_val
+    batch_size = max(1, min(config.batch_size, n_fit))
+    X_batch = torch.empty((batch_size, X_all.shape[1]), dtype=torch.float32)
+    y_batch = torch.empty((batch_size, 1), dtype=torch.float32)
+    if device.type == "cuda":
+        X_batch, y_batch = X_batch.pin_memory(), y_batch.pin_memory()
+    X_val = X_all[n_fit:].to(device)
+    y_val = y_all[n_fit:].to(device)
+
+    model = _build_net(X_all.shape[1]).to(device)
+    opt = torch.optim.Adam(model.parameters(), lr=config.learning_rate)
+    loss_fn = nn.MSELoss() if task == "forecast" else nn.BCEWithLogitsLoss()
+
+    best_loss = float("inf")
+    best_epoch = 0
+    best_state = None
+    epochs_run = 0
+    with _torch_threads(_num_threads(config)):
+        for epoch in range(1, config.max_epochs + 1):
+            epochs_run = epoch
+            model.train()
+            order = torch.randperm(n_fit, generator=generator)
+            for start in range(0, n_fit, batch_size):
+                idx = order[start : start + batch_size]
+                xb = torch.index_select(X_all, 0, idx, out=X_batch[: len(idx)])
+                yb = torch.index_select(y_all, 0, idx, out=y_batch[: len(idx)])
+                opt.zero_grad()
+                # Blocking copies: the pinned batch buffers are refilled on the next step.
+                loss = loss_fn(model(xb.to(device)), yb.to(device))
+                loss.backward()
+                opt.step()
+
+            if not n_val:
+                continue
+            model.eval()
+            with torch.no_grad():
+                val_loss = float(loss_fn(model(X_val), y_val))
+            if val_loss < best_loss:
+                best_loss, best_epoch = val_loss, epoch
+                best_state = {name: tensor.detach().cpu().clone() for name, tensor in model.state_dict().items()}
+            elif epoch - best_epoch >= config.patience:
+                break
+
+    if best_state is None:
+        best_epoch = epochs_run
+        best_state = {name: tensor.detach().cpu() for name, tensor in model.state_dict().items()}
+    fitted = TorchDNN(task, X_all.shape[1], best_state)
+    fitted.training_ = {
+        "fit_seconds": time.perf_counter() - started,
+        "best_epoch": best_epoch,
+        "epochs_run": epochs_run,
+    }
+    return fitted
+
+
+def _fit_sklearn_mlp(task: str, X_train: pd.DataFrame, y_train: pd.Series, config: DNNTrainConfig) -> Any:
+    from sklearn.metrics import log_loss, mean_squared_error
+    from sklearn.neural_network import MLPClassifier, MLPRegressor
+
+    started = time.perf_counter()
+    # Same trailing holdout as the torch path; MLP's own early_stopping would validate on a random split.
+    n_val = _validation_rows(len(X_train), config)
+    n_fit = len(X_train) - n_val
+    X_fit, y_fit = X_train.iloc[:n_fit], y_train.iloc[:n_fit]
+    X_val, y_val = X_train.iloc[n_fit:], y_train.iloc[n_fit:]
+    estimator = MLPRegressor if task == "forecast" else MLPClassifier
     # Lightweight deterministic fallback that works on any machine.
-    model = MLPRegressor(
+    model = estimator(
         hidden_layer_sizes=(32, 16),
         activation="relu",
         solver="adam",
-        learning_rate_init=1e-3,
-        max_iter=60,
-        random_state=7,
+        learning_rate_init=config.learning_rate,
+        batch_size=max(1, min(config.batch_size, n_fit)),
+        random_state=config.seed,
     )
-    model.fit(X_train, y_train)
-    return model.predict(X_test)
+    # ``partial_fit`` runs one epoch per call, so the loop mirrors ``_fit_torch``.
+    fit_kwargs = {} if task == "forecast" else {"classes": np.unique(y_train)}
 
+    best_loss = float("inf")
+    best_epoch = 0
+    best_model = None
+    epochs_run = 0
+    with _blas_threads(_num_threads(config)):
+        for epoch in range(1, config.max_epochs + 1):
+            epochs_run = epoch
+            model.partial_fit(X_fit, y_fit, **fit_kwargs)
+            if not n_val:
+                continue
+            if task == "forecast":
+                val_loss = mean_squared_error(y_val, model.predict(X_val))
+            else:
+                val_loss = log_loss(y_val, model.predict_proba(X_val), labels=model.classes_)
+            if val_loss < best_loss:
+                best_loss, best_epoch = val_loss, epoch
+                best_model = copy.deepcopy(model)
+            elif epoch - best_epoch >= config.patience:
+                break
 
-def fit_predict_dnn_classification(
+    if best_model is None:
+        best_epoch, best_model = epochs_run, model
+    best_model.training_ = {
+        "fit_seconds": time.perf_counter() - started,
+        "best_epoch": best_epoch,
+        "epochs_run": epochs_run,
+    }
+    return best_model
+
+
+def fit_dnn_regression(X_train: pd.DataFrame, y_train: pd.Series, config: DNNTrainConfig | None = None) -> Any:
+    config = config or DNNTrainConfig()
+    if _torch_available():
+        return _fit_torch("forecast", X_train, y_train, config)
+    return _fit_sklearn_mlp("forecast", X_train, y_train, config)
+
+
+def fit_dnn_classification(X_train: pd.DataFrame, y_train: pd.Series, config: DNNTrainConfig | None = None) -> Any:
+    config = config or DNNTrainConfig()
+    if _torch_available():
+        return _fit_torch("rally", X_train, y_train, config)
+    return _fit_sklearn_mlp("rally", X_train, y_train, config)
+
+
+def fit_predict_dnn_regression(
     X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame
 ) -> np.ndarray:
-    if _torch_available():
-        import torch
-        from torch import nn
-
-        device = torch.device(_device_name())
-        Xtr = torch.tensor(X_train.to_numpy(dtype=np.float32), dtype=torch.float32, device=device)
-        ytr = torch.tensor(y_train.to_numpy(dtype=np.float32).reshape(-1, 1), dtype=torch.float32, device=device)
-        Xte = torch.tensor(X_test.to_numpy(dtype=np.float32), dtype=torch.float32, device=device)
-
-        model = nn.Sequential(
-            nn.Linear(Xtr.shape[1], 64),
-            nn.ReLU(),
-            nn.Linear(64, 32),
-            nn.ReLU(),
-            nn.Linear(32, 1),
-        ).to(device)
-        opt = torch.optim.Adam(model.parameters(), lr=1e-3)
-        loss_fn = nn.BCEWithLogitsLoss()
-
-        model.train()
-        for _ in range(60):
-            opt.zero_grad()
-            logits = model(Xtr)
-            loss = loss_fn(logits, ytr)
-            loss.backward()
-            opt.step()
-
-        model.eval()
-        with torch.no_grad():
-            probs = torch.sigmoid(model(Xte)).squeeze(-1).detach().cpu().numpy()
-        return probs
+    return fit_dnn_regression(X_train, y_train).predict(X_test)
 
-    model = MLPClassifier(
-        hidden_layer_sizes=(32, 16),
-        activation="relu",
-        solver="adam",
-        learning_rate_init=1e-3,
-        max_iter=60,
-        random_state=7,
-    )
-    model.fit(X_train, y_train)
-    return model.predict_proba(X_test)[:, 1]
+
+def fit_predict_dnn_classification(
+    X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame
+) -> np.ndarray:
+    return fit_dnn_classification(X_train, y_train).predict_proba(X_test)[:, 1]
@@ -1,32 +1,106 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Sequence
 
 import numpy as np
-from sklearn.metrics import average_precision_score, brier_score_loss, f1_score, roc_auc_score
+from numpy.typing import ArrayLike
 
+FORECAST_METRICS = ("mae", "rmse", "smape")
+RALLY_METRICS = ("pr_auc", "roc_auc", "f1", "brier")
 
-def classification_metrics(
-    y_true: Iterable[int], y_prob: Iterable[float], *, threshold: float = 0.5
-) -> dict[str, float]:
-    y_true_arr = np.asarray(list(y_true))
-    y_prob_arr = np.asarray(list(y_prob))
-    y_pred_arr = (y_prob_arr >= threshold).astype(int)
 
-    metrics = {
-        "pr_auc": float(average_precision_score(y_true_arr, y_prob_arr)),
-        "roc_auc": float(roc_auc_score(y_true_arr, y_prob_arr)),
-        "f1": float(f1_score(y_true_arr, y_pred_arr)),
-        "brier": float(brier_score_loss(y_true_arr, y_prob_arr)),
-    }
-    return metrics
+def _prediction_matrix(y_true: ArrayLike, y_pred: ArrayLike) -> tuple[np.ndarray, np.ndarray]:
+    y_true_arr = np.asarray(y_true, dtype=float)
+    y_pred_arr = np.atleast_2d(np.asarray(y_pred, dtype=float))
+    if y_true_arr.ndim != 1 or y_pred_arr.ndim != 2 or y_pred_arr.shape[1] != len(y_true_arr):
+        raise ValueError(
+            f"predictions must be shaped (models, {len(y_true_arr)}) for y_true of that length, "
+            f"got {y_pred_arr.shape}"
+        )
+    return y_true_arr, y_pred_arr
+
 
+def batch_forecast_metrics(y_true: ArrayLike, y_pred: ArrayLike) -> dict[str, np.ndarray]:
+    """MAE, RMSE and sMAPE of every row of a (models × rows) prediction matrix in one pass.
 
-def forecast_metrics(y_true: Iterable[float], y_pred: Iterable[float]) -> dict[str, float]:
-    y_true_arr = np.asarray(list(y_true), dtype=float)
-    y_pred_arr = np.asarray(list(y_pred), dtype=float)
-    mae = np.mean(np.abs(y_true_arr - y_pred_arr))
-    rmse = np.sqrt(np.mean((y_true_arr - y_pred_arr) ** 2))
+    ``y_pred`` may also be a single 1-D prediction vector. Each metric is an array with
+    one value per model, in row order.
+    """
+    y_true_arr, y_pred_arr = _prediction_matrix(y_true, y_pred)
+    error = y_true_arr - y_pred_arr
+    abs_error = np.abs(error)
     denom = np.maximum(np.abs(y_true_arr) + np.abs(y_pred_arr), 1e-8)
-    smape = np.mean(2.0 * np.abs(y_true_arr - y_pred_arr) / denom) * 100.0
-    return {"mae": float(mae), "rmse": float(rmse), "smape": float(smape)}
+    return {
+        "mae": abs_error.mean(axis=1),
+        "rmse": np.sqrt((error**2).mean(axis=1)),
+        "smape": (2.0 * abs_error / denom).mean(axis=1) * 100.0,
+    }
+
+
+def batch_classification_metrics(
+    y_true: ArrayLike, y_prob: ArrayLike, *, threshold: float | Sequence[float] = 0.5
+) -> dict[str, np.ndarray]:
+    """PR-AUC, ROC-AUC, F1 and Brier of every row of a (models × rows) probability matrix.
+
+    All models share one vectorized descending sort. PR-AUC is sklearn's
+    ``average_precision_score`` (step-wise, no interpolation) and ROC-AUC the trapezoidal
+    ``roc_auc_score``; both follow sklearn's tie handling, so results match sklearn to
+    floating-point rounding. ``threshold`` is the F1 decision cut, one for all models or
+    one per model. On a single-class ``y_true`` the ranking metrics and F1 are NaN.
+    Non-finite probabilities raise ``ValueError``, since they would corrupt the sort.
+    """
+    y_true_arr, y_prob_arr = _prediction_matrix(y_true, y_prob)
+    n_models, n_rows = y_prob_arr.shape
+    if not np.isfinite(y_prob_arr).all():
+        bad = sorted(set(np.flatnonzero(~np.isfinite(y_prob_arr).all(axis=1)).tolist()))
+        raise ValueError(f"probabilities must be finite; model rows {bad} contain NaN or inf")
+    thresholds = np.asarray(threshold, dtype=float).reshape(-1)
+    if len(thresholds) not in (1, n_models):
+        raise ValueError(f"threshold must be one value or one per model ({n_models}), got {len(thresholds)}")
+    cut = np.broadcast_to(thresholds.reshape(-1, 1), (n_models, 1))
+    positive = y_true_arr == 1
+    n_pos = float(positive.sum())
+    n_neg = n_rows - n_pos
+
+    brier = ((y_prob_arr - y_true_arr) ** 2).mean(axis=1)
+    if n_pos == 0 or n_neg == 0:
+        nan = np.full(n_models, np.nan)
+        return {"pr_auc": nan, "roc_auc": nan.copy(), "f1": nan.copy(), "brier": brier}
+
+    predicted = y_prob_arr >= cut
+    tp = (predicted & positive).sum(axis=1)
+    f1_denom = n_pos + predicted.sum(axis=1)
+    f1 = np.divide(2.0 * tp, f1_denom, out=np.zeros(n_models), where=f1_denom > 0)
+
+    order = np.argsort(-y_prob_arr, axis=1, kind="stable")
+    scores = np.take_along_axis(y_prob_arr, order, axis=1)
+    labels = positive[order].astype(float)
+    tps = np.cumsum(labels, axis=1)
+    # Tied scores form one threshold: every row takes the counts at the end of its tie group.
+    position = np.arange(n_rows)
+    group_end = np.empty((n_models, n_rows), dtype=bool)
+    group_end[:, :-1] = scores[:, :-1] != scores[:, 1:]
+    group_end[:, -1] = True
+    end_index = np.minimum.accumulate(np.where(group_end, position, n_rows)[:, ::-1], axis=1)[:, ::-1]
+    group_start = np.ones((n_models, n_rows), dtype=bool)
+    group_start[:, 1:] = group_end[:, :-1]
+    start_index = np.maximum.accumulate(np.where(group_start, position, 0), axis=1)
+
+    tps_end = np.take_along_axis(tps, end_index, axis=1)
+    tps_before = np.take_along_axis(tps - labels, start_index, axis=1)
+    # Average precision: each positive adds the precision of its threshold, weighted 1/n_pos.
+    precision_end = tps_end / (end_index + 1)
+    pr_auc = np.maximum(0.0, (labels * precision_end).sum(axis=1) / n_pos)
+    # ROC trapezoids: each negative adds the mean TPR over its threshold's step.
+    roc_auc = ((1.0 - labels) * (tps_before + tps_end)).sum(axis=1) / (2.0 * n_pos * n_neg)
+    return {"pr_auc": pr_auc, "roc_auc": roc_auc, "f1": f1, "brier": brier}
+
+
+def classification_metrics(y_true: ArrayLike, y_prob: ArrayLike, *, threshold: float = 0.5) -> dict[str, float]:
+    metrics = batch_classification_metrics(y_true, y_prob, threshold=threshold)
+    return {name: float(metrics[name][0]) for name in RALLY_METRICS}
+
+
+def forecast_metrics(y_true: ArrayLike, y_pred: ArrayLike) -> dict[str, float]:
+    metrics = batch_forecast_metrics(y_true, y_pred)
+    return {name: float(metrics[name][0]) for name in FORECAST_METRICS}
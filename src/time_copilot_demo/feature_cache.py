@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from time_copilot_demo.atomic import atomic_path
+
+# Bump whenever feature or label construction changes so stale frames are never reused.
+FEATURE_CODE_VERSION = "2"
+
+
+class FeatureCache:
+    """On-disk parquet cache for supervised frames, keyed by input content and parameters.
+
+    Entries are evicted least-recently-used first once the directory exceeds ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 2 * 2**30) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def key(self, df: pd.DataFrame, params: dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(FEATURE_CODE_VERSION.encode())
+        digest.update(json.dumps(params, sort_keys=True, default=list).encode())
+        digest.update(pd.util.hash_pandas_object(df[["timestamp", "price"]], index=False).to_numpy().tobytes())
+        return digest.hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.parquet"
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        path = self._path(key)
+        try:
+            frame = pd.read_parquet(path)
+        except (FileNotFoundError, OSError):
+            return None
+        os.utime(path)
+        return frame
+
+    def put(self, key: str, frame: pd.DataFrame) -> None:
+        path = self._path(key)
+        with atomic_path(path) as tmp:
+            frame.to_parquet(tmp, index=False)
+        self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        evict_least_recently_used(self.root, "*.parquet", self.max_bytes, keep=keep)
+
+
+def evict_least_recently_used(root: Path, pattern: str, max_bytes: int, *, keep: Path) -> None:
+    """Delete the oldest-mtime files matching ``pattern`` under ``root`` until they fit ``max_bytes``.
+
+    ``keep`` (the entry just written) is never deleted. Readers bump an entry's mtime on
+    every hit, so mtime order is least-recently-used order.
+    """
+    entries = []
+    for path in Path(root).glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:  # evicted concurrently by another market
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        total -= size
+        path.unlink(missing_ok=True)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 
@@ -29,3 +30,117 @@ def build_features(
     out["month"] = dt.dt.month
     return out
 
+
+class IncrementalFeatureState:
+    """O(1) per-print equivalent of ``build_features`` for live scoring.
+
+    Keeps a ring buffer of the last ``max(lags + rolling_windows)`` prices and running
+    sums / sums of squares per rolling window. ``feature_row(ts)`` returns the row
+    ``build_features`` would produce at ``ts`` from the prices pushed so far.
+    The sums are of prices minus a shift near their level, so the variance
+    ``E[x²] - E[x]²`` does not cancel away when the spread is tiny next to the price.
+    """
+
+    def __init__(
+        self,
+        *,
+        lags: tuple[int, ...] = (1, 24, 48),
+        rolling_windows: tuple[int, ...] = (24, 24 * 7),
+    ) -> None:
+        self.lags = tuple(lags)
+        self.rolling_windows = tuple(rolling_windows)
+        self.capacity = max(self.lags + self.rolling_windows)
+        self._buffer = np.full(self.capacity, np.nan)
+        self._count = 0
+        # Subtracted from every price before it enters the sums; moved to the recent mean on resync.
+        self._shift = 0.0
+        self._sums = dict.fromkeys(self.rolling_windows, 0.0)
+        self._sumsq = dict.fromkeys(self.rolling_windows, 0.0)
+
+    @classmethod
+    def from_history(
+        cls,
+        df: pd.DataFrame,
+        *,
+        timestamp_col: str = "timestamp",
+        price_col: str = "price",
+        lags: tuple[int, ...] = (1, 24, 48),
+        rolling_windows: tuple[int, ...] = (24, 24 * 7),
+    ) -> IncrementalFeatureState:
+        state = cls(lags=lags, rolling_windows=rolling_windows)
+        prices = df.sort_values(timestamp_col)[price_col].to_numpy(dtype=float)
+        tail = prices[-state.capacity :]
+        # Place the tail where a full replay would have left it in the ring.
+        state._count = len(prices) - len(tail)
+        for price in tail:
+            state._buffer[state._count % state.capacity] = price
+            state._count += 1
+        state._resync()
+        return state
+
+    @property
+    def feature_names(self) -> list[str]:
+        names = [f"lag_{lag}" for lag in self.lags]
+        for window in self.rolling_windows:
+            names += [f"roll_mean_{window}", f"roll_std_{window}"]
+        return names + ["hour", "dayofweek", "month"]
+
+    def _back(self, k: int) -> float:
+        """Price pushed ``k`` steps ago (1 = most recent)."""
+        return float(self._buffer[(self._count - k) % self.capacity])
+
+    def push(self, price: float) -> None:
+        price = float(price)
+        if self._count == 0:
+            self._shift = price
+        centered = price - self._shift
+        for window in self.rolling_windows:
+            if self._count >= window:
+                old = self._back(window) - self._shift
+                self._sums[window] -= old
+                self._sumsq[window] -= old * old
+            self._sums[window] += centered
+            self._sumsq[window] += centered * centered
+        self._buffer[self._count % self.capacity] = price
+        self._count += 1
+        if self._count % (self.capacity * 64) == 0:
+            self._resync()
+
+    def _resync(self) -> None:
+        # Re-derive the running sums now and then so add/subtract rounding cannot drift,
+        # and re-centre them on the recent level in case prices moved far from the shift.
+        recent = self._buffer[(self._count - np.arange(1, min(self.capacity, self._count) + 1)) % self.capacity]
+        self._shift = float(recent.mean()) if len(recent) else 0.0
+        for window in self.rolling_windows:
+            values = recent[: min(window, self._count)] - self._shift
+            self._sums[window] = float(values.sum())
+            self._sumsq[window] = float((values * values).sum())
+
+    def feature_row(self, timestamp: pd.Timestamp) -> dict[str, float]:
+        row: dict[str, float] = {}
+        for lag in self.lags:
+            row[f"lag_{lag}"] = self._back(lag) if self._count >= lag else np.nan
+        for window in self.rolling_windows:
+            if self._count >= window:
+                centered_mean = self._sums[window] / window
+                var = max(self._sumsq[window] / window - centered_mean * centered_mean, 0.0)
+                row[f"roll_mean_{window}"] = self._shift + centered_mean
+                row[f"roll_std_{window}"] = float(np.sqrt(var))
+            else:
+                row[f"roll_mean_{window}"] = np.nan
+                row[f"roll_std_{window}"] = np.nan
+        ts = pd.Timestamp(timestamp)
+        row["hour"] = ts.hour
+        row["dayofweek"] = ts.dayofweek
+        row["month"] = ts.month
+        return row
+
+    def update(self, timestamp: pd.Timestamp, price: float) -> dict[str, float]:
+        """Feature row for ``timestamp`` (built before ``price`` is known), then push ``price``."""
+        row = self.feature_row(timestamp)
+        self.push(price)
+        return row
+
+    def update_batch(self, timestamps: pd.Series, prices: pd.Series) -> pd.DataFrame:
+        rows = [self.update(ts, price) for ts, price in zip(timestamps, prices)]
+        return pd.DataFrame(rows, columns=self.feature_names)
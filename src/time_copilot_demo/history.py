@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import secrets
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, so concurrent recorders are not serialized there.
+    fcntl = None
+
+import pandas as pd
+
+from time_copilot_demo.atomic import atomic_path
+
+HISTORY_DIR = "history"
+RUNS_FILE = "runs.parquet"
+# Predictions are by far the largest part of the store; by default only this many runs keep theirs.
+KEEP_PREDICTION_RUNS = 30
+# Per-run metric files in one market/task partition are merged once there are this many.
+COMPACT_AFTER_FILES = 16
+PRIMARY_METRICS = {"forecast": "smape", "rally": "pr_auc"}
+
+_METRIC_PARTITIONS = (("market", "string"), ("task", "string"))
+_PREDICTION_PARTITIONS = (("run_id", "string"), ("market", "string"), ("task", "string"), ("model", "string"))
+# One metric row per key; a compaction interrupted before removing its inputs leaves duplicates.
+_METRIC_KEY = ["run_id", "market", "task", "model", "metric"]
+
+
+def new_run_id() -> str:
+    """Sortable, unique run id: UTC start time plus a random suffix."""
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + secrets.token_hex(3)
+
+
+def _hive_dir(root: Path, keys: Iterable[tuple[str, str]]) -> Path:
+    for name, value in keys:
+        root = root / f"{name}={value}"
+    return root
+
+
+def _write_parquet(frame: pd.DataFrame, path: Path) -> None:
+    with atomic_path(path) as tmp:
+        frame.to_parquet(tmp, index=False)
+
+
+def _long_metrics(run_id: str, table: pd.DataFrame, champion: str) -> pd.DataFrame:
+    long = table.melt(id_vars="model", var_name="metric", value_name="value")
+    long.insert(0, "run_id", run_id)
+    long["value"] = long["value"].astype(float)
+    long["champion"] = long["model"] == champion
+    return long
+
+
+def append_market_run(
+    history_dir: Path,
+    *,
+    run_id: str,
+    market: str,
+    forecast_table: pd.DataFrame,
+    rally_table: pd.DataFrame,
+    forecast_preds: pd.DataFrame,
+    rally_preds: pd.DataFrame,
+    champions: dict[str, Any],
+) -> None:
+    """Append one market's results of run ``run_id`` to the history store.
+
+    ``metrics/market=<m>/task=<t>/<run_id>.parquet`` holds long-format
+    ``(run_id, model, metric, value, champion)`` rows; predictions go to
+    ``predictions/run_id=<r>/market=<m>/task=<t>/model=<model>/part-0.parquet``
+    as ``(timestamp, y_true, value)``. Nothing already stored is rewritten, except that
+    a partition's small per-run metric files are merged once it holds
+    ``COMPACT_AFTER_FILES`` of them.
+    """
+    history_dir = Path(history_dir)
+    for task, table, preds, suffix in (
+        ("forecast", forecast_table, forecast_preds, "_pred"),
+        ("rally", rally_table, rally_preds, "_prob"),
+    ):
+        numeric = table[["model", *table.select_dtypes("number").columns]]
+        partition = _hive_dir(history_dir / "metrics", [("market", market), ("task", task)])
+        _write_parquet(_long_metrics(run_id, numeric, str(champions[task]["model"])), partition / f"{run_id}.parquet")
+        if len(list(partition.glob("*.parquet"))) >= COMPACT_AFTER_FILES:
+            compact_partition(partition)
+        for model in table["model"]:
+            frame = pd.DataFrame(
+                {
+                    "timestamp": preds["timestamp"],
+                    "y_true": preds["y_true"],
+                    "value": preds[f"{model}{suffix}"],
+                }
+            )
+            keys = [("run_id", run_id), ("market", market), ("task", task), ("model", model)]
+            _write_parquet(frame, _hive_dir(history_dir / "predictions", keys) / "part-0.parquet")
+
+
+def compact_partition(partition: Path) -> Path:
+    """Merge a metrics partition's files into one, sorted by run, and remove the originals.
+
+    Safe to rerun after a crash between writing the merged file and removing the
+    originals: the rows they share are merged once, and readers drop them meanwhile.
+    """
+    files = sorted(Path(partition).glob("*.parquet"))
+    merged = (
+        pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+        .drop_duplicates(["run_id", "model", "metric"])
+        .sort_values(["run_id", "model", "metric"], kind="stable")
+    )
+    # Named after the newest run it holds, so later per-run files still sort after it.
+    target = Path(partition) / f"{merged['run_id'].iloc[-1]}.compact.parquet"
+    _write_parquet(merged, target)
+    for path in files:
+        if path != target:
+            path.unlink()
+    return target
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    # An exclusive lock on a sidecar file; the data file itself is replaced, so it cannot hold one.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def record_run(history_dir: Path, run_id: str, markets: list[str], *, keep_runs: int | None = None) -> None:
+    """Add ``run_id`` to the run index once all of its markets are stored.
+
+    With ``keep_runs``, predictions of all but the last ``keep_runs`` runs are then
+    removed (``prune_predictions``); their metrics stay. Concurrent runs recording into
+    one store take turns, so none of them drops another's index row.
+    """
+    path = Path(history_dir) / RUNS_FILE
+    row = pd.DataFrame(
+        [{"run_id": run_id, "finished_at": pd.Timestamp.now(tz="UTC"), "markets": ",".join(markets)}]
+    )
+    with _locked(path):
+        runs = pd.read_parquet(path) if path.exists() else pd.DataFrame(columns=["run_id", "finished_at", "markets"])
+        runs = pd.concat([runs[runs["run_id"] != run_id], row], ignore_index=True).sort_values("run_id")
+        _write_parquet(runs, path)
+        if keep_runs is not None:
+            prune_predictions(history_dir, keep_runs)
+
+
+def prune_predictions(history_dir: Path, keep_runs: int) -> list[str]:
+    """Remove ``predictions/run_id=<r>`` of completed runs older than the last ``keep_runs``.
+
+    Predictions are by far the largest part of the store. Runs not in the index yet
+    (possibly still writing) are left alone. Returns the pruned run ids.
+    """
+    if keep_runs < 1:
+        raise ValueError(f"keep_runs must be at least 1, got {keep_runs}")
+    runs = list_runs(history_dir)
+    pruned = []
+    for run_id in runs[: max(0, len(runs) - keep_runs)]:
+        path = Path(history_dir) / "predictions" / f"run_id={run_id}"
+        if path.exists():
+            shutil.rmtree(path, ignore_errors=True)
+            pruned.append(run_id)
+    return pruned
+
+
+def list_runs(history_dir: Path, last: int | None = None) -> list[str]:
+    """Completed run ids, oldest first (the ``last`` most recent ones if given)."""
+    path = Path(history_dir) / RUNS_FILE
+    if not path.exists():
+        return []
+    runs = pd.read_parquet(path, columns=["run_id"])["run_id"].tolist()
+    return runs[-last:] if last else runs
+
+
+def _dataset(root: Path, partitions: tuple[tuple[str, str], ...]):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in partitions])
+    return ds.dataset(root, format="parquet", partitioning=ds.partitioning(schema, flavor="hive"))
+
+
+def _filter(**values: Iterable[Any] | None):
+    import pyarrow.dataset as ds
+
+    expression = None
+    for name, allowed in values.items():
+        if allowed is None:
+            continue
+        term = ds.field(name).isin(list(allowed))
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def read_metrics(
+    history_dir: Path,
+    *,
+    runs: Iterable[str] | None = None,
+    markets: Iterable[str] | None = None,
+    tasks: Iterable[str] | None = None,
+    models: Iterable[str] | None = None,
+    metrics: Iterable[str] | None = None,
+    champions_only: bool = False,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Long-format metric rows matching every given filter, in one dataset scan.
+
+    ``markets``/``tasks`` prune partition directories; the other filters are pushed down
+    to the parquet reader, and only ``columns`` (default: all) and the row key are
+    materialised. Rows stored twice by an interrupted compaction are returned once.
+    """
+    root = Path(history_dir) / "metrics"
+    columns = columns or ["run_id", "market", "task", "model", "metric", "value", "champion"]
+    if not root.exists():
+        return pd.DataFrame(columns=columns)
+    expression = _filter(run_id=runs, market=markets, task=tasks, model=models, metric=metrics)
+    if champions_only:
+        import pyarrow.dataset as ds
+
+        term = ds.field("champion") == True  # noqa: E712 - a pyarrow expression, not a comparison
+        expression = term if expression is None else expression & term
+    read = list(dict.fromkeys([*columns, *_METRIC_KEY]))
+    frame = _dataset(root, _METRIC_PARTITIONS).to_table(columns=read, filter=expression).to_pandas()
+    frame = frame.drop_duplicates(_METRIC_KEY)[columns]
+    return frame.sort_values([c for c in ("run_id", "market", "task") if c in columns], kind="stable")
+
+
+def read_predictions(
+    history_dir: Path,
+    *,
+    run_id: str,
+    market: str,
+    task: str,
+    models: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """One run's predictions for ``market``/``task`` in long form (``model``, ``timestamp``, ...)."""
+    root = Path(history_dir) / "predictions"
+    expression = _filter(run_id=[run_id], market=[market], task=[task], model=models)
+    table = _dataset(root, _PREDICTION_PARTITIONS).to_table(
+        columns=["model", "timestamp", "y_true", "value"], filter=expression
+    )
+    return table.to_pandas()
+
+
+def run_tables(history_dir: Path, run_id: str, markets: Iterable[str] | None = None) -> dict[str, pd.DataFrame]:
+    """The benchmark tables of one run, wide as in ``<task>_benchmark.csv`` plus a leading ``market``.
+
+    Rows and metric columns keep the order they were written in, so models stay ranked.
+    """
+    long = read_metrics(history_dir, runs=[run_id], markets=markets, columns=["market", "task", "model", "metric", "value"])
+    tables = {}
+    for task in ("forecast", "rally"):
+        rows = long[long["task"] == task]
+        wide = rows.pivot(index=["market", "model"], columns="metric", values="value")
+        order = pd.MultiIndex.from_frame(rows[["market", "model"]].drop_duplicates())
+        wide = wide.reindex(index=order, columns=rows["metric"].unique())
+        tables[task] = wide.reset_index().rename_axis(columns=None)
+    return tables
+
+
+def load_summary_tables(artifacts_dir: Path, champion_summary: pd.DataFrame) -> dict[str, pd.DataFrame] | None:
+    """Tables of the run behind ``champion_summary`` from the history store, or None.
+
+    None when the summary predates the store, was written without recording history,
+    or its run is not in the store; callers then read the per-market CSVs.
+    """
+    history_dir = Path(artifacts_dir) / HISTORY_DIR
+    if "run_id" not in champion_summary.columns:
+        return None
+    run_id = str(champion_summary["run_id"].iloc[0])
+    if run_id not in list_runs(history_dir):
+        return None
+    return run_tables(history_dir, run_id, markets=champion_summary["market"].unique().tolist())
+
+
+def champion_history(history_dir: Path, last: int = 90, markets: Iterable[str] | None = None) -> pd.DataFrame:
+    """Champion model and primary metric of the ``last`` runs, one row per run, market and task."""
+    runs = list_runs(history_dir, last=last)
+    if not runs:
+        return pd.DataFrame(columns=["run_id", "market", "task", "model", "metric", "value"])
+    rows = read_metrics(
+        history_dir,
+        runs=runs,
+        markets=markets,
+        metrics=set(PRIMARY_METRICS.values()),
+        champions_only=True,
+        columns=["run_id", "market", "task", "model", "metric", "value"],
+    )
+    # Each task has one primary metric; drop the other task's metric of the same name, if any.
+    return rows[rows["metric"] == rows["task"].map(PRIMARY_METRICS)].reset_index(drop=True)
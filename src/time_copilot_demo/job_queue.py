@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Executor, Future
+from pathlib import Path
+from typing import Any, Callable
+
+from time_copilot_demo.parallel import native_thread_limit, threads_per_worker
+
+JOB_QUEUE_FILE = "jobs.sqlite"
+LEASE_SECONDS = 60.0
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result BLOB,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+"""
+
+
+class JobQueue:
+    """Pickled jobs in ``<root>/jobs.sqlite`` that any number of worker processes claim with leases.
+
+    A claimed job is ``leased`` to one worker until ``lease_expires``; workers renew the
+    lease while the job runs, so a job whose worker crashed (or lost its host) becomes
+    claimable again once the lease runs out. After ``max_attempts`` claims it is marked
+    ``failed`` instead of being handed out again. Results and errors are written back to
+    the same row. SQLite stands in for a broker here: it needs a filesystem with working
+    locks, which a single host (or a shared filesystem that supports them) provides. The
+    rollback journal is used rather than WAL, which only works with every process on
+    the same host.
+    """
+
+    def __init__(self, root: Path, *, max_attempts: int = MAX_ATTEMPTS) -> None:
+        # Absolute, since it reaches workers started from other directories (or hosts).
+        self.root = Path(root).resolve()
+        self.path = self.root / JOB_QUEUE_FILE
+        self.max_attempts = max_attempts
+        self.root.mkdir(parents=True, exist_ok=True)
+        db = self._connect()
+        try:
+            db.executescript(_SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        # Explicit, so a queue file created in WAL mode is switched back too.
+        db.execute("PRAGMA journal_mode=DELETE")
+        return db
+
+    def _transaction(self) -> _Transaction:
+        return _Transaction(self._connect())
+
+    def enqueue(self, fn: Callable[..., Any], *args: Any) -> int:
+        payload = pickle.dumps((fn, args), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._transaction() as db:
+            return int(db.execute("INSERT INTO jobs (payload) VALUES (?)", (payload,)).lastrowid)
+
+    def claim(self, worker: str, lease_seconds: float = LEASE_SECONDS) -> tuple[int, Callable[..., Any], tuple] | None:
+        """Lease the oldest pending or expired job to ``worker``; ``None`` when there is none."""
+        now = time.time()
+        with self._transaction() as db:
+            while True:
+                row = db.execute(
+                    "SELECT id, payload, attempts FROM jobs"
+                    " WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)"
+                    " ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, payload, attempts = row
+                if attempts >= self.max_attempts:
+                    # Every earlier claim ended with its worker gone; stop handing it out.
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', payload = x'', error = ? WHERE id = ?",
+                        (f"worker lost {attempts} times (lease expired)", job_id),
+                    )
+                    continue
+                db.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1"
+                    " WHERE id = ?",
+                    (worker, now + lease_seconds, job_id),
+                )
+                try:
+                    fn, args = pickle.loads(payload)
+                except Exception:
+                    # E.g. its function does not import here; every other worker would fail alike.
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', payload = x'', error = ?, lease_expires = NULL"
+                        " WHERE id = ?",
+                        (f"payload could not be unpickled:\n{traceback.format_exc()}", job_id),
+                    )
+                    continue
+                return job_id, fn, args
+
+    def renew(self, job_id: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend ``worker``'s lease on ``job_id``; False if the lease was lost meanwhile."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'leased' AND worker = ?",
+                (time.time() + lease_seconds, job_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: Any) -> bool:
+        """Store ``result``; ignored (False) if the lease expired and the job went to another worker."""
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        return self._finish(job_id, worker, "done", result=blob)
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        # Exceptions raised by the job itself are deterministic, so they are not retried.
+        return self._finish(job_id, worker, "failed", error=error)
+
+    def _finish(
+        self, job_id: int, worker: str, status: str, *, result: bytes | None = None, error: str | None = None
+    ) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, payload = x'', result = ?, error = ?, lease_expires = NULL"
+                " WHERE id = ? AND status = 'leased' AND worker = ?",
+                (status, result, error, job_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def collect(self, job_ids: list[int]) -> dict[int, tuple[str, Any]]:
+        """Finished jobs among ``job_ids`` as ``{id: (status, result or error)}``, removed from the queue."""
+        if not job_ids:
+            return {}
+        finished: dict[int, tuple[str, Any]] = {}
+        with self._transaction() as db:
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start : start + 500]
+                where = f"id IN ({','.join('?' * len(chunk))}) AND status IN ('done', 'failed')"
+                rows = db.execute(f"SELECT id, status, result, error FROM jobs WHERE {where}", chunk).fetchall()
+                for job_id, status, result, error in rows:
+                    finished[job_id] = (status, pickle.loads(result) if status == "done" else error)
+                db.execute(f"DELETE FROM jobs WHERE {where}", chunk)
+        return finished
+
+    def cancel(self, job_ids: list[int]) -> list[int]:
+        """Remove the jobs among ``job_ids`` that no worker has claimed yet; returns their ids."""
+        cancelled: list[int] = []
+        with self._transaction() as db:
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start : start + 500]
+                where = f"id IN ({','.join('?' * len(chunk))}) AND status = 'pending'"
+                cancelled += [row[0] for row in db.execute(f"SELECT id FROM jobs WHERE {where}", chunk)]
+                db.execute(f"DELETE FROM jobs WHERE {where}", chunk)
+        return cancelled
+
+    def counts(self) -> dict[str, int]:
+        with self._transaction() as db:
+            return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+class _Transaction:
+    # ``BEGIN IMMEDIATE`` takes the write lock up front, so two workers never claim the same row.
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type: object, *exc: object) -> None:
+        try:
+            self.db.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        finally:
+            self.db.close()
+
+
+class QueueExecutor(Executor):
+    """``concurrent.futures`` executor whose jobs run in ``work`` processes of a ``JobQueue``.
+
+    Passing one as ``executor`` to ``run_jobs`` (and so to the benchmark) enqueues every
+    job instead of running it locally; a poller thread resolves futures as results come
+    back. ``shared_dir`` is under the queue's root, so ``SharedFrame`` copies of the
+    feature frame land where every worker of the queue can map them.
+    """
+
+    def __init__(self, queue: JobQueue, *, poll_seconds: float = 0.2) -> None:
+        self.queue = queue
+        self.poll_seconds = poll_seconds
+        self.shared_dir = queue.root / "shared"
+        self._futures: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._shutdown = threading.Event()
+        self._poller: threading.Thread | None = None
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        if kwargs:
+            raise TypeError("QueueExecutor jobs take positional arguments only")
+        if self._shutdown.is_set():
+            raise RuntimeError("cannot submit to a QueueExecutor after shutdown")
+        future: Future = Future()
+        job_id = self.queue.enqueue(fn, *args)
+        with self._lock:
+            self._futures[job_id] = future
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="job-queue-poller", daemon=True)
+                self._poller.start()
+        return future
+
+    def _poll(self) -> None:
+        try:
+            self._poll_until_shutdown()
+        except Exception as exc:
+            # Without the poller nothing would ever resolve them; fail the callers instead of hanging.
+            with self._lock:
+                failed, self._futures = self._futures, {}
+                self._poller = None
+            for job_id, future in failed.items():
+                future.set_exception(RuntimeError(f"lost track of queued job {job_id}: {exc!r}"))
+
+    def _poll_until_shutdown(self) -> None:
+        while True:
+            with self._lock:
+                pending = list(self._futures)
+            if not pending and self._shutdown.is_set():
+                return
+            for job_id, (status, value) in self.queue.collect(pending).items():
+                with self._lock:
+                    future = self._futures.pop(job_id)
+                if status == "done":
+                    future.set_result(value)
+                else:
+                    future.set_exception(RuntimeError(f"queued job {job_id} failed:\n{value}"))
+            time.sleep(self.poll_seconds)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        if cancel_futures:
+            # Jobs a worker already holds run to completion, as in ``ProcessPoolExecutor``.
+            with self._lock:
+                cancelled = [(job_id, self._futures.pop(job_id)) for job_id in self.queue.cancel(list(self._futures))]
+            for _, future in cancelled:
+                future.cancel()
+        self._shutdown.set()
+        poller = self._poller
+        if wait and poller is not None:
+            poller.join()
+
+
+def _renew_until(queue: JobQueue, job_id: int, worker: str, lease_seconds: float, done: threading.Event) -> None:
+    while not done.wait(lease_seconds / 3):
+        if not queue.renew(job_id, worker, lease_seconds):
+            return
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def work(
+    queue_dir: Path,
+    *,
+    lease_seconds: float = LEASE_SECONDS,
+    idle_timeout: float | None = None,
+    poll_seconds: float = 0.5,
+    max_jobs: int | None = None,
+    host_workers: int = 1,
+) -> int:
+    """Claim and run jobs from the queue under ``queue_dir``; returns how many this worker ran.
+
+    Stops after ``max_jobs`` jobs or once nothing was claimable for ``idle_timeout``
+    seconds (``None`` keeps polling). A background thread renews the lease of the
+    running job every ``lease_seconds / 3``. Jobs get this host's cores split across
+    its ``host_workers`` worker processes as their native thread cap.
+    """
+    with native_thread_limit(threads_per_worker(host_workers)):
+        return _work(queue_dir, lease_seconds, idle_timeout, poll_seconds, max_jobs)
+
+
+def _work(
+    queue_dir: Path, lease_seconds: float, idle_timeout: float | None, poll_seconds: float, max_jobs: int | None
+) -> int:
+    queue = JobQueue(queue_dir)
+    worker = _worker_id()
+    n_done = 0
+    idle_since = time.monotonic()
+    while max_jobs is None or n_done < max_jobs:
+        claimed = queue.claim(worker, lease_seconds)
+        if claimed is None:
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                break
+            time.sleep(poll_seconds)
+            continue
+        job_id, fn, args = claimed
+        done = threading.Event()
+        renewer = threading.Thread(
+            target=_renew_until, args=(queue, job_id, worker, lease_seconds, done), daemon=True
+        )
+        renewer.start()
+        try:
+            result = fn(*args)
+        except Exception:
+            queue.fail(job_id, worker, traceback.format_exc())
+        else:
+            queue.complete(job_id, worker, result)
+        finally:
+            done.set()
+            renewer.join()
+        n_done += 1
+        idle_since = time.monotonic()
+    return n_done
+
+
+def start_local_workers(queue_dir: Path, n_workers: int, **options: Any) -> list[multiprocessing.Process]:
+    """Start ``n_workers`` ``work`` processes on this host (``options`` as for ``work``)."""
+    # Spawned, not forked: the coordinator is multi-threaded by the time workers start.
+    context = multiprocessing.get_context("spawn")
+    options = {"host_workers": n_workers, **options}
+    workers = [
+        context.Process(target=work, args=(queue_dir,), kwargs=options, name=f"job-queue-worker-{i}", daemon=True)
+        for i in range(n_workers)
+    ]
+    for process in workers:
+        process.start()
+    return workers
+
+
+def stop_workers(workers: list[multiprocessing.Process]) -> None:
+    for process in workers:
+        process.terminate()
+    for process in workers:
+        process.join()
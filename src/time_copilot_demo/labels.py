@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import pandas as pd
 
+from time_copilot_demo.rolling import trailing_quantile_grid
+
 
 def build_rally_labels(
     price: pd.Series, *, quantile: float = 0.95, lookback: int = 24 * 30
@@ -17,3 +19,22 @@ def label_future_rally(rally: pd.Series, *, horizon: int = 24) -> pd.Series:
     future_max = rally.shift(-1).rolling(window=horizon, min_periods=1).max()
     return future_max.fillna(0).astype(int).rename("target_future_rally")
 
+
+def build_rally_label_grid(
+    price: pd.Series,
+    *,
+    quantiles: tuple[float, ...] = (0.9, 0.95, 0.99),
+    lookbacks: tuple[int, ...] = (24 * 7, 24 * 30, 24 * 90),
+) -> pd.DataFrame:
+    """Rally labels for every quantile/lookback pair from a single pass over ``price``.
+
+    Column ``rally_q{q}_lb{lookback}`` equals ``build_rally_labels(price, quantile=q, lookback=lookback)``.
+    """
+    thresholds = trailing_quantile_grid(price.to_numpy(dtype=float), quantiles=quantiles, lookbacks=lookbacks)
+    values = price.to_numpy(dtype=float)
+    columns = {
+        f"rally_q{q:g}_lb{lookback}": (values >= thresholds[(lookback, q)]).astype(int)
+        for lookback in lookbacks
+        for q in quantiles
+    }
+    return pd.DataFrame(columns, index=price.index)
@@ -1,13 +1,55 @@
 from __future__ import annotations
 
+import importlib
+from typing import Any
+
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
-from sklearn.linear_model import ElasticNet, LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
 
-from time_copilot_demo.dnn import fit_predict_dnn_classification, fit_predict_dnn_regression
+from time_copilot_demo.dnn import DNNTrainConfig, fit_dnn_classification, fit_dnn_regression
+from time_copilot_demo.shared_frame import materialize
+
+FORECAST_MODEL_PARAMS: dict[str, dict[str, Any]] = {
+    "naive": {},
+    "lear": {"alpha": 0.001, "l1_ratio": 0.9, "max_iter": 3000},
+    "gbdt_reg": {"max_depth": 6, "max_iter": 80, "learning_rate": 0.05},
+    "dnn_reg": {"max_epochs": 60, "batch_size": 512, "validation_fraction": 0.1, "patience": 5},
+}
+RALLY_MODEL_PARAMS: dict[str, dict[str, Any]] = {
+    "naive": {},
+    "logreg": {"max_iter": 1000, "class_weight": "balanced"},
+    "gbdt_cls": {"max_depth": 6, "max_iter": 80, "learning_rate": 0.05},
+    "dnn_cls": {"max_epochs": 60, "batch_size": 512, "validation_fraction": 0.1, "patience": 5},
+}
+
+# Candidate values per hyperparameter for ``tuning.tune_models``; models without an entry are not tuned.
+FORECAST_SEARCH_SPACES: dict[str, dict[str, list[Any]]] = {
+    "lear": {"alpha": [1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2], "l1_ratio": [0.1, 0.5, 0.9, 1.0]},
+    "gbdt_reg": {
+        "max_depth": [3, 4, 6, 8, None],
+        "max_iter": [50, 80, 150, 300],
+        "learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "min_samples_leaf": [10, 20, 50],
+    },
+    "dnn_reg": {"learning_rate": [3e-4, 1e-3, 3e-3], "batch_size": [256, 512, 1024]},
+}
+RALLY_SEARCH_SPACES: dict[str, dict[str, list[Any]]] = {
+    "logreg": {"C": [0.01, 0.1, 1.0, 10.0], "class_weight": ["balanced", None]},
+    "gbdt_cls": {
+        "max_depth": [3, 4, 6, 8, None],
+        "max_iter": [50, 80, 150, 300],
+        "learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "min_samples_leaf": [10, 20, 50],
+    },
+    "dnn_cls": {"learning_rate": [3e-4, 1e-3, 3e-3], "batch_size": [256, 512, 1024]},
+}
+# Modules each model imports lazily at fit time; see ``import_model_modules``.
+_MODEL_MODULES: dict[str, tuple[str, ...]] = {
+    "lear": ("sklearn.linear_model", "sklearn.pipeline", "sklearn.preprocessing"),
+    "logreg": ("sklearn.linear_model", "sklearn.pipeline", "sklearn.preprocessing"),
+    "gbdt_reg": ("sklearn.ensemble",),
+    "gbdt_cls": ("sklearn.ensemble",),
+}
 
 
 def available_forecast_models() -> tuple[str, ...]:
@@ -18,66 +60,159 @@ def available_rally_models() -> tuple[str, ...]:
     return ("naive", "logreg", "gbdt_cls", "dnn_cls")
 
 
-def predict_forecast(
-    model_name: str, X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame
-) -> np.ndarray:
+def model_params(task: str, model_name: str, overrides: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Default hyperparameters of a registry model, updated with ``overrides`` (e.g. tuned values)."""
+    catalog = FORECAST_MODEL_PARAMS if task == "forecast" else RALLY_MODEL_PARAMS
+    if model_name not in catalog:
+        raise ValueError(f"Unknown {task} model: {model_name}")
+    return {**catalog[model_name], **(overrides or {})}
+
+
+def search_space(task: str, model_name: str) -> dict[str, list[Any]]:
+    model_params(task, model_name)
+    spaces = FORECAST_SEARCH_SPACES if task == "forecast" else RALLY_SEARCH_SPACES
+    return {name: list(values) for name, values in spaces.get(model_name, {}).items()}
+
+
+def import_model_modules(model_name: str) -> None:
+    """Import a model's heavy dependencies up front, e.g. so fit timings exclude import time."""
+    for module in _MODEL_MODULES.get(model_name, ()):
+        importlib.import_module(module)
+
+
+class NaiveForecaster:
+    """Persistence forecast from ``lag_1``, falling back to the training mean."""
+
+    def fit(self, X: pd.DataFrame, y: pd.Series) -> NaiveForecaster:
+        self.mean_ = float(y.mean())
+        return self
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        if "lag_1" in X.columns:
+            return X["lag_1"].to_numpy(dtype=float)
+        return np.full(len(X), self.mean_)
+
+
+class BaseRateClassifier:
+    """Predicts the training positive rate for every row."""
+
+    def fit(self, X: pd.DataFrame, y: pd.Series) -> BaseRateClassifier:
+        self.rate_ = float(y.mean())
+        return self
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        return np.column_stack([np.full(len(X), 1.0 - self.rate_), np.full(len(X), self.rate_)])
+
+
+def fit_forecast_model(
+    model_name: str, X_train: pd.DataFrame, y_train: pd.Series, params: dict[str, Any] | None = None
+) -> Any:
+    params = model_params("forecast", model_name, params)
+
     if model_name == "naive":
-        if "lag_1" in X_test.columns:
-            return X_test["lag_1"].to_numpy(dtype=float)
-        return np.full(len(X_test), float(y_train.mean()))
+        return NaiveForecaster().fit(X_train, y_train)
 
+    # sklearn estimators are imported per model so the naive baselines and CLI startup stay light.
     if model_name == "lear":
+        from sklearn.linear_model import ElasticNet
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
         # LEAR-like high-dimensional linear autoregressive baseline.
         model = Pipeline(
             steps=[
                 ("scale", StandardScaler()),
-                (
-                    "reg",
-                    ElasticNet(
-                        alpha=0.001,
-                        l1_ratio=0.9,
-                        max_iter=3000,
-                        random_state=7,
-                    ),
-                ),
+                ("reg", ElasticNet(**params, random_state=7)),
             ]
         )
-        model.fit(X_train, y_train)
-        return model.predict(X_test)
+        return model.fit(X_train, y_train)
 
     if model_name == "gbdt_reg":
-        model = HistGradientBoostingRegressor(max_depth=6, max_iter=80, learning_rate=0.05, random_state=7)
-        model.fit(X_train, y_train)
-        return model.predict(X_test)
+        from sklearn.ensemble import HistGradientBoostingRegressor
 
-    if model_name == "dnn_reg":
-        return fit_predict_dnn_regression(X_train, y_train, X_test)
+        return HistGradientBoostingRegressor(**params, random_state=7).fit(X_train, y_train)
 
-    raise ValueError(f"Unknown forecast model: {model_name}")
+    return fit_dnn_regression(X_train, y_train, DNNTrainConfig(**params))
 
 
-def predict_rally_probability(
-    model_name: str, X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame
-) -> np.ndarray:
+def fit_rally_model(
+    model_name: str, X_train: pd.DataFrame, y_train: pd.Series, params: dict[str, Any] | None = None
+) -> Any:
+    params = model_params("rally", model_name, params)
+
     if model_name == "naive":
-        return np.full(len(X_test), float(y_train.mean()))
+        return BaseRateClassifier().fit(X_train, y_train)
 
     if model_name == "logreg":
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
         model = Pipeline(
             steps=[
                 ("scale", StandardScaler()),
-                ("clf", LogisticRegression(max_iter=1000, class_weight="balanced")),
+                ("clf", LogisticRegression(**params)),
             ]
         )
-        model.fit(X_train, y_train)
-        return model.predict_proba(X_test)[:, 1]
+        return model.fit(X_train, y_train)
 
     if model_name == "gbdt_cls":
-        model = HistGradientBoostingClassifier(max_depth=6, max_iter=80, learning_rate=0.05, random_state=7)
-        model.fit(X_train, y_train)
-        return model.predict_proba(X_test)[:, 1]
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        return HistGradientBoostingClassifier(**params, random_state=7).fit(X_train, y_train)
+
+    return fit_dnn_classification(X_train, y_train, DNNTrainConfig(**params))
+
+
+def predict_forecast_model(model: Any, X_test: pd.DataFrame) -> np.ndarray:
+    return np.asarray(model.predict(X_test), dtype=float)
+
+
+def predict_rally_model(model: Any, X_test: pd.DataFrame) -> np.ndarray:
+    return np.asarray(model.predict_proba(X_test)[:, 1], dtype=float)
+
+
+def fit_model(
+    task: str, model_name: str, X_train: pd.DataFrame, y_train: pd.Series, params: dict[str, Any] | None = None
+) -> Any:
+    X_train, y_train = materialize(X_train), materialize(y_train)
+    if task == "forecast":
+        return fit_forecast_model(model_name, X_train, y_train, params)
+    if task == "rally":
+        return fit_rally_model(model_name, X_train, y_train, params)
+    raise ValueError(f"Unknown task: {task}")
+
+
+def predict_model(task: str, model: Any, X_test: pd.DataFrame) -> np.ndarray:
+    X_test = materialize(X_test)
+    if task == "forecast":
+        return predict_forecast_model(model, X_test)
+    return predict_rally_model(model, X_test)
+
+
+def predict_forecast(
+    model_name: str, X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame
+) -> np.ndarray:
+    return predict_forecast_model(fit_forecast_model(model_name, X_train, y_train), X_test)
+
+
+def predict_rally_probability(
+    model_name: str, X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame
+) -> np.ndarray:
+    return predict_rally_model(fit_rally_model(model_name, X_train, y_train), X_test)
+
+
+def predict_task(
+    task: str,
+    model_name: str,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_test: pd.DataFrame,
+    params: dict[str, Any] | None = None,
+) -> np.ndarray:
+    return predict_model(task, fit_model(task, model_name, X_train, y_train, params), X_test)
 
-    if model_name == "dnn_cls":
-        return fit_predict_dnn_classification(X_train, y_train, X_test)
 
-    raise ValueError(f"Unknown rally model: {model_name}")
+def rally_decision_threshold(model_name: str, y_train: pd.Series) -> float:
+    # The constant naive probability never crosses 0.5, so threshold it at the base rate.
+    return float(y_train.mean()) if model_name == "naive" else 0.5
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from time_copilot_demo.atomic import atomic_path
+from time_copilot_demo.feature_cache import evict_least_recently_used
+from time_copilot_demo.model_registry import fit_model, model_params
+
+# Bump whenever a registry model's construction changes so old artifacts are not reused.
+MODEL_CODE_VERSION = "2"
+# Per-market cap on stored artifacts; least-recently-used ones are deleted beyond it.
+MODEL_STORE_MAX_BYTES = 512 * 2**20
+
+
+def training_data_hash(X_train: pd.DataFrame, y_train: pd.Series) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(map(str, X_train.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(X_train, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y_train, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """Fitted-model artifacts keyed by training data hash, model and hyperparameters.
+
+    Files live under ``artifacts/<market>/models/`` as ``<task>_<model>_<key>.joblib``.
+    sklearn estimators are pickled whole; torch models are pickled as CPU state dicts.
+    Like ``FeatureCache``, artifacts are evicted least-recently-used first once the
+    directory exceeds ``max_bytes``; a run touches every model it uses, so models of
+    older data go first.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = MODEL_STORE_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def key(self, task: str, model_name: str, data_hash: str, params: dict[str, Any] | None = None) -> str:
+        payload = {
+            "task": task,
+            "model": model_name,
+            "params": model_params(task, model_name, params),
+            "data": data_hash,
+            "code_version": MODEL_CODE_VERSION,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+    def path(self, task: str, model_name: str, key: str) -> Path:
+        return self.root / f"{task}_{model_name}_{key}.joblib"
+
+    def load(self, path: Path) -> Any:
+        import joblib
+
+        return joblib.load(path)
+
+    def save(self, path: Path, model: Any) -> None:
+        import joblib
+
+        with atomic_path(path) as tmp:
+            joblib.dump(model, tmp)
+        evict_least_recently_used(self.root, "*.joblib", self.max_bytes, keep=path)
+
+    def get_or_fit(
+        self,
+        task: str,
+        model_name: str,
+        X_train: pd.DataFrame,
+        y_train: pd.Series,
+        params: dict[str, Any] | None = None,
+        fit: Callable[..., Any] = fit_model,
+    ) -> tuple[Any, Path]:
+        """Return the stored model for this training set and hyperparameters.
+
+        On a miss the model is fitted with ``fit(task, model_name, X_train, y_train, params)`` and saved.
+        """
+        key = self.key(task, model_name, training_data_hash(X_train, y_train), params)
+        path = self.path(task, model_name, key)
+        try:
+            model = self.load(path)
+            os.utime(path)
+            return model, path
+        except FileNotFoundError:  # never stored, or evicted meanwhile
+            pass
+        model = fit(task, model_name, X_train, y_train, params)
+        self.save(path, model)
+        return model, path
+
+
+def load_champion_model(market_dir: Path, task: str) -> Any:
+    """Load the persisted champion for ``task`` recorded in ``champions.json``."""
+    champions = json.loads((Path(market_dir) / "champions.json").read_text(encoding="utf-8"))
+    artifact = champions.get("artifacts", {}).get(task)
+    if artifact is None:
+        raise FileNotFoundError(f"no persisted {task} champion in {market_dir}; rerun with the model store enabled")
+    return ModelStore(Path(market_dir) / "models").load(Path(market_dir) / artifact)
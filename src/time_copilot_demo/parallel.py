@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Sequence
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+# Cap set by ``native_thread_limit`` or a pool initializer in this process, if any.
+_active_thread_limit: int | None = None
+
+
+def threads_per_worker(max_workers: int) -> int:
+    """Split the visible cores evenly so concurrent jobs do not oversubscribe them."""
+    return max(1, cpu_count() // max(1, max_workers))
+
+
+def thread_budget() -> int:
+    """Native threads a job in this process may use: the active cap, else every visible core."""
+    if _active_thread_limit is not None:
+        return _active_thread_limit
+    return threads_per_worker(1)
+
+
+@contextmanager
+def native_thread_limit(n_threads: int | None) -> Iterator[None]:
+    """Cap BLAS/OpenMP and torch intra-op threads for the duration of the block."""
+    global _active_thread_limit
+    if n_threads is None:
+        yield
+        return
+
+    from threadpoolctl import threadpool_limits
+
+    torch = sys.modules.get("torch")
+    previous_torch = torch.get_num_threads() if torch is not None else None
+    previous_limit = _active_thread_limit
+    with threadpool_limits(limits=n_threads):
+        if torch is not None:
+            torch.set_num_threads(n_threads)
+        _active_thread_limit = n_threads
+        try:
+            yield
+        finally:
+            _active_thread_limit = previous_limit
+            if torch is not None:
+                torch.set_num_threads(previous_torch)
+
+
+class MemoryBudget:
+    """Admit work while the summed byte estimates of running items stay under a cap.
+
+    An item larger than the whole cap is still admitted once nothing else is running,
+    so an oversized market runs alone instead of deadlocking.
+    """
+
+    def __init__(self, limit_bytes: int | None) -> None:
+        self.limit_bytes = limit_bytes
+        self.in_use = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, n_bytes: int) -> Iterator[None]:
+        with self._cond:
+            if self.limit_bytes is not None:
+                self._cond.wait_for(lambda: self.in_use == 0 or self.in_use + n_bytes <= self.limit_bytes)
+            self.in_use += n_bytes
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_use -= n_bytes
+                self._cond.notify_all()
+
+
+def _init_worker(n_threads: int) -> None:
+    global _active_thread_limit
+    # Env vars only take effect for libraries loaded after this point, so the
+    # runtime limit below covers the ones inherited from a forked parent.
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=n_threads)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(n_threads)
+    _active_thread_limit = n_threads
+
+
+def make_executor(max_workers: int) -> ProcessPoolExecutor:
+    n_threads = threads_per_worker(max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(n_threads,))
+
+
+def _limited_call(fn: Callable[..., Any], n_workers: int, parent_pid: int, args: tuple) -> Any:
+    # Thread workers share the parent's limit, and pool or queue workers set their own.
+    # Any other process splits its own cores (possibly another host's) across ``n_workers``.
+    if os.getpid() == parent_pid or _active_thread_limit is not None:
+        return fn(*args)
+    with native_thread_limit(threads_per_worker(n_workers)):
+        return fn(*args)
+
+
+def uses_processes(max_workers: int | None = None, executor: Executor | None = None) -> bool:
+    """Whether ``run_jobs`` with these arguments runs jobs off the calling thread."""
+    return executor is not None or (max_workers is not None and max_workers > 1)
+
+
+def run_jobs(
+    fn: Callable[..., Any],
+    jobs: Sequence[tuple],
+    *,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> list[Any]:
+    """Run ``fn(*job)`` for every job and return results in submission order.
+
+    Runs inline when neither ``max_workers`` (> 1) nor ``executor`` is given.
+    Without an explicit executor a process pool with per-worker thread caps is used;
+    with one, ``max_workers`` should give its size so thread caps can be derived.
+    """
+    if not uses_processes(max_workers, executor):
+        return [fn(*job) for job in jobs]
+
+    workers = max_workers or cpu_count()
+    owned = executor is None
+    if owned:
+        workers = min(workers, max(1, len(jobs)))
+    # A shared executor may be busy with other callers' jobs, so budget for all of its workers.
+    n_threads = threads_per_worker(workers)
+    parent_pid = os.getpid()
+    pool = make_executor(workers) if owned else executor
+    try:
+        with native_thread_limit(n_threads):
+            futures = [pool.submit(_limited_call, fn, workers, parent_pid, job) for job in jobs]
+            return [future.result() for future in futures]
+    finally:
+        if owned:
+            pool.shutdown()
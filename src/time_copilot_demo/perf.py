@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pandas as pd
+
+from time_copilot_demo.champion import pick_forecast_champion, pick_rally_champion
+from time_copilot_demo.evaluate import classification_metrics, forecast_metrics
+from time_copilot_demo.features import build_features
+from time_copilot_demo.labels import build_rally_label_grid, build_rally_labels, label_future_rally
+from time_copilot_demo.model_registry import (
+    available_forecast_models,
+    available_rally_models,
+    fit_model,
+    predict_model,
+    rally_decision_threshold,
+)
+
+PERF_SIZES: dict[str, int] = {
+    "120d": 24 * 120,
+    "2y": 24 * 365 * 2,
+    "10y": 24 * 365 * 10,
+}
+PERF_BASELINE_VERSION = 1
+# Quantile/lookback grid timed by the ``rally_label_grid`` stages.
+RALLY_GRID_QUANTILES = (0.9, 0.95, 0.99)
+RALLY_GRID_LOOKBACKS = (24 * 7, 24 * 30, 24 * 90)
+# Untimed pass that pays for lazy imports (sklearn, matplotlib) and first-call setup.
+_WARMUP_HOURS = 24 * 60
+
+_PROC_STATUS = Path("/proc/self/status")
+_PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def _read_vm_hwm_bytes() -> int | None:
+    try:
+        match = re.search(r"^VmHWM:\s+(\d+) kB", _PROC_STATUS.read_text(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(match.group(1)) * 1024 if match else None
+
+
+def _reset_vm_hwm() -> bool:
+    # Writing "5" resets the kernel's resident-set high-water mark to the current RSS (Linux).
+    try:
+        _PROC_CLEAR_REFS.write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def _release_free_heap() -> None:
+    # Return freed malloc memory to the OS (glibc), so a stage that reuses it still shows as growth.
+    try:
+        import ctypes
+
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+# ``track_resources`` blocks in progress in this process, across threads.
+_active_lock = threading.Lock()
+_active_blocks = 0
+
+
+@dataclass
+class ResourceUsage:
+    seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+    # Peak resident memory above the RSS at entry: what the block itself allocated.
+    rss_growth_mb: float = 0.0
+
+
+@contextmanager
+def track_resources() -> Iterator[ResourceUsage]:
+    """Fill the yielded ``ResourceUsage`` with the block's wall time and peak memory.
+
+    On Linux the process RSS high-water mark is reset on entry, so ``peak_rss_mb`` is the
+    peak resident set reached inside the block. The mark is process-wide, so it is only
+    reset when no other block is being measured: a block that overlaps others (threads
+    of one process, or nesting) keeps the mark from the earliest of them and reports an
+    upper bound that includes their memory, never a reset-away undercount. Elsewhere it
+    falls back to the tracemalloc peak on top of the lifetime max RSS, which misses
+    native allocations that bypass Python.
+    """
+    global _active_blocks
+    usage = ResourceUsage()
+    with _active_lock:
+        alone = _active_blocks == 0
+        _active_blocks += 1
+        use_hwm = (_reset_vm_hwm() if alone else _PROC_CLEAR_REFS.exists()) and _read_vm_hwm_bytes() is not None
+        if use_hwm:
+            entry_bytes = _read_vm_hwm_bytes() or 0
+        else:
+            import resource
+
+            entry_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        yield usage
+    finally:
+        usage.seconds = time.perf_counter() - started
+        with _active_lock:
+            _active_blocks -= 1
+            if use_hwm:
+                peak = _read_vm_hwm_bytes() or entry_bytes
+            else:
+                peak = entry_bytes + tracemalloc.get_traced_memory()[1]
+                # Tracing is process-wide too; the last block out stops it.
+                if _active_blocks == 0:
+                    tracemalloc.stop()
+        usage.peak_rss_mb = peak / 2**20
+        usage.rss_growth_mb = (peak - entry_bytes) / 2**20
+
+
+@dataclass
+class StageResult:
+    size: str
+    stage: str
+    rows: int
+    seconds: float
+    peak_rss_mb: float
+    rss_growth_mb: float
+
+
+@contextmanager
+def measure_stage(size: str, stage: str, rows: int, results: list[StageResult]) -> Iterator[None]:
+    """Append the block's ``track_resources`` usage to ``results`` as a ``StageResult``."""
+    gc.collect()
+    _release_free_heap()
+    with track_resources() as usage:
+        yield
+    results.append(StageResult(size, stage, rows, usage.seconds, usage.peak_rss_mb, usage.rss_growth_mb))
+
+
+def _write_report_artifacts(
+    artifacts_dir: Path,
+    market: str,
+    forecast_rows: list[dict[str, Any]],
+    rally_rows: list[dict[str, Any]],
+    rally_preds: pd.DataFrame,
+) -> None:
+    # Same files run_market_benchmark writes, so the report and chart stages see real-sized inputs.
+    market_dir = artifacts_dir / market
+    market_dir.mkdir(parents=True, exist_ok=True)
+    forecast_table = pd.DataFrame(forecast_rows).sort_values(["smape", "mae"]).reset_index(drop=True)
+    rally_table = (
+        pd.DataFrame(rally_rows).sort_values(["pr_auc", "brier"], ascending=[False, True]).reset_index(drop=True)
+    )
+    forecast_table.to_csv(market_dir / "forecast_benchmark.csv", index=False)
+    rally_table.to_csv(market_dir / "rally_benchmark.csv", index=False)
+    rally_preds.to_parquet(market_dir / "rally_predictions.parquet", index=False)
+
+    forecast_champion = pick_forecast_champion(forecast_table)
+    rally_champion = pick_rally_champion(rally_table)
+    pd.DataFrame(
+        [
+            {"market": market, "task": "forecast", "model": forecast_champion["model"],
+             "primary_metric": "smape", "primary_value": forecast_champion["smape"]},
+            {"market": market, "task": "rally", "model": rally_champion["model"],
+             "primary_metric": "pr_auc", "primary_value": rally_champion["pr_auc"]},
+        ]
+    ).to_csv(artifacts_dir / "champion_summary.csv", index=False)
+
+
+def run_size(
+    size: str,
+    n_hours: int,
+    *,
+    forecast_models: list[str] | None = None,
+    rally_models: list[str] | None = None,
+    horizon: int = 24,
+    work_dir: Path | None = None,
+) -> list[StageResult]:
+    """Time every pipeline stage once on ``synthetic_pjm_like(n_hours)``."""
+    # The pipeline imports this module for its resource tracking, so import it lazily.
+    from time_copilot_demo.charts import generate_chart_pack
+    from time_copilot_demo.pipeline import (
+        RALLY_LOOKBACK,
+        RALLY_QUANTILE,
+        SUPERVISED_LAGS,
+        SUPERVISED_WINDOWS,
+        _build_supervised_frame,
+        _train_test_split,
+        synthetic_pjm_like,
+    )
+    from time_copilot_demo.reporting import write_dual_market_report
+
+    if forecast_models is None:
+        forecast_models = list(available_forecast_models())
+    if rally_models is None:
+        rally_models = list(available_rally_models())
+
+    results: list[StageResult] = []
+    df = synthetic_pjm_like(n_hours)
+    price = df["price"]
+
+    with measure_stage(size, "build_features", n_hours, results):
+        build_features(df, lags=SUPERVISED_LAGS, rolling_windows=SUPERVISED_WINDOWS)
+    with measure_stage(size, "build_rally_labels", n_hours, results):
+        rally = build_rally_labels(price, quantile=RALLY_QUANTILE, lookback=RALLY_LOOKBACK)
+    with measure_stage(size, "label_future_rally", n_hours, results):
+        label_future_rally(rally, horizon=horizon)
+    # The single-sweep grid next to the per-pair pandas rolling quantiles it replaces.
+    with measure_stage(size, "rally_label_grid", n_hours, results):
+        build_rally_label_grid(price, quantiles=RALLY_GRID_QUANTILES, lookbacks=RALLY_GRID_LOOKBACKS)
+    with measure_stage(size, "rally_label_grid.pandas", n_hours, results):
+        for lookback in RALLY_GRID_LOOKBACKS:
+            for q in RALLY_GRID_QUANTILES:
+                build_rally_labels(price, quantile=q, lookback=lookback)
+
+    frame, feature_cols = _build_supervised_frame(df, horizon=horizon)
+    train, test = _train_test_split(frame)
+    X_train, X_test = train[feature_cols], test[feature_cols]
+    targets = {
+        "forecast": (train["target_price"], test["target_price"]),
+        "rally": (train["target_rally"], test["target_rally"]),
+    }
+
+    forecast_rows: list[dict[str, Any]] = []
+    rally_rows: list[dict[str, Any]] = []
+    rally_preds = pd.DataFrame({"timestamp": test["timestamp"].to_numpy(), "y_true": targets["rally"][1].to_numpy()})
+    for task, names in (("forecast", forecast_models), ("rally", rally_models)):
+        y_train, y_test = targets[task]
+        for name in names:
+            with measure_stage(size, f"fit.{task}.{name}", len(X_train), results):
+                model = fit_model(task, name, X_train, y_train)
+            with measure_stage(size, f"predict.{task}.{name}", len(X_test), results):
+                pred = predict_model(task, model, X_test)
+            if task == "forecast":
+                with measure_stage(size, "forecast_metrics", len(X_test), results):
+                    metrics = forecast_metrics(y_test, pred)
+                forecast_rows.append({"model": name, **metrics})
+            else:
+                threshold = rally_decision_threshold(name, y_train)
+                with measure_stage(size, "classification_metrics", len(X_test), results):
+                    metrics = classification_metrics(y_test, pred, threshold=threshold)
+                rally_rows.append({"model": name, **metrics})
+                rally_preds[f"{name}_prob"] = pred
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        artifacts_dir = Path(tmp) / "artifacts"
+        _write_report_artifacts(artifacts_dir, "PJM", forecast_rows, rally_rows, rally_preds)
+        with measure_stage(size, "write_dual_market_report", len(X_test), results):
+            write_dual_market_report(artifacts_dir, Path(tmp) / "report.md")
+        with measure_stage(size, "generate_chart_pack", len(X_test), results):
+            # Inline, so the stage's time and memory are the rendering work, not pool start-up.
+            generate_chart_pack(artifacts_dir, Path(tmp) / "charts", max_workers=1)
+    return _merge_repeated_stages(results)
+
+
+def _merge_repeated_stages(results: list[StageResult]) -> list[StageResult]:
+    # Metric stages run once per model; report their total time and the largest peak.
+    merged: dict[str, StageResult] = {}
+    for result in results:
+        if result.stage in merged:
+            previous = merged[result.stage]
+            previous.seconds += result.seconds
+            previous.peak_rss_mb = max(previous.peak_rss_mb, result.peak_rss_mb)
+            previous.rss_growth_mb = max(previous.rss_growth_mb, result.rss_growth_mb)
+        else:
+            merged[result.stage] = StageResult(**asdict(result))
+    return list(merged.values())
+
+
+def run_perf_suite(
+    sizes: dict[str, int] | None = None,
+    *,
+    repeat: int = 1,
+    forecast_models: list[str] | None = None,
+    rally_models: list[str] | None = None,
+    progress: Callable[[StageResult], None] | None = None,
+) -> dict[str, Any]:
+    """Run every stage at every size after a warm-up; keep the fastest of ``repeat`` runs per stage.
+
+    Returns a baseline document: ``{"results": {size: {stage: {"rows", "seconds", "peak_rss_mb",
+    "rss_growth_mb"}}}}``
+    plus interpreter and machine details for context.
+    """
+    sizes = PERF_SIZES if sizes is None else sizes
+    run_size("warmup", _WARMUP_HOURS, forecast_models=forecast_models, rally_models=rally_models)
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for size, n_hours in sizes.items():
+        best: dict[str, StageResult] = {}
+        for _ in range(max(1, repeat)):
+            for result in run_size(size, n_hours, forecast_models=forecast_models, rally_models=rally_models):
+                if result.stage not in best or result.seconds < best[result.stage].seconds:
+                    best[result.stage] = result
+        for result in best.values():
+            if progress is not None:
+                progress(result)
+        results[size] = {
+            stage: {
+                "rows": r.rows,
+                "seconds": round(r.seconds, 4),
+                "peak_rss_mb": round(r.peak_rss_mb, 1),
+                "rss_growth_mb": round(r.rss_growth_mb, 1),
+            }
+            for stage, r in best.items()
+        }
+    return {
+        "version": PERF_BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    *,
+    tolerance: float = 0.25,
+    min_seconds: float = 0.05,
+    min_memory_mb: float = 32.0,
+) -> list[str]:
+    """Describe every stage that got slower or hungrier than ``baseline`` allows.
+
+    Wall time and RSS growth are checked; absolute peak RSS depends on what earlier stages
+    left resident and is informational only. A stage regresses when it exceeds the baseline
+    by more than ``tolerance`` (a fraction) *and* by more than the absolute slack
+    (``min_seconds``, ``min_memory_mb``), so millisecond-scale stages and allocator noise
+    do not fail the suite. Stages or sizes missing from either side are skipped.
+    """
+    regressions: list[str] = []
+    for size, stages in current.get("results", {}).items():
+        base_stages = baseline.get("results", {}).get(size, {})
+        for stage, now in stages.items():
+            before = base_stages.get(stage)
+            if before is None:
+                continue
+            for field, slack, unit in (("seconds", min_seconds, "s"), ("rss_growth_mb", min_memory_mb, " MB")):
+                limit = max(before[field] * (1 + tolerance), before[field] + slack)
+                if now[field] > limit:
+                    regressions.append(
+                        f"{size} {stage}: {field} {now[field]:.3f}{unit} > {limit:.3f}{unit} "
+                        f"(baseline {before[field]:.3f}{unit})"
+                    )
+    return regressions
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def write_baseline(path: Path, document: dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
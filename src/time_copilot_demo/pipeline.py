@@ -1,22 +1,61 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Any
 
 import numpy as np
 import pandas as pd
 
+from time_copilot_demo.backtest import run_backtest, walk_forward_folds
+from time_copilot_demo.bootstrap import champion_bootstrap
+from time_copilot_demo.charts import CHART_CODE_VERSION, generate_chart_pack
 from time_copilot_demo.champion import pick_forecast_champion, pick_rally_champion
-from time_copilot_demo.data import load_epf_market
-from time_copilot_demo.evaluate import classification_metrics, forecast_metrics
+from time_copilot_demo.checkpoints import CHECKPOINT_DIR, JobCheckpoints, job_key
+from time_copilot_demo.dag import Stage, run_stages
+from time_copilot_demo.data import load_epf_market, market_frame_bytes
+from time_copilot_demo.evaluate import batch_classification_metrics, batch_forecast_metrics
+from time_copilot_demo.feature_cache import FEATURE_CODE_VERSION, FeatureCache
 from time_copilot_demo.features import build_features
+from time_copilot_demo.history import HISTORY_DIR, KEEP_PREDICTION_RUNS, append_market_run, new_run_id, record_run
+from time_copilot_demo.job_queue import JobQueue, QueueExecutor
 from time_copilot_demo.labels import build_rally_labels, label_future_rally
 from time_copilot_demo.model_registry import (
     available_forecast_models,
     available_rally_models,
-    predict_forecast,
-    predict_rally_probability,
+    fit_model,
+    import_model_modules,
+    model_params,
+    predict_model,
+    rally_decision_threshold,
+    search_space,
 )
+from time_copilot_demo.model_store import MODEL_CODE_VERSION, ModelStore
+from time_copilot_demo.parallel import MemoryBudget, cpu_count, make_executor, run_jobs
+from time_copilot_demo.perf import track_resources
+from time_copilot_demo.profiling import profile_span
+from time_copilot_demo.reporting import write_dual_market_report
+from time_copilot_demo.shared_frame import materialize, shared_inputs
+from time_copilot_demo.summaries import write_prediction_summaries
+from time_copilot_demo.tuning import load_tuned_params, save_tuned_params, tune_models, tuned_overrides
+
+SUPERVISED_LAGS = (1, 2, 24, 48, 24 * 7)
+SUPERVISED_WINDOWS = (24, 24 * 7)
+RALLY_QUANTILE = 0.95
+RALLY_LOOKBACK = 24 * 30
+
+# Retrain/scoring cost columns appended to the benchmark tables next to the accuracy metrics.
+COST_COLUMNS = ("fit_seconds", "predict_seconds", "predict_rows_per_sec", "peak_mem_mb")
+
+# Rough peak bytes per raw (timestamp, price) byte: supervised frame, train/test copies, model state.
+_MARKET_MEMORY_EXPANSION = 40
+
+# Bump when scoring, champion picking, the summary or the report change so incremental runs redo them.
+STAGE_CODE_VERSION = "1"
+DAG_DIR = "dag"
+_TARGETS = {"forecast": "target_price", "rally": "target_rally"}
 
 
 def synthetic_pjm_like(n_hours: int = 24 * 120) -> pd.DataFrame:
@@ -30,23 +69,49 @@ def synthetic_pjm_like(n_hours: int = 24 * 120) -> pd.DataFrame:
     return pd.DataFrame({"timestamp": ts, "price": price})
 
 
-def _build_supervised_frame(df: pd.DataFrame, *, horizon: int) -> tuple[pd.DataFrame, list[str]]:
+def _supervised_feature_columns(frame: pd.DataFrame) -> list[str]:
+    return [
+        c
+        for c in frame.columns
+        if c.startswith("lag_") or c.startswith("roll_") or c in {"hour", "dayofweek", "month"}
+    ]
+
+
+def _build_supervised_frame(
+    df: pd.DataFrame, *, horizon: int, cache: FeatureCache | None = None
+) -> tuple[pd.DataFrame, list[str]]:
+    if cache is not None:
+        key = cache.key(
+            df,
+            {
+                "lags": SUPERVISED_LAGS,
+                "rolling_windows": SUPERVISED_WINDOWS,
+                "quantile": RALLY_QUANTILE,
+                "lookback": RALLY_LOOKBACK,
+                "horizon": horizon,
+            },
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, _supervised_feature_columns(cached)
+
     data = df.sort_values("timestamp").reset_index(drop=True).copy()
-    data["rally"] = build_rally_labels(data["price"], quantile=0.95, lookback=24 * 30)
+    data["rally"] = build_rally_labels(data["price"], quantile=RALLY_QUANTILE, lookback=RALLY_LOOKBACK)
     data["target_rally"] = label_future_rally(data["rally"], horizon=horizon)
     data["target_price"] = data["price"].shift(-1)
 
     feats = build_features(
         data[["timestamp", "price"]],
-        lags=(1, 2, 24, 48, 24 * 7),
-        rolling_windows=(24, 24 * 7),
+        lags=SUPERVISED_LAGS,
+        rolling_windows=SUPERVISED_WINDOWS,
     )
     out = feats.join(data[["target_rally", "target_price"]]).dropna().reset_index(drop=True)
-    feature_cols = [
-        c
-        for c in out.columns
-        if c.startswith("lag_") or c.startswith("roll_") or c in {"hour", "dayofweek", "month"}
-    ]
+    # One float64 dtype for all features (estimators convert to float anyway), so a shared copy of
+    # the feature matrix is a single block that workers can pass to estimators without copying.
+    feature_cols = _supervised_feature_columns(out)
+    out[feature_cols] = out[feature_cols].astype("float64")
+    if cache is not None:
+        cache.put(key, out)
     return out, feature_cols
 
 
@@ -55,6 +120,229 @@ def _train_test_split(frame: pd.DataFrame, ratio: float = 0.8) -> tuple[pd.DataF
     return frame.iloc[:split_idx].copy(), frame.iloc[split_idx:].copy()
 
 
+def _fit_with_cost(
+    task: str, model_name: str, X_train: pd.DataFrame, y_train: pd.Series, params: dict[str, Any] | None = None
+) -> Any:
+    import_model_modules(model_name)
+    with profile_span(f"fit.{task}.{model_name}"), track_resources() as usage:
+        model = fit_model(task, model_name, X_train, y_train, params)
+    # Stored with the model, so a model-store hit still reports what the original fit cost.
+    model.fit_cost_ = {"fit_seconds": usage.seconds, "peak_mem_mb": usage.peak_rss_mb}
+    return model
+
+
+def _fit_predict_job(
+    task: str,
+    model_name: str,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_test: pd.DataFrame,
+    model_dir: Path | None,
+    params: dict[str, Any] | None = None,
+) -> dict[str, object]:
+    # Worker jobs get ``FrameView``s of a shared copy of the market's frame; load them zero-copy.
+    X_train, y_train, X_test = materialize(X_train), materialize(y_train), materialize(X_test)
+    if model_dir is None:
+        model = _fit_with_cost(task, model_name, X_train, y_train, params)
+        artifact = None
+    else:
+        model, path = ModelStore(model_dir).get_or_fit(
+            task, model_name, X_train, y_train, params=params, fit=_fit_with_cost
+        )
+        artifact = path.relative_to(model_dir.parent).as_posix()
+    with profile_span(f"predict.{task}.{model_name}"), track_resources() as usage:
+        pred = predict_model(task, model, X_test)
+    return {
+        "pred": pred,
+        "artifact": artifact,
+        "training": getattr(model, "training_", None),
+        "cost": {
+            "fit_seconds": model.fit_cost_["fit_seconds"],
+            "predict_seconds": usage.seconds,
+            "predict_rows_per_sec": len(X_test) / max(usage.seconds, 1e-9),
+            "peak_mem_mb": max(model.fit_cost_["peak_mem_mb"], usage.peak_rss_mb),
+        },
+    }
+
+
+def _checkpointed_job(checkpoint_dir: Path, key: str, *job: Any) -> dict[str, object]:
+    output = _fit_predict_job(*job)
+    # Saved from the worker as soon as the job finishes, so a later crash keeps it.
+    JobCheckpoints(checkpoint_dir).save(job[0], job[1], key, output)
+    return output
+
+
+def _run_checkpointed_jobs(
+    checkpoint_dir: Path,
+    jobs: list[tuple],
+    *,
+    resume: bool,
+    max_workers: int | None,
+    executor: Executor | None,
+) -> list[dict[str, object]]:
+    """Run ``_fit_predict_job`` jobs, checkpointing each output under ``checkpoint_dir``.
+
+    With ``resume``, jobs whose checkpoint matches their key (training and test rows,
+    hyperparameters, ``MODEL_CODE_VERSION``) are loaded instead of run.
+    """
+    checkpoints = JobCheckpoints(checkpoint_dir)
+    keys = [
+        job_key(task, name, X_train, y_train, X_test, params)
+        for task, name, X_train, y_train, X_test, _, params in jobs
+    ]
+    outputs = [checkpoints.load(job[0], job[1], key) if resume else None for job, key in zip(jobs, keys)]
+    pending = [i for i, output in enumerate(outputs) if output is None]
+    fresh = run_jobs(
+        _checkpointed_job,
+        [(checkpoint_dir, keys[i], *jobs[i]) for i in pending],
+        max_workers=max_workers,
+        executor=executor,
+    )
+    for i, output in zip(pending, fresh):
+        outputs[i] = output
+    return outputs
+
+
+def _metric_rows(
+    models: list[str], outputs: list[dict[str, Any]], metrics: dict[str, np.ndarray]
+) -> list[dict[str, float | str]]:
+    """One benchmark row per model from batched metric arrays plus each fit's cost columns."""
+    return [
+        {"model": name, **{metric: float(values[i]) for metric, values in metrics.items()}, **output["cost"]}
+        for i, (name, output) in enumerate(zip(models, outputs))
+    ]
+
+
+def _score_market(
+    market: str,
+    test: pd.DataFrame,
+    y_cls_train: pd.Series,
+    *,
+    forecast_models: list[str],
+    forecast_outputs: list[dict[str, Any]],
+    rally_models: list[str],
+    rally_outputs: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """Benchmark tables, prediction frames and (models × rows) matrices of one market's holdout."""
+    y_reg_test = test["target_price"]
+    y_cls_test = test["target_rally"]
+    with profile_span(f"metrics.{market}"):
+        forecast_preds = pd.DataFrame({"timestamp": test["timestamp"].to_numpy(), "y_true": y_reg_test.to_numpy()})
+        for model_name, output in zip(forecast_models, forecast_outputs):
+            forecast_preds[f"{model_name}_pred"] = output["pred"]
+        forecast_matrix = forecast_preds[[f"{m}_pred" for m in forecast_models]].to_numpy().T
+        forecast_rows = _metric_rows(forecast_models, forecast_outputs, batch_forecast_metrics(y_reg_test, forecast_matrix))
+
+        rally_preds = pd.DataFrame({"timestamp": test["timestamp"].to_numpy(), "y_true": y_cls_test.to_numpy()})
+        for model_name, output in zip(rally_models, rally_outputs):
+            rally_preds[f"{model_name}_prob"] = output["pred"]
+        thresholds = [rally_decision_threshold(model_name, y_cls_train) for model_name in rally_models]
+        rally_matrix = rally_preds[[f"{m}_prob" for m in rally_models]].to_numpy().T
+        rally_rows = _metric_rows(
+            rally_models, rally_outputs, batch_classification_metrics(y_cls_test, rally_matrix, threshold=thresholds)
+        )
+
+        forecast_table = (
+            pd.DataFrame(forecast_rows).sort_values(["smape", "mae"], ascending=[True, True]).reset_index(drop=True)
+        )
+        rally_table = (
+            pd.DataFrame(rally_rows).sort_values(["pr_auc", "brier"], ascending=[False, True]).reset_index(drop=True)
+        )
+    return {
+        "forecast_models": forecast_models,
+        "rally_models": rally_models,
+        "forecast_table": forecast_table,
+        "rally_table": rally_table,
+        "forecast_preds": forecast_preds,
+        "rally_preds": rally_preds,
+        "forecast_matrix": forecast_matrix,
+        "rally_matrix": rally_matrix,
+        "y_forecast": y_reg_test,
+        "y_rally": y_cls_test,
+    }
+
+
+def _write_market_scores(market: str, market_dir: Path, scores: dict[str, Any]) -> None:
+    with profile_span(f"write_artifacts.{market}"):
+        market_dir.mkdir(parents=True, exist_ok=True)
+        scores["forecast_table"].to_csv(market_dir / "forecast_benchmark.csv", index=False)
+        scores["rally_table"].to_csv(market_dir / "rally_benchmark.csv", index=False)
+        scores["forecast_preds"].to_parquet(market_dir / "forecast_predictions.parquet", index=False)
+        scores["rally_preds"].to_parquet(market_dir / "rally_predictions.parquet", index=False)
+        write_prediction_summaries(
+            market_dir,
+            y_forecast=scores["y_forecast"],
+            forecast_preds=scores["forecast_matrix"],
+            forecast_models=scores["forecast_models"],
+            y_rally=scores["y_rally"],
+            rally_probs=scores["rally_matrix"],
+            rally_models=scores["rally_models"],
+        )
+
+
+def _market_champions(
+    market: str,
+    scores: dict[str, Any],
+    *,
+    forecast_outputs: list[dict[str, Any]],
+    rally_outputs: list[dict[str, Any]],
+    params: dict[str, dict[str, dict[str, Any]]],
+    bootstrap_resamples: int,
+) -> dict[str, Any]:
+    """Champion entries of one market: picks, DNN training, tuned values and bootstrap spread."""
+    champions: dict[str, Any] = {
+        "market": market,
+        "forecast": pick_forecast_champion(scores["forecast_table"]),
+        "rally": pick_rally_champion(scores["rally_table"]),
+    }
+    training = {
+        task: {name: output["training"] for name, output in zip(names, outputs) if output["training"] is not None}
+        for task, names, outputs in [
+            ("forecast", scores["forecast_models"], forecast_outputs),
+            ("rally", scores["rally_models"], rally_outputs),
+        ]
+    }
+    if any(training.values()):
+        # Runtime and chosen epoch of iteratively trained models (the DNNs).
+        champions["training"] = training
+    tuned_champions = {
+        task: params[task][str(champions[task]["model"])]
+        for task in ("forecast", "rally")
+        if str(champions[task]["model"]) in params[task]
+    }
+    if tuned_champions:
+        champions["tuned_params"] = tuned_champions
+    if bootstrap_resamples > 0:
+        # Block-bootstrap spread of the holdout metrics: how settled each champion is.
+        with profile_span(f"bootstrap.{market}"):
+            champions["bootstrap"] = champion_bootstrap(
+                y_forecast=scores["y_forecast"],
+                forecast_preds=scores["forecast_matrix"],
+                forecast_models=scores["forecast_models"],
+                y_rally=scores["y_rally"],
+                rally_probs=scores["rally_matrix"],
+                rally_models=scores["rally_models"],
+                n_resamples=bootstrap_resamples,
+            )
+    return champions
+
+
+def _append_history(
+    artifacts_dir: Path, run_id: str, market: str, scores: dict[str, Any], champions: dict[str, Any]
+) -> None:
+    with profile_span(f"history.{market}"):
+        append_market_run(
+            artifacts_dir / HISTORY_DIR,
+            run_id=run_id,
+            market=market,
+            forecast_table=scores["forecast_table"],
+            rally_table=scores["rally_table"],
+            forecast_preds=scores["forecast_preds"],
+            rally_preds=scores["rally_preds"],
+            champions=champions,
+        )
+
+
 def run_market_benchmark(
     *,
     market: str,
@@ -63,16 +351,22 @@ def run_market_benchmark(
     horizon: int = 24,
     forecast_models: list[str] | None = None,
     rally_models: list[str] | None = None,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+    backtest_folds: int = 0,
+    feature_cache: FeatureCache | None = None,
+    persist_models: bool = False,
+    tune: bool = False,
+    retune: bool = False,
+    bootstrap_resamples: int = 2000,
+    run_id: str | None = None,
+    resume: bool = False,
 ) -> dict[str, dict[str, float | str]]:
-    frame, feature_cols = _build_supervised_frame(df, horizon=horizon)
-    train, test = _train_test_split(frame)
+    with profile_span(f"supervised_frame.{market}"):
+        frame, feature_cols = _build_supervised_frame(df, horizon=horizon, cache=feature_cache)
+        train, test = _train_test_split(frame)
 
-    X_train = train[feature_cols]
-    X_test = test[feature_cols]
-    y_reg_train = train["target_price"]
-    y_reg_test = test["target_price"]
     y_cls_train = train["target_rally"]
-    y_cls_test = test["target_rally"]
 
     if forecast_models is None:
         forecast_models = list(available_forecast_models())
@@ -82,36 +376,269 @@ def run_market_benchmark(
     market_dir = artifacts_dir / market
     market_dir.mkdir(parents=True, exist_ok=True)
 
-    forecast_rows: list[dict[str, float | str]] = []
-    forecast_preds = pd.DataFrame({"timestamp": test["timestamp"].to_numpy(), "y_true": y_reg_test.to_numpy()})
-    for model_name in forecast_models:
-        pred = predict_forecast(model_name, X_train, y_reg_train, X_test)
-        forecast_preds[f"{model_name}_pred"] = pred
-        forecast_rows.append({"model": model_name, **forecast_metrics(y_reg_test, pred)})
-
-    rally_rows: list[dict[str, float | str]] = []
-    rally_preds = pd.DataFrame({"timestamp": test["timestamp"].to_numpy(), "y_true": y_cls_test.to_numpy()})
-    for model_name in rally_models:
-        prob = predict_rally_probability(model_name, X_train, y_cls_train, X_test)
-        rally_preds[f"{model_name}_prob"] = prob
-        threshold = float(y_cls_train.mean()) if model_name == "naive" else 0.5
-        rally_rows.append({"model": model_name, **classification_metrics(y_cls_test, prob, threshold=threshold)})
-
-    forecast_table = pd.DataFrame(forecast_rows).sort_values(["smape", "mae"], ascending=[True, True]).reset_index(drop=True)
-    rally_table = pd.DataFrame(rally_rows).sort_values(["pr_auc", "brier"], ascending=[False, True]).reset_index(drop=True)
-
-    forecast_table.to_csv(market_dir / "forecast_benchmark.csv", index=False)
-    rally_table.to_csv(market_dir / "rally_benchmark.csv", index=False)
-    forecast_preds.to_parquet(market_dir / "forecast_predictions.parquet", index=False)
-    rally_preds.to_parquet(market_dir / "rally_predictions.parquet", index=False)
+    params = _market_tuned_params(
+        market=market,
+        market_dir=market_dir,
+        train=train,
+        feature_cols=feature_cols,
+        horizon=horizon,
+        forecast_models=forecast_models,
+        rally_models=rally_models,
+        tune=tune,
+        retune=retune,
+        max_workers=max_workers,
+        executor=executor,
+    )
+
+    model_dir = market_dir / "models" if persist_models else None
+    n_train = len(train)
+    # Worker processes all attach to one shared copy of the frame instead of each unpickling its own.
+    with shared_inputs(
+        frame,
+        {"X": feature_cols, "forecast": "target_price", "rally": "target_rally"},
+        max_workers=max_workers,
+        executor=executor,
+    ) as inputs:
+        X_train, X_test = inputs["X"].iloc[:n_train], inputs["X"].iloc[n_train:]
+        jobs = [
+            (task, name, X_train, inputs[task].iloc[:n_train], X_test, model_dir, params[task].get(name))
+            for task, models in (("forecast", forecast_models), ("rally", rally_models))
+            for name in models
+        ]
+        outputs = _run_checkpointed_jobs(
+            market_dir / CHECKPOINT_DIR, jobs, resume=resume, max_workers=max_workers, executor=executor
+        )
+    forecast_outputs = outputs[: len(forecast_models)]
+    rally_outputs = outputs[len(forecast_models) :]
+
+    scores = _score_market(
+        market,
+        test,
+        y_cls_train,
+        forecast_models=forecast_models,
+        forecast_outputs=forecast_outputs,
+        rally_models=rally_models,
+        rally_outputs=rally_outputs,
+    )
+    _write_market_scores(market, market_dir, scores)
+    champions = _market_champions(
+        market,
+        scores,
+        forecast_outputs=forecast_outputs,
+        rally_outputs=rally_outputs,
+        params=params,
+        bootstrap_resamples=bootstrap_resamples,
+    )
+    if run_id is not None:
+        champions["run_id"] = run_id
+        _append_history(artifacts_dir, run_id, market, scores, champions)
+    if persist_models:
+        artifacts = {
+            "forecast": dict(zip(forecast_models, forecast_outputs)),
+            "rally": dict(zip(rally_models, rally_outputs)),
+        }
+        champions["artifacts"] = {
+            task: artifacts[task][str(champions[task]["model"])]["artifact"] for task in ("forecast", "rally")
+        }
+    with profile_span(f"write_artifacts.{market}"):
+        (market_dir / "champions.json").write_text(json.dumps(champions, indent=2), encoding="utf-8")
+
+    if backtest_folds > 0:
+        with profile_span(f"backtest.{market}"):
+            _write_backtest(
+                market=market,
+                market_dir=market_dir,
+                frame=frame,
+                feature_cols=feature_cols,
+                horizon=horizon,
+                n_folds=backtest_folds,
+                forecast_models=forecast_models,
+                rally_models=rally_models,
+                max_workers=max_workers,
+                executor=executor,
+                params=params,
+            )
+    return champions
+
+
+def _market_tuned_params(
+    *,
+    market: str,
+    market_dir: Path,
+    train: pd.DataFrame,
+    feature_cols: list[str],
+    horizon: int,
+    forecast_models: list[str],
+    rally_models: list[str],
+    tune: bool,
+    retune: bool,
+    max_workers: int | None,
+    executor: Executor | None,
+) -> dict[str, dict[str, dict[str, Any]]]:
+    """Hyperparameter overrides per task and model from ``tuned_params.json``.
+
+    With ``tune``, models that declare a search space but have no current tuned entry are
+    searched (on the training rows only) and the file is updated; ``retune`` searches all.
+    """
+    tuned = load_tuned_params(market_dir)
+    if tune or retune:
+        pending = {
+            task: [name for name in names if search_space(task, name) and (retune or name not in tuned[task])]
+            for task, names in (("forecast", forecast_models), ("rally", rally_models))
+        }
+        if pending["forecast"] or pending["rally"]:
+            with profile_span(f"tune.{market}"):
+                found, trials = tune_models(
+                    train,
+                    feature_cols,
+                    forecast_models=pending["forecast"],
+                    rally_models=pending["rally"],
+                    horizon=horizon,
+                    max_workers=max_workers,
+                    executor=executor,
+                )
+            for task, entries in found.items():
+                tuned[task].update(entries)
+            save_tuned_params(market_dir, tuned, trials)
+    return tuned_overrides(tuned)
+
+
+def _write_backtest(
+    *,
+    market: str,
+    market_dir: Path,
+    frame: pd.DataFrame,
+    feature_cols: list[str],
+    horizon: int,
+    n_folds: int,
+    forecast_models: list[str],
+    rally_models: list[str],
+    max_workers: int | None,
+    executor: Executor | None,
+    params: dict[str, dict[str, dict[str, Any]]] | None = None,
+) -> None:
+    # Purge ``horizon`` rows before each test window: their rally targets look into it.
+    folds = walk_forward_folds(frame["timestamp"], n_folds=n_folds, gap=horizon)
+    tables = run_backtest(
+        frame,
+        feature_cols,
+        folds,
+        forecast_models=forecast_models,
+        rally_models=rally_models,
+        max_workers=max_workers,
+        executor=executor,
+        params=params,
+    )
+    for name, table in tables.items():
+        table.to_csv(market_dir / f"backtest_{name}.csv", index=False)
 
     champions = {
         "market": market,
-        "forecast": pick_forecast_champion(forecast_table),
-        "rally": pick_rally_champion(rally_table),
+        "n_folds": n_folds,
+        "forecast": pick_forecast_champion(tables["forecast"]),
+        "rally": pick_rally_champion(tables["rally"]),
     }
-    (market_dir / "champions.json").write_text(json.dumps(champions, indent=2), encoding="utf-8")
-    return champions
+    (market_dir / "backtest_champions.json").write_text(json.dumps(champions, indent=2), encoding="utf-8")
+
+
+def _estimate_market_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum()) * _MARKET_MEMORY_EXPANSION
+
+
+def _estimate_unloaded_market_bytes(market: str, data_dir: str, budget: MemoryBudget) -> int:
+    raw_bytes = market_frame_bytes(market, data_dir=data_dir)
+    if raw_bytes is None:
+        # Nothing on disk to size it by before the download: reserve the whole cap, so it runs alone.
+        return budget.limit_bytes or 0
+    return raw_bytes * _MARKET_MEMORY_EXPANSION
+
+
+def _run_markets_concurrently(
+    *,
+    markets: list[str],
+    market_frames: dict[str, pd.DataFrame] | None,
+    artifacts_dir: Path,
+    horizon: int,
+    data_dir: str,
+    max_workers: int | None,
+    market_workers: int,
+    memory_limit_mb: float | None,
+    backtest_folds: int,
+    feature_cache: FeatureCache | None,
+    persist_models: bool,
+    tune: bool,
+    retune: bool,
+    bootstrap_resamples: int,
+    run_id: str | None,
+    resume: bool,
+    executor: Executor | None = None,
+) -> dict[str, dict[str, dict[str, float | str]]]:
+    budget = MemoryBudget(None if memory_limit_mb is None else int(memory_limit_mb * 2**20))
+    model_workers = max_workers or cpu_count()
+    # Markets share one bounded model pool, so total fits track cores rather than market count.
+    model_pool = executor or (make_executor(model_workers) if model_workers > 1 else None)
+
+    def run_one(market: str) -> dict[str, dict[str, float | str]]:
+        if market_frames is not None:
+            df = market_frames[market]
+            estimate = _estimate_market_bytes(df)
+        else:
+            # Sized from the files before loading, so loads count against the cap too.
+            df = None
+            estimate = _estimate_unloaded_market_bytes(market, data_dir, budget)
+        with budget.reserve(estimate):
+            if df is None:
+                with profile_span(f"load.{market}"):
+                    df = load_epf_market(market, data_dir=data_dir)
+            return run_market_benchmark(
+                market=market,
+                df=df,
+                artifacts_dir=artifacts_dir,
+                horizon=horizon,
+                max_workers=model_workers if model_pool is not None else None,
+                executor=model_pool,
+                backtest_folds=backtest_folds,
+                feature_cache=feature_cache,
+                persist_models=persist_models,
+                tune=tune,
+                retune=retune,
+                bootstrap_resamples=bootstrap_resamples,
+                run_id=run_id,
+                resume=resume,
+            )
+
+    try:
+        with ThreadPoolExecutor(max_workers=market_workers) as market_pool:
+            futures = {market: market_pool.submit(run_one, market) for market in markets}
+            return {market: futures[market].result() for market in markets}
+    finally:
+        if model_pool is not None:
+            model_pool.shutdown()
+
+
+def _champion_summary(
+    markets: list[str], champions_by_market: dict[str, dict[str, Any]], run_id: str | None
+) -> pd.DataFrame:
+    """``champion_summary.csv`` rows: each market's champions with their bootstrap spread."""
+    summary_rows: list[dict[str, float | str]] = []
+    for market in markets:
+        champions = champions_by_market[market]
+        for task, metric in (("forecast", "smape"), ("rally", "pr_auc")):
+            model = str(champions[task]["model"])
+            row = {
+                **({"run_id": run_id} if run_id is not None else {}),
+                "market": market,
+                "task": task,
+                "model": model,
+                "primary_metric": metric,
+                "primary_value": float(champions[task][metric]),
+            }
+            if "bootstrap" in champions:
+                spread = champions["bootstrap"][task][model]
+                row["primary_ci_low"], row["primary_ci_high"] = spread[f"{metric}_ci"]
+                row["win_prob"] = spread["win_prob"]
+            summary_rows.append(row)
+    return pd.DataFrame(summary_rows)
 
 
 def run_dual_market_benchmark(
@@ -121,46 +648,332 @@ def run_dual_market_benchmark(
     horizon: int = 24,
     markets: list[str] | None = None,
     data_dir: str = "datasets",
+    max_workers: int | None = None,
+    market_workers: int | None = None,
+    memory_limit_mb: float | None = None,
+    backtest_folds: int = 0,
+    feature_cache: FeatureCache | None = None,
+    persist_models: bool = False,
+    tune: bool = False,
+    retune: bool = False,
+    bootstrap_resamples: int = 2000,
+    record_history: bool = True,
+    keep_prediction_runs: int | None = KEEP_PREDICTION_RUNS,
+    resume: bool = False,
+    job_queue: Path | None = None,
 ) -> pd.DataFrame:
+    """Benchmark every market and write ``champion_summary.csv``.
+
+    With ``job_queue``, every fit, backtest fold and tuning candidate of all markets is
+    enqueued in the ``JobQueue`` under that directory and run by ``work`` processes
+    (``scripts/run_worker.py``, on this host or others sharing the directory) instead
+    of a local pool; ``max_workers`` then only sizes the thread cap of each job.
+    ``keep_prediction_runs`` keeps only that many runs' predictions in the history store
+    (None keeps all).
+    """
     if markets is None:
         markets = ["PJM", "NP"]
+    # Paths are pickled into queued jobs, so they must not depend on the worker's directory.
+    artifacts_dir = Path(artifacts_dir).resolve()
     artifacts_dir.mkdir(parents=True, exist_ok=True)
+    # Each run appends its tables and predictions to the history store under a fresh id.
+    run_id = new_run_id() if record_history else None
 
-    if market_frames is None:
-        market_frames = {market: load_epf_market(market, data_dir=data_dir) for market in markets}
-
-    summary_rows: list[dict[str, float | str]] = []
-    for market in markets:
-        champions = run_market_benchmark(
-            market=market,
-            df=market_frames[market],
+    if job_queue is not None:
+        # All markets enqueue at once, so idle workers are never waiting on one market's jobs.
+        champions_by_market = _run_markets_concurrently(
+            markets=markets,
+            market_frames=market_frames,
             artifacts_dir=artifacts_dir,
             horizon=horizon,
+            data_dir=data_dir,
+            max_workers=max_workers,
+            market_workers=max(market_workers or 1, len(markets)),
+            memory_limit_mb=memory_limit_mb,
+            backtest_folds=backtest_folds,
+            feature_cache=feature_cache,
+            persist_models=persist_models,
+            tune=tune,
+            retune=retune,
+            bootstrap_resamples=bootstrap_resamples,
+            run_id=run_id,
+            resume=resume,
+            executor=QueueExecutor(JobQueue(Path(job_queue).resolve())),
         )
-        summary_rows.append(
-            {
-                "market": market,
-                "task": "forecast",
-                "model": str(champions["forecast"]["model"]),
-                "primary_metric": "smape",
-                "primary_value": float(champions["forecast"]["smape"]),
-            }
-        )
-        summary_rows.append(
-            {
-                "market": market,
-                "task": "rally",
-                "model": str(champions["rally"]["model"]),
-                "primary_metric": "pr_auc",
-                "primary_value": float(champions["rally"]["pr_auc"]),
-            }
+    elif market_workers is not None and market_workers > 1:
+        # Loading one market overlaps with fitting another; the summary keeps ``markets`` order.
+        champions_by_market = _run_markets_concurrently(
+            markets=markets,
+            market_frames=market_frames,
+            artifacts_dir=artifacts_dir,
+            horizon=horizon,
+            data_dir=data_dir,
+            max_workers=max_workers,
+            market_workers=market_workers,
+            memory_limit_mb=memory_limit_mb,
+            backtest_folds=backtest_folds,
+            feature_cache=feature_cache,
+            persist_models=persist_models,
+            tune=tune,
+            retune=retune,
+            bootstrap_resamples=bootstrap_resamples,
+            run_id=run_id,
+            resume=resume,
         )
+    else:
+        if market_frames is None:
+            market_frames = {}
+            for market in markets:
+                with profile_span(f"load.{market}"):
+                    market_frames[market] = load_epf_market(market, data_dir=data_dir)
+        champions_by_market = {
+            market: run_market_benchmark(
+                market=market,
+                df=market_frames[market],
+                artifacts_dir=artifacts_dir,
+                horizon=horizon,
+                max_workers=max_workers,
+                backtest_folds=backtest_folds,
+                feature_cache=feature_cache,
+                persist_models=persist_models,
+                tune=tune,
+                retune=retune,
+                bootstrap_resamples=bootstrap_resamples,
+                run_id=run_id,
+                resume=resume,
+            )
+            for market in markets
+        }
+    if run_id is not None:
+        record_run(artifacts_dir / HISTORY_DIR, run_id, markets, keep_runs=keep_prediction_runs)
 
-    summary = pd.DataFrame(summary_rows)
+    summary = _champion_summary(markets, champions_by_market, run_id)
     summary.to_csv(artifacts_dir / "champion_summary.csv", index=False)
     return summary
 
 
+def _given_frame(df: pd.DataFrame) -> pd.DataFrame:
+    return df
+
+
+def _load_stage(*, market: str, data_dir: str, source: str) -> pd.DataFrame:
+    if source == "synthetic":
+        return synthetic_pjm_like()
+    return load_epf_market(market, data_dir=data_dir)
+
+
+def _frame_stage(df: pd.DataFrame, *, horizon: int) -> dict[str, Any]:
+    frame, feature_cols = _build_supervised_frame(df, horizon=horizon)
+    train, test = _train_test_split(frame)
+    return {"train": train, "test": test, "feature_cols": feature_cols}
+
+
+def _fit_stage(split: dict[str, Any], *, task: str, model: str, params: dict[str, Any]) -> dict[str, Any]:
+    cols = split["feature_cols"]
+    train = split["train"]
+    return _fit_predict_job(task, model, train[cols], train[_TARGETS[task]], split["test"][cols], None, params)
+
+
+def _metrics_stage(
+    split: dict[str, Any],
+    *fit_outputs: dict[str, Any],
+    market: str,
+    artifacts_dir: str,
+    forecast_models: list[str],
+    rally_models: list[str],
+) -> dict[str, Any]:
+    forecast_outputs = list(fit_outputs[: len(forecast_models)])
+    rally_outputs = list(fit_outputs[len(forecast_models) :])
+    scores = _score_market(
+        market,
+        split["test"],
+        split["train"]["target_rally"],
+        forecast_models=forecast_models,
+        forecast_outputs=forecast_outputs,
+        rally_models=rally_models,
+        rally_outputs=rally_outputs,
+    )
+    _write_market_scores(market, Path(artifacts_dir) / market, scores)
+    return {**scores, "forecast_outputs": forecast_outputs, "rally_outputs": rally_outputs}
+
+
+def _champions_stage(
+    scores: dict[str, Any], *, market: str, tuned: dict[str, dict[str, Any]], bootstrap_resamples: int
+) -> dict[str, Any]:
+    return _market_champions(
+        market,
+        scores,
+        forecast_outputs=scores["forecast_outputs"],
+        rally_outputs=scores["rally_outputs"],
+        params=tuned,
+        bootstrap_resamples=bootstrap_resamples,
+    )
+
+
+def _summary_stage(
+    *market_results: dict[str, Any],
+    markets: list[str],
+    artifacts_dir: str,
+    record_history: bool,
+    keep_prediction_runs: int | None = KEEP_PREDICTION_RUNS,
+) -> pd.DataFrame:
+    # ``market_results`` holds (scores, champions) of each market in ``markets`` order.
+    artifacts = Path(artifacts_dir)
+    run_id = new_run_id() if record_history else None
+    champions_by_market = {}
+    for market, scores, champions in zip(markets, market_results[::2], market_results[1::2]):
+        champions = dict(champions)
+        if run_id is not None:
+            champions["run_id"] = run_id
+            _append_history(artifacts, run_id, market, scores, champions)
+        (artifacts / market / "champions.json").write_text(json.dumps(champions, indent=2), encoding="utf-8")
+        champions_by_market[market] = champions
+    if run_id is not None:
+        record_run(artifacts / HISTORY_DIR, run_id, markets, keep_runs=keep_prediction_runs)
+    summary = _champion_summary(markets, champions_by_market, run_id)
+    summary.to_csv(artifacts / "champion_summary.csv", index=False)
+    return summary
+
+
+def _report_stage(summary: pd.DataFrame, *, artifacts_dir: str, report_path: str) -> str:
+    write_dual_market_report(Path(artifacts_dir), Path(report_path))
+    return report_path
+
+
+def _charts_stage(summary: pd.DataFrame, *, artifacts_dir: str, charts_dir: str) -> list[str]:
+    return generate_chart_pack(Path(artifacts_dir), Path(charts_dir), max_workers=1)
+
+
+def benchmark_stages(
+    *,
+    artifacts_dir: Path,
+    report_path: Path,
+    charts_dir: Path,
+    markets: list[str],
+    market_frames: dict[str, pd.DataFrame] | None = None,
+    source: str = "public",
+    data_dir: str = "datasets",
+    horizon: int = 24,
+    forecast_models: list[str] | None = None,
+    rally_models: list[str] | None = None,
+    bootstrap_resamples: int = 2000,
+    record_history: bool = True,
+    keep_prediction_runs: int | None = KEEP_PREDICTION_RUNS,
+) -> list[Stage]:
+    """The benchmark, report and chart pack as a stage graph for ``dag.run_stages``.
+
+    Per market: ``load`` → ``frame`` (supervised frame and split) → one ``fit`` stage per
+    task and model → ``metrics`` (benchmark tables, predictions, summaries) →
+    ``champions``; then ``summary`` (champions.json, history, champion_summary.csv) →
+    ``report`` and ``charts``. Fit stages are keyed by the model's full hyperparameters
+    (registry defaults plus tuned values from ``tuned_params.json``) and
+    ``MODEL_CODE_VERSION``, so adding a model fits only that model.
+    """
+    forecast_models = list(forecast_models or available_forecast_models())
+    rally_models = list(rally_models or available_rally_models())
+    artifacts = str(artifacts_dir)
+    stages: list[Stage] = []
+    for market in markets:
+        if market_frames is not None:
+            load = partial(_given_frame, market_frames[market])
+            stages.append(Stage(f"load.{market}", load, source=True))
+        else:
+            params = {"market": market, "data_dir": data_dir, "source": source}
+            stages.append(Stage(f"load.{market}", _load_stage, params=params, source=True))
+        stages.append(
+            Stage(
+                f"frame.{market}",
+                _frame_stage,
+                inputs=(f"load.{market}",),
+                params={"horizon": horizon},
+                version=FEATURE_CODE_VERSION,
+            )
+        )
+        tuned = tuned_overrides(load_tuned_params(Path(artifacts_dir) / market))
+        fits = []
+        for task, names in (("forecast", forecast_models), ("rally", rally_models)):
+            for name in names:
+                fits.append(f"fit.{market}.{task}.{name}")
+                stages.append(
+                    Stage(
+                        fits[-1],
+                        _fit_stage,
+                        inputs=(f"frame.{market}",),
+                        params={"task": task, "model": name, "params": model_params(task, name, tuned[task].get(name))},
+                        version=MODEL_CODE_VERSION,
+                    )
+                )
+        market_dir = Path(artifacts_dir) / market
+        stages.append(
+            Stage(
+                f"metrics.{market}",
+                _metrics_stage,
+                inputs=(f"frame.{market}", *fits),
+                params={
+                    "market": market,
+                    "artifacts_dir": artifacts,
+                    "forecast_models": forecast_models,
+                    "rally_models": rally_models,
+                },
+                version=STAGE_CODE_VERSION,
+                targets=(market_dir / "forecast_benchmark.csv", market_dir / "rally_benchmark.csv"),
+            )
+        )
+        stages.append(
+            Stage(
+                f"champions.{market}",
+                _champions_stage,
+                inputs=(f"metrics.{market}",),
+                params={"market": market, "tuned": tuned, "bootstrap_resamples": bootstrap_resamples},
+                version=STAGE_CODE_VERSION,
+            )
+        )
+    stages.append(
+        Stage(
+            "summary",
+            _summary_stage,
+            inputs=tuple(name for market in markets for name in (f"metrics.{market}", f"champions.{market}")),
+            params={
+                "markets": markets,
+                "artifacts_dir": artifacts,
+                "record_history": record_history,
+                "keep_prediction_runs": keep_prediction_runs,
+            },
+            version=STAGE_CODE_VERSION,
+            targets=(Path(artifacts_dir) / "champion_summary.csv",),
+        )
+    )
+    stages.append(
+        Stage(
+            "report",
+            _report_stage,
+            inputs=("summary",),
+            params={"artifacts_dir": artifacts, "report_path": str(report_path)},
+            version=STAGE_CODE_VERSION,
+            targets=(Path(report_path),),
+        )
+    )
+    stages.append(
+        Stage(
+            "charts",
+            _charts_stage,
+            inputs=("summary",),
+            params={"artifacts_dir": artifacts, "charts_dir": str(charts_dir)},
+            version=CHART_CODE_VERSION,
+            targets=(Path(charts_dir) / "README.md",),
+        )
+    )
+    return stages
+
+
+def run_incremental_benchmark(
+    *, artifacts_dir: Path, max_workers: int | None = None, force: bool = False, **options: Any
+) -> list[str]:
+    """Run ``benchmark_stages`` with their state under ``<artifacts_dir>/dag``; returns executed stages."""
+    stages = benchmark_stages(artifacts_dir=artifacts_dir, **options)
+    return run_stages(stages, Path(artifacts_dir) / DAG_DIR, max_workers=max_workers, force=force)
+
+
 def run_benchmark_pipeline(df: pd.DataFrame | None, artifacts_dir: Path, horizon: int) -> None:
     # Backward-compatible single-market entrypoint used by legacy tests.
     if df is None:
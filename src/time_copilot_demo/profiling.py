@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+# Set while a session is active so pool workers started inside it profile their spans too.
+PROFILE_DIR_ENV = "TIME_COPILOT_PROFILE_DIR"
+COLLAPSED_STACKS_FILE = "collapsed_stacks.txt"
+SUMMARY_FILE = "profile_summary.csv"
+
+
+class _StackSampler:
+    """Daemon thread that samples every thread's Python stack into collapsed-stack counts.
+
+    Each stack is prefixed with the profiling spans active on the sampled thread, so a
+    flame graph groups time by pipeline stage first.
+    """
+
+    def __init__(self, interval: float, spans_by_thread: dict[int, list[str]]) -> None:
+        self.interval = interval
+        self.spans_by_thread = spans_by_thread
+        self.counts: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames: list[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                spans = list(self.spans_by_thread.get(thread_id, ()))
+                self.counts[";".join([*spans, *reversed(frames)])] += 1
+
+    def write(self, path: Path) -> None:
+        # Brendan Gregg's collapsed format: "frame;frame;frame count", read by flamegraph.pl and speedscope.
+        lines = [f"{stack} {count}" for stack, count in sorted(self.counts.items())]
+        path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+
+
+class _Session:
+    def __init__(self, output_dir: Path, sampler: _StackSampler | None) -> None:
+        self.output_dir = output_dir
+        self.sampler = sampler
+        self.spans_by_thread: dict[int, list[str]] = sampler.spans_by_thread if sampler else {}
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._local = threading.local()
+
+    def next_seq(self) -> int:
+        with self._lock:
+            self._seq += 1
+            return self._seq
+
+    def profilers(self) -> list[cProfile.Profile | None]:
+        if not hasattr(self._local, "profilers"):
+            self._local.profilers = []
+        return self._local.profilers
+
+    def record(self, entry: dict[str, object]) -> None:
+        line = json.dumps(entry) + "\n"
+        with self._lock, open(self.output_dir / f"spans_{os.getpid()}.jsonl", "a", encoding="utf-8") as fh:
+            fh.write(line)
+
+
+_session: _Session | None = None
+_session_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    # A forked worker must not reuse the parent's session (its locks and profilers belong
+    # to parent threads); it starts a fresh one from PROFILE_DIR_ENV on its first span.
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _active_session() -> _Session | None:
+    global _session
+    if _session is None and os.environ.get(PROFILE_DIR_ENV):
+        # A pool worker forked or spawned during a session: profile spans, no stack sampler.
+        with _session_lock:
+            if _session is None:
+                _session = _Session(Path(os.environ[PROFILE_DIR_ENV]), sampler=None)
+    return _session
+
+
+def _file_stem(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+
+@contextmanager
+def profile_span(name: str) -> Iterator[None]:
+    """Profile the block as pipeline stage ``name``; a no-op unless a session is active.
+
+    Each span writes ``<seq>_<name>_<pid>.prof`` (cProfile, readable with ``pstats`` or
+    snakeviz) holding the span's own time: a nested span pauses its parent's profiler, so
+    child stages are not double-counted. Python allows one active cProfile per interpreter
+    on some versions, so a span that cannot start one (e.g. concurrent markets on threads)
+    still records wall time and stack samples but no ``.prof`` file.
+    """
+    session = _active_session()
+    if session is None:
+        yield
+        return
+
+    thread_id = threading.get_ident()
+    spans = session.spans_by_thread.setdefault(thread_id, [])
+    profilers = session.profilers()
+    parent = next((p for p in reversed(profilers) if p is not None), None)
+    if parent is not None:
+        parent.disable()
+    profiler: cProfile.Profile | None = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        profiler = None
+
+    spans.append(name)
+    profilers.append(profiler)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        profilers.pop()
+        spans.pop()
+        prof_file = None
+        if profiler is not None:
+            profiler.disable()
+            prof_file = f"{session.next_seq():04d}_{_file_stem(name)}_{os.getpid()}.prof"
+            profiler.dump_stats(session.output_dir / prof_file)
+        if parent is not None:
+            parent.enable()
+        session.record({"span": name, "seconds": seconds, "pid": os.getpid(), "prof": prof_file})
+
+
+@contextmanager
+def profile_session(output_dir: Path, *, sample_interval: float = 0.005) -> Iterator[Path]:
+    """Activate ``profile_span`` capture into ``output_dir`` (cleared first) for the block.
+
+    On exit writes ``collapsed_stacks.txt`` (stack samples of this process every
+    ``sample_interval`` seconds) and ``profile_summary.csv`` (calls and total seconds per
+    span, including spans run in pool workers started inside the session).
+    """
+    global _session
+    output_dir = Path(output_dir)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    sampler = _StackSampler(sample_interval, {})
+    with _session_lock:
+        if _session is not None:
+            raise RuntimeError("a profiling session is already active")
+        _session = _Session(output_dir, sampler)
+    os.environ[PROFILE_DIR_ENV] = str(output_dir.resolve())
+    sampler.start()
+    try:
+        with profile_span("session"):
+            yield output_dir
+    finally:
+        sampler.stop()
+        os.environ.pop(PROFILE_DIR_ENV, None)
+        with _session_lock:
+            _session = None
+        sampler.write(output_dir / COLLAPSED_STACKS_FILE)
+        write_profile_summary(output_dir)
+
+
+@contextmanager
+def maybe_profile(output_dir: Path, *, enabled: bool) -> Iterator[Path | None]:
+    """``profile_session(output_dir)`` when ``enabled`` (the CLI ``--profile`` flag), else nothing."""
+    if not enabled:
+        yield None
+        return
+    with profile_session(output_dir) as path:
+        yield path
+
+
+def write_profile_summary(output_dir: Path) -> pd.DataFrame:
+    """Aggregate the span records of every process into ``profile_summary.csv``."""
+    records = [
+        json.loads(line)
+        for path in sorted(Path(output_dir).glob("spans_*.jsonl"))
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line
+    ]
+    columns = ["span", "calls", "total_seconds", "mean_seconds", "max_seconds"]
+    if records:
+        spans = pd.DataFrame(records)
+        summary = (
+            spans.groupby("span")["seconds"]
+            .agg(calls="count", total_seconds="sum", mean_seconds="mean", max_seconds="max")
+            .reset_index()
+            .sort_values("total_seconds", ascending=False)
+        )
+    else:
+        summary = pd.DataFrame(columns=columns)
+    summary.to_csv(Path(output_dir) / SUMMARY_FILE, index=False)
+    return summary
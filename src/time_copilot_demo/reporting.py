@@ -4,6 +4,10 @@ from pathlib import Path
 
 import pandas as pd
 
+from time_copilot_demo.history import HISTORY_DIR, champion_history, load_summary_tables
+from time_copilot_demo.profiling import profile_span
+from time_copilot_demo.summaries import CALIBRATION_FILE, expected_calibration_error
+
 
 def _to_markdown_table(table: pd.DataFrame) -> str:
     headers = list(table.columns)
@@ -16,21 +20,71 @@ def _to_markdown_table(table: pd.DataFrame) -> str:
     return "\n".join(lines)
 
 
-def write_dual_market_report(artifacts_dir: Path, output_path: Path) -> None:
-    champion_summary = pd.read_csv(artifacts_dir / "champion_summary.csv")
+def _calibration_table(path: Path) -> pd.DataFrame | None:
+    # Pre-binned by the pipeline; artifacts written before the summaries existed have none.
+    if not path.exists():
+        return None
+    ece = expected_calibration_error(pd.read_csv(path))
+    return pd.DataFrame({"model": ece.index, "calibration_error": ece.round(4).to_numpy()})
+
+
+def _market_tables(artifacts_dir: Path, champion_summary: pd.DataFrame) -> dict[str, tuple[pd.DataFrame, pd.DataFrame]]:
+    markets = sorted(champion_summary["market"].unique())
+    stored = load_summary_tables(artifacts_dir, champion_summary)
+    if stored is None:
+        return {
+            market: (
+                pd.read_csv(artifacts_dir / market / "forecast_benchmark.csv"),
+                pd.read_csv(artifacts_dir / market / "rally_benchmark.csv"),
+            )
+            for market in markets
+        }
+    # One scan of the run's metric partitions, split back into per-market tables.
+    return {
+        market: tuple(
+            table[table["market"] == market].drop(columns="market").reset_index(drop=True)
+            for table in (stored["forecast"], stored["rally"])
+        )
+        for market in markets
+    }
+
+
+def _history_table(history: pd.DataFrame) -> pd.DataFrame:
+    # One row per run; each market/task column shows that run's champion and primary metric.
+    cells = history["model"] + " (" + history["value"].round(4).astype(str) + ")"
+    wide = history.assign(cell=cells).pivot(index="run_id", columns=["market", "task"], values="cell")
+    wide.columns = [f"{market} {task}" for market, task in wide.columns]
+    return wide.sort_index(ascending=False).fillna("-").reset_index()
+
+
+def write_dual_market_report(artifacts_dir: Path, output_path: Path, *, history_runs: int = 90) -> None:
+    """Write the markdown report for the latest run in ``artifacts_dir``.
+
+    Benchmark tables come from the run-history store when the summary's run is recorded
+    there (per-market CSVs otherwise), and a "Run History" section lists the champions of
+    the last ``history_runs`` recorded runs.
+    """
+    with profile_span("report.load"):
+        champion_summary = pd.read_csv(artifacts_dir / "champion_summary.csv")
+        market_tables = {
+            market: (forecast, rally, _calibration_table(artifacts_dir / market / CALIBRATION_FILE))
+            for market, (forecast, rally) in _market_tables(artifacts_dir, champion_summary).items()
+        }
+        history = champion_history(artifacts_dir / HISTORY_DIR, last=history_runs)
 
     parts: list[str] = []
     parts.append("# Dual-Market Time Copilot Benchmark Report")
     parts.append("")
+    if "run_id" in champion_summary.columns:
+        parts.append(f"Run `{champion_summary['run_id'].iloc[0]}`.")
+        parts.append("")
+        champion_summary = champion_summary.drop(columns="run_id")
     parts.append("## Champion Summary")
     parts.append(_to_markdown_table(champion_summary))
     parts.append("")
     parts.append("## Market Details")
 
-    for market in sorted(champion_summary["market"].unique()):
-        forecast = pd.read_csv(artifacts_dir / market / "forecast_benchmark.csv")
-        rally = pd.read_csv(artifacts_dir / market / "rally_benchmark.csv")
-
+    for market, (forecast, rally, calibration) in market_tables.items():
         parts.append(f"### {market}")
         parts.append("")
         parts.append("Forecast benchmark:")
@@ -39,6 +93,19 @@ def write_dual_market_report(artifacts_dir: Path, output_path: Path) -> None:
         parts.append("Rally benchmark:")
         parts.append(_to_markdown_table(rally))
         parts.append("")
+        if calibration is not None:
+            parts.append("Rally calibration (expected calibration error over 10 quantile bins, lower is better):")
+            parts.append(_to_markdown_table(calibration))
+            parts.append("")
+
+    if not history.empty:
+        parts.append("## Run History")
+        parts.append(
+            f"Champion and primary metric (sMAPE for forecast, PR-AUC for rally) of the last "
+            f"{history['run_id'].nunique()} recorded runs, newest first:"
+        )
+        parts.append(_to_markdown_table(_history_table(history)))
+        parts.append("")
 
     parts.append("## Business Interpretation")
     parts.append(
@@ -47,6 +114,7 @@ def write_dual_market_report(artifacts_dir: Path, output_path: Path) -> None:
     parts.append("- Champion selection is automated per market/task, enabling repeatable model governance.")
     parts.append("")
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(parts), encoding="utf-8")
+    with profile_span("report.write"):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text("\n".join(parts), encoding="utf-8")
 
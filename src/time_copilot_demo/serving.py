@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from time_copilot_demo.features import IncrementalFeatureState
+from time_copilot_demo.model_registry import predict_model
+from time_copilot_demo.model_store import load_champion_model
+from time_copilot_demo.pipeline import SUPERVISED_LAGS, SUPERVISED_WINDOWS
+
+# Latency samples kept for the percentiles in ``/stats``.
+STATS_WINDOW = 10_000
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class _MarketEndpoint:
+    """One market's champions, warm feature state and request queue."""
+
+    def __init__(self, market: str, market_dir: Path, history: pd.DataFrame, queue_size: int) -> None:
+        champions = json.loads((market_dir / "champions.json").read_text(encoding="utf-8"))
+        self.market = market
+        self.champions = {task: str(champions[task]["model"]) for task in ("forecast", "rally")}
+        self.models = {task: load_champion_model(market_dir, task) for task in ("forecast", "rally")}
+        history = history.sort_values("timestamp")
+        self.state = IncrementalFeatureState.from_history(
+            history, lags=SUPERVISED_LAGS, rolling_windows=SUPERVISED_WINDOWS
+        )
+        timestamps = pd.to_datetime(history["timestamp"])
+        self.last_timestamp = timestamps.iloc[-1]
+        self.step = timestamps.iloc[-1] - timestamps.iloc[-2]
+        self.queue: asyncio.Queue[tuple[dict[str, float], asyncio.Future]] = asyncio.Queue(maxsize=queue_size)
+
+    def next_timestamp(self, timestamp: pd.Timestamp | str | None = None) -> pd.Timestamp:
+        """The one row the warm state can score: one step after the last observed print.
+
+        Lag and rolling features always come from the latest prints, so any other
+        ``timestamp`` would mix its calendar features with the wrong history.
+        """
+        expected = self.last_timestamp + self.step
+        if timestamp is not None and pd.Timestamp(timestamp) != expected:
+            raise ValueError(f"can only score the next row ({expected.isoformat()}), not {timestamp}")
+        return expected
+
+    def predict_batch(self, rows: list[dict[str, float]]) -> tuple[np.ndarray, np.ndarray]:
+        X = pd.DataFrame(rows, columns=self.state.feature_names)
+        return predict_model("forecast", self.models["forecast"], X), predict_model("rally", self.models["rally"], X)
+
+
+class ForecastService:
+    """Champion forecasts and rally probabilities on demand, one micro-batched predict per burst.
+
+    Each market's champions (from ``champions.json`` and the model store, so the benchmark
+    must have run with persisted models) are loaded once, and an ``IncrementalFeatureState``
+    is warmed from its price history. ``predict`` builds the feature row on the event loop
+    and waits on a bounded per-market queue; a batcher task drains up to ``max_batch``
+    requests (waiting at most ``max_wait_ms`` after the first) into one vectorized predict
+    call per task, run off the loop. A full queue raises ``asyncio.QueueFull`` (HTTP 503).
+
+    ``start`` serves JSON over HTTP/1.1 (keep-alive) on TCP or a Unix socket:
+    ``GET /forecast?market=PJM[&timestamp=...]``, ``POST /observe`` with
+    ``{"market", "timestamp", "price"}`` to push a new print, ``GET /stats`` and ``GET /health``.
+    """
+
+    def __init__(
+        self,
+        artifacts_dir: Path,
+        histories: dict[str, pd.DataFrame],
+        *,
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0,
+        queue_size: int = 1024,
+    ) -> None:
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.markets = {
+            market: _MarketEndpoint(market, Path(artifacts_dir) / market, history, queue_size)
+            for market, history in histories.items()
+        }
+        self._latencies: deque[float] = deque(maxlen=STATS_WINDOW)
+        self._finished: deque[float] = deque(maxlen=STATS_WINDOW)
+        self._counts = {"requests": 0, "rejected": 0, "errors": 0, "batches": 0, "batched_requests": 0}
+        self._started = time.perf_counter()
+        self._batchers: list[asyncio.Task] = []
+        self._server: asyncio.Server | None = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 8765, *, unix_socket: str | None = None
+    ) -> asyncio.Server:
+        self._ensure_batchers()
+        if unix_socket is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        # Open keep-alive connections would otherwise keep their handlers waiting for requests.
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        for task in self._batchers:
+            task.cancel()
+        await asyncio.gather(*self._batchers, return_exceptions=True)
+        self._batchers = []
+
+    def _ensure_batchers(self) -> None:
+        if not self._batchers:
+            self._batchers = [asyncio.create_task(self._batch_loop(endpoint)) for endpoint in self.markets.values()]
+
+    async def predict(self, market: str, timestamp: pd.Timestamp | str | None = None) -> dict[str, Any]:
+        """Champion forecast and rally probability for the row at ``timestamp``.
+
+        Rows mean what they mean in ``*_predictions.parquet``: features from the prices
+        observed so far. Only the row one step after the last observed print can be scored;
+        ``timestamp`` defaults to it and any other value raises ``ValueError``.
+        """
+        endpoint = self.markets[market]
+        self._ensure_batchers()
+        start = time.perf_counter()
+        ts = endpoint.next_timestamp(timestamp)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            endpoint.queue.put_nowait((endpoint.state.feature_row(ts), future))
+        except asyncio.QueueFull:
+            self._counts["rejected"] += 1
+            raise
+        forecast, rally_prob = await future
+        self._record(start)
+        return {
+            "market": market,
+            "timestamp": ts.isoformat(),
+            "forecast": forecast,
+            "rally_prob": rally_prob,
+            "models": endpoint.champions,
+        }
+
+    def observe(self, market: str, timestamp: pd.Timestamp | str, price: float) -> None:
+        """Push the next print (one step after the last) so later requests see it in their features."""
+        endpoint = self.markets[market]
+        ts = pd.Timestamp(timestamp)
+        if ts != endpoint.next_timestamp():
+            # A skipped or repeated step would shift every lag without any error.
+            raise ValueError(
+                f"print at {ts} is not the next step after the last observed one ({endpoint.last_timestamp})"
+            )
+        endpoint.state.push(price)
+        endpoint.last_timestamp = ts
+
+    async def _batch_loop(self, endpoint: _MarketEndpoint) -> None:
+        while True:
+            batch = [await endpoint.queue.get()]
+            if endpoint.queue.qsize() < self.max_batch - 1:
+                # Give concurrent requests a moment to join this batch.
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not endpoint.queue.empty():
+                batch.append(endpoint.queue.get_nowait())
+            self._counts["batches"] += 1
+            self._counts["batched_requests"] += len(batch)
+            try:
+                # Off the loop, so requests keep queueing for the next batch meanwhile.
+                forecasts, rally_probs = await asyncio.to_thread(endpoint.predict_batch, [row for row, _ in batch])
+            except Exception as exc:
+                self._counts["errors"] += len(batch)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result((float(forecasts[i]), float(rally_probs[i])))
+
+    def _record(self, start: float) -> None:
+        now = time.perf_counter()
+        self._counts["requests"] += 1
+        self._latencies.append(now - start)
+        self._finished.append(now)
+
+    def stats(self, window_seconds: float = 10.0) -> dict[str, Any]:
+        """Latency percentiles over the last ``STATS_WINDOW`` requests and recent throughput."""
+        now = time.perf_counter()
+        latencies_ms = np.asarray(self._latencies) * 1000
+        window = min(window_seconds, now - self._started)
+        recent = sum(1 for finished in self._finished if finished >= now - window)
+        batches = self._counts["batches"]
+        return {
+            **self._counts,
+            "p50_ms": float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else None,
+            "p99_ms": float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else None,
+            "throughput_rps": recent / window if window > 0 else 0.0,
+            "mean_batch_size": self._counts["batched_requests"] / batches if batches else None,
+            "queue_depth": {market: endpoint.queue.qsize() for market, endpoint in self.markets.items()},
+            "uptime_seconds": now - self._started,
+        }
+
+    async def _route(self, method: str, target: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == "/health":
+            return 200, {"status": "ok", "markets": list(self.markets)}
+        if url.path == "/stats":
+            return 200, self.stats()
+        if url.path == "/forecast":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            market = query.get("market", "")
+            if market not in self.markets:
+                return 404, {"error": f"unknown market {market!r}"}
+            try:
+                timestamp = self.markets[market].next_timestamp(query.get("timestamp"))
+            except ValueError as exc:
+                return 400, {"error": str(exc)}
+            try:
+                return 200, await self.predict(market, timestamp)
+            except asyncio.QueueFull:
+                return 503, {"error": "request queue is full"}
+        if url.path == "/observe":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                payload = json.loads(body)
+                if payload["market"] not in self.markets:
+                    return 404, {"error": f"unknown market {payload['market']!r}"}
+                self.observe(payload["market"], payload["timestamp"], float(payload["price"]))
+            except (ValueError, KeyError, TypeError) as exc:
+                return 400, {"error": str(exc)}
+            return 200, {"status": "ok"}
+        return 404, {"error": f"no route {url.path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                try:
+                    status, payload = await self._route(method, target, body)
+                except Exception as exc:
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                writer.write(_response(status, payload))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+
+def _response(status: int, payload: dict[str, Any]) -> bytes:
+    data = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+    )
+    return head.encode("latin-1") + data
+
+
+class ServiceClient:
+    """Minimal keep-alive HTTP client for ``ForecastService`` (one request in flight at a time)."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(
+        cls, host: str = "127.0.0.1", port: int = 8765, *, unix_socket: str | None = None
+    ) -> ServiceClient:
+        if unix_socket is not None:
+            return cls(*await asyncio.open_unix_connection(unix_socket))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(
+        self, method: str, path: str, payload: dict[str, Any] | None = None
+    ) -> tuple[int, dict[str, Any]]:
+        body = b"" if payload is None else json.dumps(payload).encode()
+        head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import shutil
+import socket
+import tempfile
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+from time_copilot_demo.parallel import uses_processes
+
+
+# tmpfs when available, so the shared copy never touches disk.
+_SHM_DIR = "/dev/shm"
+_PREFIX = "shared_frame_"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_stale(root: Path, host: str) -> None:
+    # Directories of killed processes are never closed and would pin their RAM on tmpfs until reboot.
+    # Only this host's are checked: a pid means nothing on another host sharing a queue directory.
+    prefix = f"{_PREFIX}{host}_"
+    for path in root.glob(f"{prefix}*"):
+        pid = path.name[len(prefix) :].split("_", 1)[0]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _attach(path: str) -> np.ndarray:
+    # Read-only, so every process shares the same page-cache pages and nothing writes through.
+    # Not cached: the mapping lives as long as the arrays loaded from it.
+    return np.load(path, mmap_mode="r")
+
+
+def _block_frame(path: str, positions: list[int], columns: list[str], start: int, stop: int) -> pd.DataFrame:
+    block = _attach(path)
+    if positions == list(range(positions[0], positions[-1] + 1)):
+        values = block[start:stop, positions[0] : positions[-1] + 1]
+    else:
+        values = block[start:stop, positions]
+    return pd.DataFrame(values, index=pd.RangeIndex(start, stop), columns=columns, copy=False)
+
+
+@dataclass(frozen=True)
+class FrameView:
+    """Rows ``start:stop`` of some columns of a ``SharedFrame``; pickles to a few hundred bytes.
+
+    ``load()`` maps the backing files and returns a DataFrame (or a Series for a single
+    column name) over them without copying; registry ``fit_model``/``predict_model``
+    accept views directly.
+    """
+
+    columns: tuple[str, ...]
+    # Backing file and column position of each entry of ``columns``.
+    layout: tuple[tuple[str, int], ...]
+    start: int
+    stop: int
+    series: bool = False
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def iloc(self) -> _ViewRows:
+        """Positional row slicing (``view.iloc[a:b]``) like a DataFrame's, returning a view."""
+        return _ViewRows(self)
+
+    def load(self) -> pd.DataFrame | pd.Series:
+        groups: dict[str, list[tuple[int, str]]] = {}
+        for column, (path, position) in zip(self.columns, self.layout):
+            groups.setdefault(path, []).append((position, column))
+        parts = [
+            _block_frame(path, [p for p, _ in entries], [c for _, c in entries], self.start, self.stop)
+            for path, entries in groups.items()
+        ]
+        frame = parts[0] if len(parts) == 1 else pd.concat(parts, axis=1)
+        if list(frame.columns) != list(self.columns):
+            frame = frame[list(self.columns)]
+        return frame[self.columns[0]] if self.series else frame
+
+
+@dataclass(frozen=True)
+class _ViewRows:
+    view: FrameView
+
+    def __getitem__(self, rows: slice) -> FrameView:
+        if not isinstance(rows, slice):
+            raise TypeError("shared frame views only support row slices")
+        start, stop, step = rows.indices(len(self.view))
+        if step != 1:
+            raise ValueError("shared frame views only support contiguous row slices")
+        return replace(self.view, start=self.view.start + start, stop=self.view.start + max(start, stop))
+
+
+def materialize(data: Any) -> Any:
+    """``data.load()`` for a ``FrameView``; anything else (e.g. a DataFrame) unchanged."""
+    return data.load() if isinstance(data, FrameView) else data
+
+
+class SharedFrame:
+    """Columns of a DataFrame in memory-mapped ``.npy`` files that workers attach to zero-copy.
+
+    Columns are grouped by dtype into one column-major array per dtype, so each column
+    (and each run of adjacent same-dtype columns) is a contiguous slice of one mapping and
+    loads keep every column's dtype. A frame of one dtype (like the supervised frame, whose
+    features are all float64) is a single block, so a contiguous run of its columns loads
+    as one array that estimators use without converting, and so without a private copy.
+    All processes that attach share a single copy of the data in the page cache instead of
+    unpickling their own. Use as a context manager; the files are removed on exit, and
+    directories left behind by killed processes on this host are removed on creation.
+    """
+
+    def __init__(self, frame: pd.DataFrame, root: Path | None = None) -> None:
+        if root is None and os.path.isdir(_SHM_DIR):
+            root = Path(_SHM_DIR)
+        host = socket.gethostname()
+        _remove_stale(Path(root if root is not None else tempfile.gettempdir()), host)
+        prefix = f"{_PREFIX}{host}_{os.getpid()}_"
+        self.root = Path(tempfile.mkdtemp(prefix=prefix, dir=root)).resolve()
+        self.n_rows = len(frame)
+        self._layout: dict[str, tuple[str, int]] = {}
+        groups: dict[np.dtype, list[str]] = {}
+        for column in frame.columns:
+            groups.setdefault(frame[column].dtype, []).append(column)
+        for i, (dtype, columns) in enumerate(groups.items()):
+            path = self.root / f"block_{i}.npy"
+            block = np.lib.format.open_memmap(
+                path, mode="w+", dtype=dtype, shape=(self.n_rows, len(columns)), fortran_order=True
+            )
+            for position, column in enumerate(columns):
+                block[:, position] = frame[column].to_numpy()
+                self._layout[column] = (str(path), position)
+            block.flush()
+            del block
+
+    def view(self, columns: str | list[str], start: int = 0, stop: int | None = None) -> FrameView:
+        """A view of ``columns`` (one name gives a Series view) over rows ``start:stop``."""
+        names = [columns] if isinstance(columns, str) else list(columns)
+        return FrameView(
+            columns=tuple(names),
+            layout=tuple(self._layout[name] for name in names),
+            start=start,
+            stop=self.n_rows if stop is None else stop,
+            series=isinstance(columns, str),
+        )
+
+    def close(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> SharedFrame:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+@contextmanager
+def shared_inputs(
+    frame: pd.DataFrame,
+    columns: dict[str, str | list[str]],
+    *,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> Iterator[dict[str, Any]]:
+    """``{name: frame[cols]}`` for each entry of ``columns``, for building ``run_jobs`` jobs.
+
+    When those jobs run in worker processes (``uses_processes``), the values are
+    ``FrameView``s of one ``SharedFrame`` copy of the needed columns instead, valid until
+    the block exits. The copy goes in the executor's ``shared_dir`` if it has one (e.g. a
+    ``QueueExecutor``, whose workers may run on other hosts). Either kind of value
+    supports ``.iloc[a:b]``, so job-building code is the same for both.
+    """
+    if not uses_processes(max_workers, executor):
+        yield {name: frame[cols] for name, cols in columns.items()}
+        return
+    needed = list(dict.fromkeys(c for cols in columns.values() for c in ([cols] if isinstance(cols, str) else cols)))
+    root = getattr(executor, "shared_dir", None)
+    if root is not None:
+        Path(root).mkdir(parents=True, exist_ok=True)
+    with SharedFrame(frame[needed], root=root) as shared:
+        yield {name: shared.view(cols) for name, cols in columns.items()}
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+
+# Compact per-market summaries of the row-level prediction files, read by charts and reports.
+CALIBRATION_FILE = "rally_calibration.csv"
+CURVES_FILE = "rally_curves.csv"
+RESIDUALS_FILE = "forecast_residuals.csv"
+CALIBRATION_BINS = 10
+CURVE_POINTS = 200
+RESIDUAL_BINS = 40
+
+
+def calibration_bins(
+    y_true: ArrayLike, probs: ArrayLike, models: list[str], *, n_bins: int = CALIBRATION_BINS
+) -> pd.DataFrame:
+    """Quantile-binned reliability data per model, as ``sklearn.calibration.calibration_curve``.
+
+    One row per non-empty bin: ``mean_pred`` and ``frac_pos`` are the curve's x and y, and
+    ``count`` the rows in the bin (for calibration error).
+    """
+    y = np.asarray(y_true, dtype=float)
+    frames = []
+    for model, prob in zip(models, np.atleast_2d(np.asarray(probs, dtype=float))):
+        edges = np.percentile(prob, np.linspace(0, 1, n_bins + 1) * 100)
+        bin_ids = np.searchsorted(edges[1:-1], prob)
+        total = np.bincount(bin_ids, minlength=n_bins)
+        nonzero = total != 0
+        frames.append(
+            pd.DataFrame(
+                {
+                    "model": model,
+                    "bin": np.flatnonzero(nonzero),
+                    "mean_pred": np.bincount(bin_ids, weights=prob, minlength=n_bins)[nonzero] / total[nonzero],
+                    "frac_pos": np.bincount(bin_ids, weights=y, minlength=n_bins)[nonzero] / total[nonzero],
+                    "count": total[nonzero],
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=["model", "bin", "mean_pred", "frac_pos", "count"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _thin(n_points: int, max_points: int) -> np.ndarray:
+    # Evenly spaced positions along the curve, always keeping both ends.
+    if n_points <= max_points:
+        return np.arange(n_points)
+    return np.unique(np.linspace(0, n_points - 1, max_points).round().astype(int))
+
+
+def curve_points(
+    y_true: ArrayLike, probs: ArrayLike, models: list[str], *, max_points: int = CURVE_POINTS
+) -> pd.DataFrame:
+    """PR and ROC curve points per model, thinned to at most ``max_points`` thresholds each.
+
+    ``curve`` is ``"pr"`` (x = recall, y = precision) or ``"roc"`` (x = FPR, y = TPR). Points
+    sit at distinct score thresholds, as in sklearn's curves; single-class targets give none.
+    """
+    y = np.asarray(y_true, dtype=float) == 1
+    n_pos = int(y.sum())
+    n_neg = len(y) - n_pos
+    frames = []
+    for model, prob in zip(models, np.atleast_2d(np.asarray(probs, dtype=float))):
+        if n_pos == 0 or n_neg == 0:
+            continue
+        order = np.argsort(-prob, kind="stable")
+        scores = prob[order]
+        ends = np.flatnonzero(np.r_[scores[:-1] != scores[1:], True])
+        tps = np.cumsum(y[order])[ends].astype(float)
+        fps = ends + 1 - tps
+        keep = _thin(len(ends), max_points)
+        thresholds = scores[ends][keep]
+        roc = pd.DataFrame(
+            {
+                "model": model,
+                "curve": "roc",
+                "threshold": np.r_[np.inf, thresholds],
+                "x": np.r_[0.0, fps[keep] / n_neg],
+                "y": np.r_[0.0, tps[keep] / n_pos],
+            }
+        )
+        pr = pd.DataFrame(
+            {
+                "model": model,
+                "curve": "pr",
+                "threshold": thresholds,
+                "x": tps[keep] / n_pos,
+                "y": tps[keep] / (ends[keep] + 1),
+            }
+        )
+        frames += [pr, roc]
+    if not frames:
+        return pd.DataFrame(columns=["model", "curve", "threshold", "x", "y"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def residual_histograms(
+    y_true: ArrayLike, preds: ArrayLike, models: list[str], *, n_bins: int = RESIDUAL_BINS
+) -> pd.DataFrame:
+    """Histogram of ``y_true - pred`` per model on bin edges shared by all models.
+
+    Edges span the 0.5-99.5 percentile range of all residuals; the tails are counted in
+    the outermost bins, so every row is counted once.
+    """
+    y = np.asarray(y_true, dtype=float)
+    residuals = y - np.atleast_2d(np.asarray(preds, dtype=float))
+    if residuals.size == 0:
+        return pd.DataFrame(columns=["model", "bin_left", "bin_right", "count"])
+    low, high = np.percentile(residuals, [0.5, 99.5])
+    if high <= low:
+        low, high = low - 0.5, high + 0.5
+    edges = np.linspace(low, high, n_bins + 1)
+    frames = []
+    for model, residual in zip(models, residuals):
+        counts, _ = np.histogram(np.clip(residual, low, high), bins=edges)
+        frames.append(pd.DataFrame({"model": model, "bin_left": edges[:-1], "bin_right": edges[1:], "count": counts}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_prediction_summaries(
+    market_dir: Path,
+    *,
+    y_forecast: ArrayLike,
+    forecast_preds: ArrayLike,
+    forecast_models: list[str],
+    y_rally: ArrayLike,
+    rally_probs: ArrayLike,
+    rally_models: list[str],
+) -> None:
+    """Write the calibration, PR/ROC and residual summaries next to the prediction files."""
+    calibration_bins(y_rally, rally_probs, rally_models).to_csv(market_dir / CALIBRATION_FILE, index=False)
+    curve_points(y_rally, rally_probs, rally_models).to_csv(market_dir / CURVES_FILE, index=False)
+    residual_histograms(y_forecast, forecast_preds, forecast_models).to_csv(market_dir / RESIDUALS_FILE, index=False)
+
+
+def expected_calibration_error(calibration: pd.DataFrame) -> pd.Series:
+    """Count-weighted mean ``|frac_pos - mean_pred|`` per model from ``calibration_bins`` rows."""
+    gap = (calibration["frac_pos"] - calibration["mean_pred"]).abs() * calibration["count"]
+    counts = calibration.groupby("model", sort=False)["count"].sum()
+    return gap.groupby(calibration["model"], sort=False).sum() / counts
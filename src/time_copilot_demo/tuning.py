@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import math
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from time_copilot_demo.atomic import atomic_write_text
+from time_copilot_demo.backtest import BacktestFold, walk_forward_folds
+from time_copilot_demo.evaluate import batch_classification_metrics, forecast_metrics
+from time_copilot_demo.model_registry import (
+    import_model_modules,
+    model_params,
+    predict_task,
+    search_space,
+)
+from time_copilot_demo.parallel import run_jobs
+from time_copilot_demo.shared_frame import materialize, shared_inputs
+
+TUNED_PARAMS_FILE = "tuned_params.json"
+TUNING_TRIALS_FILE = "tuning_trials.csv"
+TUNING_METRICS = {"forecast": "smape", "rally": "pr_auc"}
+
+
+def space_fingerprint(task: str, model_name: str) -> str:
+    """Hash of a model's defaults and search space; tuned params from another space are stale."""
+    payload = {"defaults": model_params(task, model_name), "space": search_space(task, model_name)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def sample_candidates(task: str, model_name: str, n_candidates: int, seed: int = 7) -> list[dict[str, Any]]:
+    """The default configuration followed by distinct random grid points (the whole grid if smaller)."""
+    space = search_space(task, model_name)
+    names = list(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    defaults = model_params(task, model_name)
+    default_point = {name: defaults[name] for name in names if name in defaults}
+
+    rng = np.random.default_rng(seed)
+    candidates = [default_point]
+    for index in rng.permutation(len(grid)):
+        if len(candidates) >= n_candidates:
+            break
+        point = grid[int(index)]
+        if point not in candidates:
+            candidates.append(point)
+    return candidates
+
+
+def _fold_loss(
+    task: str,
+    model_name: str,
+    params: dict[str, Any],
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_test: pd.DataFrame,
+    y_test: pd.Series,
+) -> float:
+    y_train, y_test = materialize(y_train), materialize(y_test)
+    if task == "forecast":
+        return forecast_metrics(y_test, predict_task(task, model_name, X_train, y_train, X_test, params))["smape"]
+    if y_test.nunique() < 2 or y_train.nunique() < 2:
+        # PR-AUC is undefined on a single-class test window, and classifiers cannot fit one class.
+        return float("nan")
+    pred = predict_task(task, model_name, X_train, y_train, X_test, params)
+    return -float(batch_classification_metrics(y_test, pred)["pr_auc"][0])
+
+
+def _halving_jobs(
+    task: str,
+    model_name: str,
+    candidates: list[dict[str, Any]],
+    X: pd.DataFrame,
+    y: pd.Series,
+    folds: list[BacktestFold],
+    fraction: float,
+) -> list[tuple]:
+    jobs = []
+    for params in candidates:
+        for fold in folds:
+            # The budget is the most recent share of each fold's training window.
+            n_train = fold.train.stop - fold.train.start
+            start = fold.train.stop - max(1, math.ceil(n_train * fraction))
+            train = slice(start, fold.train.stop)
+            jobs.append(
+                (task, model_name, params, X.iloc[train], y.iloc[train], X.iloc[fold.test], y.iloc[fold.test])
+            )
+    return jobs
+
+
+def successive_halving(
+    task: str,
+    model_name: str,
+    X: pd.DataFrame,
+    y: pd.Series,
+    folds: list[BacktestFold],
+    *,
+    n_candidates: int = 9,
+    eta: int = 3,
+    min_fraction: float | None = None,
+    seed: int = 7,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> tuple[dict[str, Any], pd.DataFrame]:
+    """Pick hyperparameters for one model by successive halving over training size.
+
+    Every rung scores the surviving candidates on all ``folds`` (in parallel through
+    ``run_jobs``) using the latest ``fraction`` of each fold's training rows, keeps the
+    best ``1/eta`` and multiplies ``fraction`` by ``eta``, so losers are dropped after
+    cheap small-sample fits. Returns the winning overrides and one trial row per
+    candidate and rung (``loss`` is sMAPE for forecasts, negative PR-AUC for rallies).
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    candidates = sample_candidates(task, model_name, n_candidates, seed=seed)
+    if min_fraction is None:
+        min_fraction = float(eta) ** -math.floor(math.log(len(candidates), eta))
+    import_model_modules(model_name)
+
+    trials: list[dict[str, Any]] = []
+    fraction = min_fraction
+    rung = 0
+    while True:
+        jobs = _halving_jobs(task, model_name, candidates, X, y, folds, fraction)
+        losses = np.asarray(run_jobs(_fold_loss, jobs, max_workers=max_workers, executor=executor), dtype=float)
+        per_candidate = losses.reshape(len(candidates), len(folds))
+        with np.errstate(all="ignore"):
+            scores = np.where(np.isnan(per_candidate).all(axis=1), np.inf, np.nanmean(per_candidate, axis=1))
+        for params, loss in zip(candidates, scores):
+            trials.append(
+                {
+                    "task": task,
+                    "model": model_name,
+                    "rung": rung,
+                    "train_fraction": fraction,
+                    "params": json.dumps(params, sort_keys=True),
+                    "loss": loss,
+                }
+            )
+        if len(candidates) == 1 or fraction >= 1.0:
+            break
+        # Stable sort: on ties the earlier candidate (the defaults come first) survives.
+        order = np.argsort(scores, kind="stable")[: max(1, len(candidates) // eta)]
+        candidates = [candidates[i] for i in order]
+        fraction = min(1.0, fraction * eta)
+        rung += 1
+
+    best = candidates[int(np.argmin(scores))]
+    return best, pd.DataFrame(trials)
+
+
+def tune_models(
+    frame: pd.DataFrame,
+    feature_cols: list[str],
+    *,
+    forecast_models: list[str],
+    rally_models: list[str],
+    horizon: int,
+    n_folds: int = 3,
+    n_candidates: int = 9,
+    eta: int = 3,
+    seed: int = 7,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> tuple[dict[str, dict[str, dict[str, Any]]], pd.DataFrame]:
+    """Tune every model that declares a search space on walk-forward folds of ``frame``.
+
+    ``frame`` should be the training part only, so the holdout never informs tuning.
+    The folds are built once and shared by all models, candidates and rungs. Returns
+    ``{task: {model: entry}}`` in the ``tuned_params.json`` layout plus all trials.
+    """
+    folds = walk_forward_folds(frame["timestamp"], n_folds=n_folds, gap=horizon)
+    tuned: dict[str, dict[str, dict[str, Any]]] = {"forecast": {}, "rally": {}}
+    trial_tables = []
+    # One shared copy of the frame serves every rung's worker jobs.
+    with shared_inputs(
+        frame,
+        {"X": feature_cols, "forecast": "target_price", "rally": "target_rally"},
+        max_workers=max_workers,
+        executor=executor,
+    ) as inputs:
+        for task, names in (("forecast", forecast_models), ("rally", rally_models)):
+            for name in names:
+                if not search_space(task, name):
+                    continue
+                best, trials = successive_halving(
+                    task,
+                    name,
+                    inputs["X"],
+                    inputs[task],
+                    folds,
+                    n_candidates=n_candidates,
+                    eta=eta,
+                    seed=seed,
+                    max_workers=max_workers,
+                    executor=executor,
+                )
+                final = trials[trials["rung"] == trials["rung"].max()]["loss"].min()
+                score = -final if task == "rally" else final
+                tuned[task][name] = {
+                    "params": best,
+                    "metric": TUNING_METRICS[task],
+                    "score": None if math.isinf(score) else float(score),
+                    "n_trials": len(trials),
+                    "space": space_fingerprint(task, name),
+                }
+                trial_tables.append(trials)
+    trials = pd.concat(trial_tables, ignore_index=True) if trial_tables else pd.DataFrame()
+    return tuned, trials
+
+
+def load_tuned_params(market_dir: Path) -> dict[str, dict[str, dict[str, Any]]]:
+    """Tuned entries of ``tuned_params.json`` whose search space is unchanged (others are stale)."""
+    path = Path(market_dir) / TUNED_PARAMS_FILE
+    if not path.exists():
+        return {"forecast": {}, "rally": {}}
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    current: dict[str, dict[str, dict[str, Any]]] = {"forecast": {}, "rally": {}}
+    for task in current:
+        for name, entry in saved.get(task, {}).items():
+            try:
+                fingerprint = space_fingerprint(task, name)
+            except ValueError:
+                continue
+            if entry.get("space") == fingerprint:
+                current[task][name] = entry
+    return current
+
+
+def save_tuned_params(
+    market_dir: Path, tuned: dict[str, dict[str, dict[str, Any]]], trials: pd.DataFrame | None = None
+) -> None:
+    market_dir = Path(market_dir)
+    market_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(market_dir / TUNED_PARAMS_FILE, json.dumps(tuned, indent=2, sort_keys=True))
+    if trials is not None and len(trials):
+        trials.to_csv(market_dir / TUNING_TRIALS_FILE, index=False)
+
+
+def tuned_overrides(tuned: dict[str, dict[str, dict[str, Any]]]) -> dict[str, dict[str, dict[str, Any]]]:
+    """``{task: {model: params}}`` from a tuned-params document, for ``run_market_benchmark`` fits."""
+    return {task: {name: dict(entry["params"]) for name, entry in models.items()} for task, models in tuned.items()}
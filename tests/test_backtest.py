@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from time_copilot_demo.backtest import aggregate_folds, walk_forward_folds
+from time_copilot_demo.champion import pick_forecast_champion
+from time_copilot_demo.pipeline import run_market_benchmark, synthetic_pjm_like
+
+
+def test_walk_forward_folds_tile_the_tail_with_purge_gap():
+    ts = pd.Series(pd.date_range("2024-01-01", periods=100, freq="h"))
+
+    folds = walk_forward_folds(ts, n_folds=4, test_size=5, gap=3)
+
+    assert [f.test for f in folds] == [slice(80, 85), slice(85, 90), slice(90, 95), slice(95, 100)]
+    assert [f.train for f in folds] == [slice(0, 77), slice(0, 82), slice(0, 87), slice(0, 92)]
+    assert folds[0].split.train_end == ts.iloc[76]
+    assert folds[0].split.test_start == ts.iloc[80]
+
+
+def test_rolling_folds_keep_a_fixed_train_window():
+    ts = pd.Series(pd.date_range("2024-01-01", periods=100, freq="h"))
+
+    folds = walk_forward_folds(ts, n_folds=2, test_size=10, gap=2, expanding=False, train_size=30)
+
+    assert [f.train for f in folds] == [slice(48, 78), slice(58, 88)]
+
+
+def test_walk_forward_folds_reject_too_many_folds():
+    ts = pd.Series(pd.date_range("2024-01-01", periods=20, freq="h"))
+
+    with pytest.raises(ValueError, match="not enough rows"):
+        walk_forward_folds(ts, n_folds=4, test_size=5, gap=1)
+
+
+def test_aggregated_fold_table_is_rankable():
+    folds = pd.DataFrame(
+        [
+            {"fold": 0, "model": "a", "mae": 1.0, "rmse": 1.0, "smape": 10.0},
+            {"fold": 1, "model": "a", "mae": 3.0, "rmse": 3.0, "smape": 12.0},
+            {"fold": 0, "model": "b", "mae": 2.0, "rmse": 2.0, "smape": 9.0},
+            {"fold": 1, "model": "b", "mae": 2.0, "rmse": 2.0, "smape": 11.0},
+        ]
+    )
+
+    table = aggregate_folds(folds, ("mae", "rmse", "smape"))
+
+    assert table.loc[table["model"] == "a", "mae_std"].item() == 1.0
+    assert pick_forecast_champion(table)["model"] == "b"
+
+
+def test_run_market_benchmark_writes_backtest_tables(tmp_path: Path):
+    run_market_benchmark(
+        market="PJM",
+        df=synthetic_pjm_like(24 * 75),
+        artifacts_dir=tmp_path,
+        forecast_models=["naive", "lear"],
+        rally_models=["naive", "logreg"],
+        backtest_folds=3,
+    )
+
+    market_dir = tmp_path / "PJM"
+    fold_table = pd.read_csv(market_dir / "backtest_forecast_folds.csv")
+    assert sorted(fold_table["fold"].unique()) == [0, 1, 2]
+    assert len(pd.read_csv(market_dir / "backtest_rally.csv")) == 2
+    champions = json.loads((market_dir / "backtest_champions.json").read_text(encoding="utf-8"))
+    assert champions["forecast"]["n_folds"] == 3
@@ -0,0 +1,74 @@
+import numpy as np
+
+from time_copilot_demo.bootstrap import (
+    bootstrap_classification_metrics,
+    bootstrap_forecast_metrics,
+    champion_bootstrap,
+    default_block_length,
+    moving_block_starts,
+)
+from time_copilot_demo.evaluate import batch_classification_metrics, batch_forecast_metrics
+
+
+def _resample(starts_row: np.ndarray, block_length: int) -> np.ndarray:
+    return (starts_row[:, None] + np.arange(block_length)).ravel()
+
+
+def test_moving_block_starts_stay_inside_window():
+    starts = moving_block_starts(100, 50, 24)
+
+    assert starts.shape == (50, 5)
+    assert starts.min() >= 0 and starts.max() <= 100 - 24
+
+
+def test_default_block_length_is_at_least_a_day_and_at_most_the_window():
+    assert default_block_length(500) == 24
+    assert default_block_length(10) == 10
+    assert default_block_length(100_000) == 46
+
+
+def test_bootstrap_metrics_match_explicit_resamples():
+    rng = np.random.default_rng(0)
+    n, block_length = 300, 24
+    y_price = rng.normal(50, 5, n)
+    forecasts = y_price + rng.normal(0, [[1.0], [2.0]], (2, n))
+    y_rally = (rng.random(n) < 0.2).astype(float)
+    probs = np.vstack([rng.random(n), np.round(rng.random(n), 1)])
+    starts = moving_block_starts(n, 20, block_length, seed=1)
+
+    forecast = bootstrap_forecast_metrics(y_price, forecasts, starts, block_length)
+    rally = bootstrap_classification_metrics(y_rally, probs, starts, block_length)
+
+    for r in range(len(starts)):
+        idx = _resample(starts[r], block_length)
+        expected_forecast = batch_forecast_metrics(y_price[idx], forecasts[:, idx])
+        expected_rally = batch_classification_metrics(y_rally[idx], probs[:, idx])
+        for metric, values in forecast.items():
+            np.testing.assert_allclose(values[:, r], expected_forecast[metric], rtol=1e-10)
+        for metric, values in rally.items():
+            np.testing.assert_allclose(values[:, r], expected_rally[metric], rtol=1e-10)
+
+
+def test_champion_bootstrap_reports_intervals_and_win_probabilities():
+    rng = np.random.default_rng(2)
+    n = 480
+    y_price = rng.normal(50, 5, n)
+    y_rally = (rng.random(n) < 0.3).astype(float)
+    good = np.clip(0.6 * y_rally + rng.normal(0.2, 0.1, n), 0, 1)
+
+    report = champion_bootstrap(
+        y_forecast=y_price,
+        forecast_preds=np.vstack([y_price + rng.normal(0, 1, n), y_price + rng.normal(0, 8, n)]),
+        forecast_models=["sharp", "noisy"],
+        y_rally=y_rally,
+        rally_probs=np.vstack([good, rng.random(n)]),
+        rally_models=["good", "coin"],
+        n_resamples=500,
+    )
+
+    assert report["n_resamples"] == 500 and report["block_length"] == 24
+    low, high = report["forecast"]["sharp"]["smape_ci"]
+    assert low < high
+    assert report["forecast"]["sharp"]["win_prob"] == 1.0
+    assert report["rally"]["good"]["win_prob"] == 1.0
+    assert sum(entry["win_prob"] for entry in report["rally"].values()) == 1.0
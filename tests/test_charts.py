@@ -3,7 +3,8 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
-from time_copilot_demo.charts import generate_chart_pack
+from time_copilot_demo.charts import _pareto_frontier, generate_chart_pack
+from time_copilot_demo.summaries import CALIBRATION_FILE, calibration_bins
 
 
 EXPECTED_FILES = {
@@ -89,3 +90,94 @@ def test_generate_chart_pack_outputs_expected_files(tmp_path: Path):
 
     actual = {p.name for p in output.iterdir()}
     assert EXPECTED_FILES.issubset(actual)
+
+
+def test_forecast_efficiency_uses_cost_columns_when_present(tmp_path: Path):
+    artifacts = tmp_path / "artifacts"
+    output = tmp_path / "charts"
+    _seed_artifacts(artifacts)
+    for market in ["PJM", "NP"]:
+        path = artifacts / market / "forecast_benchmark.csv"
+        forecast = pd.read_csv(path)
+        forecast["fit_seconds"] = [0.001, 0.2, 1.5, 9.0]
+        forecast["predict_seconds"] = 0.01
+        forecast["predict_rows_per_sec"] = 1e5
+        forecast["peak_mem_mb"] = [120.0, 150.0, 300.0, 420.0]
+        forecast.to_csv(path, index=False)
+
+    generate_chart_pack(artifacts_dir=artifacts, output_dir=output)
+
+    assert (output / "04_forecast_efficiency.png").stat().st_size > 0
+
+
+def test_pareto_frontier_drops_dominated_models():
+    points = pd.DataFrame({"fit_seconds": [0.1, 1.0, 2.0, 5.0], "smape": [18.0, 12.0, 14.0, 11.0]})
+
+    assert _pareto_frontier(points, "fit_seconds", "smape")["smape"].tolist() == [18.0, 12.0, 11.0]
+
+
+def test_generate_chart_pack_skips_charts_with_unchanged_inputs(tmp_path: Path):
+    artifacts = tmp_path / "artifacts"
+    output = tmp_path / "charts"
+    _seed_artifacts(artifacts)
+
+    first = generate_chart_pack(artifacts_dir=artifacts, output_dir=output, max_workers=2)
+    assert sorted(first) == sorted(EXPECTED_FILES - {"README.md"})
+    assert (output / "chart_manifest.json").exists()
+
+    # Rewriting identical artifacts (e.g. a rerun that reproduced the same results) draws nothing.
+    pd.read_csv(artifacts / "NP" / "rally_benchmark.csv").to_csv(artifacts / "NP" / "rally_benchmark.csv", index=False)
+    assert generate_chart_pack(artifacts_dir=artifacts, output_dir=output) == []
+
+    # A one-market rerun that only moved NP's forecast errors redraws only the forecast charts.
+    path = artifacts / "NP" / "forecast_benchmark.csv"
+    forecast = pd.read_csv(path)
+    forecast["smape"] += 0.5
+    forecast.to_csv(path, index=False)
+    assert sorted(generate_chart_pack(artifacts_dir=artifacts, output_dir=output)) == [
+        "02_forecast_smape.png",
+        "04_forecast_efficiency.png",
+    ]
+
+    (output / "03_rally_prauc.png").unlink()
+    assert generate_chart_pack(artifacts_dir=artifacts, output_dir=output) == ["03_rally_prauc.png"]
+    assert len(generate_chart_pack(artifacts_dir=artifacts, output_dir=output, force=True)) == 5
+
+
+def test_calibration_chart_reads_prebinned_summary_not_predictions(tmp_path: Path, monkeypatch):
+    artifacts = tmp_path / "artifacts"
+    output = tmp_path / "charts"
+    _seed_artifacts(artifacts)
+    for market in ["PJM", "NP"]:
+        preds = pd.read_parquet(artifacts / market / "rally_predictions.parquet")
+        models = [c[: -len("_prob")] for c in preds.columns if c.endswith("_prob")]
+        bins = calibration_bins(preds["y_true"], preds[[f"{m}_prob" for m in models]].to_numpy().T, models)
+        bins.to_csv(artifacts / market / CALIBRATION_FILE, index=False)
+
+    def no_parquet(*args, **kwargs):
+        raise AssertionError("row-level predictions should not be loaded")
+
+    monkeypatch.setattr(pd, "read_parquet", no_parquet)
+    generate_chart_pack(artifacts_dir=artifacts, output_dir=output, max_workers=1)
+
+    assert (output / "05_rally_calibration.png").stat().st_size > 0
+
+
+def test_timing_jitter_does_not_redraw_the_efficiency_chart(tmp_path: Path):
+    artifacts = tmp_path / "artifacts"
+    output = tmp_path / "charts"
+    _seed_artifacts(artifacts)
+    path = artifacts / "PJM" / "forecast_benchmark.csv"
+    forecast = pd.read_csv(path).assign(fit_seconds=[0.012, 0.2, 1.5, 9.0], peak_mem_mb=[120.0, 150.0, 300.0, 420.0])
+    forecast.to_csv(path, index=False)
+    generate_chart_pack(artifacts_dir=artifacts, output_dir=output, max_workers=1)
+
+    # A rerun with the same results but slightly different timings and memory.
+    forecast.assign(fit_seconds=forecast["fit_seconds"] * 1.04, peak_mem_mb=forecast["peak_mem_mb"] + 2).to_csv(
+        path, index=False
+    )
+    assert generate_chart_pack(artifacts_dir=artifacts, output_dir=output) == []
+
+    # A model that became much slower moves visibly on the log axis.
+    forecast.assign(fit_seconds=forecast["fit_seconds"] * [1, 1, 1, 10]).to_csv(path, index=False)
+    assert generate_chart_pack(artifacts_dir=artifacts, output_dir=output) == ["04_forecast_efficiency.png"]
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from time_copilot_demo.dag import Stage, run_stages
+from time_copilot_demo.pipeline import run_incremental_benchmark, synthetic_pjm_like
+
+
+def _source(value: int) -> int:
+    return value
+
+
+def _add(*values: int, offset: int = 0) -> int:
+    return sum(values) + offset
+
+
+def _graph(value: int, offset: int, target: Path) -> list[Stage]:
+    return [
+        Stage("a", _source, params={"value": value}, source=True),
+        Stage("b", _add, params={"offset": 1}),
+        Stage("c", _add, inputs=("a",), params={"offset": offset}),
+        Stage("d", _add, inputs=("b", "c"), targets=(target,)),
+    ]
+
+
+def test_run_stages_reexecutes_only_changed_stages_and_their_dependents(tmp_path: Path):
+    target = tmp_path / "d.txt"
+    target.touch()
+
+    assert run_stages(_graph(1, 0, target), tmp_path / "state") == ["a", "b", "c", "d"]
+    assert run_stages(_graph(1, 0, target), tmp_path / "state") == ["a"]
+    assert run_stages(_graph(1, 5, target), tmp_path / "state") == ["a", "c", "d"]
+    assert run_stages(_graph(2, 5, target), tmp_path / "state") == ["a", "c", "d"]
+    target.unlink()
+    assert run_stages(_graph(2, 5, target), tmp_path / "state") == ["a", "d"]
+    assert run_stages(_graph(2, 5, target), tmp_path / "state", force=True) == ["a", "b", "c", "d"]
+
+
+def test_run_stages_requires_inputs_listed_first(tmp_path: Path):
+    with pytest.raises(ValueError, match="must be listed before it"):
+        run_stages([Stage("b", _add, inputs=("a",)), Stage("a", _source, params={"value": 1})], tmp_path)
+
+
+def test_adding_a_model_fits_only_that_model(tmp_path: Path):
+    options = dict(
+        artifacts_dir=tmp_path / "artifacts",
+        report_path=tmp_path / "report.md",
+        charts_dir=tmp_path / "charts",
+        markets=["PJM"],
+        market_frames={"PJM": synthetic_pjm_like(24 * 60)},
+        rally_models=["naive", "logreg"],
+        bootstrap_resamples=0,
+    )
+    run_incremental_benchmark(forecast_models=["naive"], **options)
+    assert run_incremental_benchmark(forecast_models=["naive"], **options) == ["load.PJM"]
+
+    executed = run_incremental_benchmark(forecast_models=["naive", "lear"], **options)
+
+    assert [name for name in executed if name.startswith("fit.")] == ["fit.PJM.forecast.lear"]
+    assert {"metrics.PJM", "champions.PJM", "summary", "report", "charts"} <= set(executed)
+    assert "lear" in (tmp_path / "artifacts" / "PJM" / "forecast_benchmark.csv").read_text()
+    assert (tmp_path / "report.md").exists()
@@ -1,6 +1,15 @@
+from pathlib import Path
+
 import pandas as pd
 
-from time_copilot_demo.data import normalize_epf_frame
+from time_copilot_demo.data import (
+    ingest_price_csv,
+    load_epf_market,
+    load_price_parquet,
+    market_frame_bytes,
+    normalize_epf_frame,
+    price_parquet_is_current,
+)
 
 
 def test_normalize_epf_frame_outputs_timestamp_price():
@@ -34,3 +43,107 @@ def test_normalize_epf_frame_handles_public_pjm_column_name():
 
     assert list(out.columns) == ["timestamp", "price"]
     assert out["price"].tolist() == [10.0, 11.0]
+
+
+def _write_legacy_csv(data_dir: Path) -> pd.DataFrame:
+    idx = pd.date_range("2020-01-01", periods=4, freq="h")
+    raw = pd.DataFrame(
+        {" Zonal COMED price": [10.0, 11.0, 12.5, 9.0], " System load forecast": [100.0, 120.0, 90.0, 95.0]},
+        index=idx,
+    )
+    raw.to_csv(data_dir / "PJM.csv")
+    return raw
+
+
+def test_load_epf_market_migrates_csv_cache_to_parquet(tmp_path: Path):
+    raw = _write_legacy_csv(tmp_path)
+
+    first = load_epf_market("PJM", data_dir=str(tmp_path))
+    (tmp_path / "PJM.csv").unlink()
+    second = load_epf_market("PJM", data_dir=str(tmp_path))
+
+    assert (tmp_path / "PJM.parquet").exists()
+    assert list(first.columns) == ["timestamp", "price"]
+    assert first["price"].tolist() == raw[" Zonal COMED price"].tolist()
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_load_epf_market_projects_requested_columns(tmp_path: Path):
+    _write_legacy_csv(tmp_path)
+
+    out = load_epf_market("PJM", data_dir=str(tmp_path), columns=("timestamp", "System load forecast"))
+
+    assert list(out.columns) == ["timestamp", "System load forecast"]
+    assert out["System load forecast"].iloc[1] == 120.0
+
+
+def test_load_epf_market_rebuilds_stale_schema(tmp_path: Path):
+    _write_legacy_csv(tmp_path)
+    pd.DataFrame({"timestamp": [pd.Timestamp("1999-01-01")], "price": [0.0]}).to_parquet(tmp_path / "PJM.parquet")
+
+    out = load_epf_market("PJM", data_dir=str(tmp_path))
+
+    assert len(out) == 4
+
+
+
+def test_market_frame_bytes_sizes_the_frame_before_loading(tmp_path: Path):
+    assert market_frame_bytes("PJM", data_dir=str(tmp_path)) is None
+    _write_legacy_csv(tmp_path)
+    assert market_frame_bytes("PJM", data_dir=str(tmp_path)) == (tmp_path / "PJM.csv").stat().st_size
+
+    frame = load_epf_market("PJM", data_dir=str(tmp_path))
+
+    assert market_frame_bytes("PJM", data_dir=str(tmp_path)) == frame.memory_usage(index=False).sum()
+
+def test_ingest_price_csv_streams_sorted_deduplicated_parquet(tmp_path: Path):
+    csv_path = tmp_path / "nodal.csv"
+    pd.DataFrame(
+        {
+            "timestamp": ["2024-01-01 00:05", "2024-01-01 00:00", "2024-01-01 00:05", "2024-01-01 00:10", "2024-01-01 00:15"],
+            "price": [2.0, 1.0, 9.0, 3.0, 4.0],
+            "node": ["a", "a", "a", "a", "a"],
+        }
+    ).to_csv(csv_path, index=False)
+
+    out = ingest_price_csv(
+        csv_path,
+        tmp_path / "nodal.parquet",
+        chunksize=3,
+        timestamp_format="%Y-%m-%d %H:%M",
+        price_dtype="float32",
+    )
+    frame = load_price_parquet(out)
+
+    assert frame["price"].dtype == "float32"
+    assert frame["price"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert frame["timestamp"].is_monotonic_increasing
+
+
+def test_load_price_parquet_sorts_overlapping_chunks(tmp_path: Path):
+    csv_path = tmp_path / "unordered.csv"
+    pd.DataFrame(
+        {
+            "timestamp": ["2024-01-01 03:00", "2024-01-01 04:00", "2024-01-01 01:00", "2024-01-01 03:00"],
+            "price": [3.0, 4.0, 1.0, 30.0],
+        }
+    ).to_csv(csv_path, index=False)
+
+    frame = load_price_parquet(ingest_price_csv(csv_path, tmp_path / "unordered.parquet", chunksize=2))
+
+    assert frame["price"].tolist() == [1.0, 3.0, 4.0]
+
+
+def test_ingested_parquet_is_stale_for_another_csv_or_other_options(tmp_path: Path):
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_text("timestamp,price\n2024-01-01 00:00:00,10.0\n2024-01-01 01:00:00,11.0\n", encoding="utf-8")
+    other = tmp_path / "other.csv"
+    other.write_text(csv_path.read_text(encoding="utf-8"), encoding="utf-8")
+    parquet_path = ingest_price_csv(csv_path, tmp_path / "prices.parquet", price_dtype="float32")
+
+    assert price_parquet_is_current(csv_path, parquet_path, price_dtype="float32")
+    assert not price_parquet_is_current(csv_path, parquet_path, price_dtype="float64")
+    assert not price_parquet_is_current(csv_path, parquet_path, price_dtype="float32", timestamp_format="%Y-%m-%d %H")
+    assert not price_parquet_is_current(other, parquet_path, price_dtype="float32")
+    csv_path.write_text("timestamp,price\n2024-01-01 00:00:00,12.5\n", encoding="utf-8")
+    assert not price_parquet_is_current(csv_path, parquet_path, price_dtype="float32")
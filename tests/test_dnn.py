@@ -0,0 +1,85 @@
+import pickle
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from time_copilot_demo import dnn
+from time_copilot_demo.dnn import DNNTrainConfig, TorchDNN, fit_dnn_classification, fit_dnn_regression
+from time_copilot_demo.parallel import native_thread_limit, threads_per_worker
+
+
+def _regression_data(n: int = 1500):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=["a", "b", "c", "d"])
+    y = pd.Series(X["a"] * 2.0 - X["b"] + rng.normal(0, 0.1, n))
+    return X, y
+
+
+def test_dnn_regression_reports_runtime_and_chosen_epoch():
+    X, y = _regression_data()
+
+    model = fit_dnn_regression(X, y, DNNTrainConfig(max_epochs=40, batch_size=128, patience=2))
+
+    report = model.training_
+    assert report["fit_seconds"] > 0
+    assert 1 <= report["best_epoch"] <= report["epochs_run"] <= 40
+    assert len(model.predict(X)) == len(X)
+
+
+def test_dnn_skips_early_stopping_on_tiny_training_sets():
+    X, y = _regression_data(40)
+
+    model = fit_dnn_classification(X, (y > 0).astype(int), DNNTrainConfig(max_epochs=5, num_threads=1))
+
+    assert model.training_["best_epoch"] == model.training_["epochs_run"]
+    prob = model.predict_proba(X)[:, 1]
+    assert ((prob >= 0) & (prob <= 1)).all()
+
+
+def test_trailing_rows_are_held_out_for_validation_only():
+    X, y = _regression_data()
+    config = DNNTrainConfig(max_epochs=1, batch_size=128, validation_fraction=0.2)
+    shifted = y.copy()
+    shifted.iloc[-300:] += 100.0
+
+    model = fit_dnn_regression(X, y, config)
+    other = fit_dnn_regression(X, shifted, config)
+
+    # Only the validation loss saw the last 20%; the fitted weights did not.
+    np.testing.assert_array_equal(model.predict(X), other.predict(X))
+
+
+def test_torch_dnn_round_trips_through_pickle():
+    pytest.importorskip("torch")
+    X, y = _regression_data()
+
+    model = fit_dnn_classification(X, (y > 0).astype(int), DNNTrainConfig(max_epochs=10, patience=2, num_threads=1))
+    restored = pickle.loads(pickle.dumps(model))
+
+    assert isinstance(model, TorchDNN)
+    assert 1 <= model.training_["best_epoch"] <= model.training_["epochs_run"] <= 10
+    np.testing.assert_allclose(restored.predict_proba(X), model.predict_proba(X))
+
+
+def test_dnn_thread_budget_defaults_to_the_process_cap(monkeypatch):
+    used = []
+
+    @contextmanager
+    def record(n_threads):
+        used.append(n_threads)
+        yield
+
+    monkeypatch.setattr(dnn, "_torch_available", lambda: False)
+    monkeypatch.setattr(dnn, "_blas_threads", record)
+    X, y = _regression_data(40)
+    config = DNNTrainConfig(max_epochs=1)
+
+    fit_dnn_regression(X, y, config)
+    with native_thread_limit(2):
+        fit_dnn_regression(X, y, config)
+    fit_dnn_regression(X, y, DNNTrainConfig(max_epochs=1, num_threads=3))
+
+    # Serial runs get every core, pool workers their share, and an explicit budget wins.
+    assert used == [threads_per_worker(1), 2, 3]
@@ -1,7 +1,10 @@
+import threading
+import time
 from pathlib import Path
 
 import pandas as pd
 
+from time_copilot_demo import pipeline
 from time_copilot_demo.pipeline import run_dual_market_benchmark, synthetic_pjm_like
 
 
@@ -21,3 +24,61 @@ def test_run_dual_market_benchmark_writes_market_artifacts(tmp_path: Path):
 
     summary = pd.read_csv(tmp_path / "champion_summary.csv")
     assert set(summary["market"]) == {"PJM", "NP"}
+    assert summary["win_prob"].between(0, 1).all()
+
+
+def test_concurrent_markets_keep_summary_order(tmp_path: Path):
+    markets = ["NP", "PJM", "BE"]
+    market_frames = {market: synthetic_pjm_like(24 * 60) for market in markets}
+
+    serial = run_dual_market_benchmark(
+        market_frames=market_frames, artifacts_dir=tmp_path / "serial", markets=markets
+    )
+    concurrent = run_dual_market_benchmark(
+        market_frames=market_frames,
+        artifacts_dir=tmp_path / "concurrent",
+        markets=markets,
+        market_workers=3,
+        memory_limit_mb=1,
+    )
+
+    assert concurrent["market"].tolist() == ["NP", "NP", "PJM", "PJM", "BE", "BE"]
+    # Only the run ids differ: each call is its own run.
+    pd.testing.assert_frame_equal(concurrent.drop(columns="run_id"), serial.drop(columns="run_id"))
+
+
+def test_market_loads_wait_for_the_memory_budget(tmp_path: Path, monkeypatch):
+    markets = ["NP", "PJM", "BE"]
+    for market in markets:
+        synthetic_pjm_like(24 * 60).set_index("timestamp").to_csv(tmp_path / f"{market}.csv")
+    real_load = pipeline.load_epf_market
+    lock = threading.Lock()
+    loading = [0]
+    overlap = []
+
+    def slow_load(market: str, data_dir: str) -> pd.DataFrame:
+        with lock:
+            loading[0] += 1
+            overlap.append(loading[0])
+        time.sleep(0.2)
+        try:
+            return real_load(market, data_dir=data_dir)
+        finally:
+            with lock:
+                loading[0] -= 1
+
+    monkeypatch.setattr(pipeline, "load_epf_market", slow_load)
+    summary = run_dual_market_benchmark(
+        market_frames=None,
+        artifacts_dir=tmp_path / "artifacts",
+        markets=markets,
+        data_dir=str(tmp_path),
+        market_workers=3,
+        memory_limit_mb=1,
+        bootstrap_resamples=0,
+        record_history=False,
+    )
+
+    # Each market's estimate exceeds the cap, so none is loaded while another holds it.
+    assert overlap == [1, 1, 1]
+    assert summary["market"].tolist() == ["NP", "NP", "PJM", "PJM", "BE", "BE"]
@@ -1,4 +1,8 @@
-from time_copilot_demo.evaluate import classification_metrics
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, brier_score_loss, f1_score, roc_auc_score
+
+from time_copilot_demo.evaluate import batch_classification_metrics, classification_metrics
 
 
 def test_classification_metrics_returns_key_fields():
@@ -11,3 +15,42 @@ def test_classification_metrics_returns_key_fields():
     assert "roc_auc" in metrics
     assert "f1" in metrics
     assert "brier" in metrics
+
+
+def test_batch_classification_metrics_match_sklearn_per_model():
+    rng = np.random.default_rng(3)
+    y_true = (rng.random(400) < 0.2).astype(int)
+    probs = np.vstack(
+        [
+            rng.random(400),
+            np.round(rng.random(400), 1),  # heavy ties
+            np.full(400, 0.2),  # constant model
+            np.clip(0.6 * y_true + rng.normal(0.2, 0.2, 400), 0, 1),
+        ]
+    )
+    thresholds = [0.5, 0.5, 0.2, 0.4]
+
+    metrics = batch_classification_metrics(y_true, probs, threshold=thresholds)
+
+    for i, (prob, threshold) in enumerate(zip(probs, thresholds)):
+        assert np.isclose(metrics["pr_auc"][i], average_precision_score(y_true, prob), rtol=0, atol=1e-12)
+        assert np.isclose(metrics["roc_auc"][i], roc_auc_score(y_true, prob), rtol=0, atol=1e-12)
+        assert np.isclose(metrics["f1"][i], f1_score(y_true, (prob >= threshold).astype(int)), rtol=0, atol=1e-12)
+        assert np.isclose(metrics["brier"][i], brier_score_loss(y_true, prob), rtol=0, atol=1e-12)
+
+
+def test_batch_classification_metrics_single_class_window_keeps_only_brier():
+    metrics = batch_classification_metrics(np.zeros(5), np.array([[0.1, 0.2, 0.3, 0.4, 0.5]]))
+
+    assert np.isnan(metrics["pr_auc"][0]) and np.isnan(metrics["roc_auc"][0]) and np.isnan(metrics["f1"][0])
+    assert np.isclose(metrics["brier"][0], 0.11)
+
+
+def test_batch_classification_metrics_rejects_non_finite_probabilities_and_bad_thresholds():
+    y_true = np.array([0, 1, 0, 1])
+    probs = np.array([[0.1, 0.8, 0.3, 0.6], [0.2, np.nan, 0.1, 0.9]])
+
+    with pytest.raises(ValueError, match=r"finite; model rows \[1\]"):
+        batch_classification_metrics(y_true, probs)
+    with pytest.raises(ValueError, match="one per model"):
+        batch_classification_metrics(y_true, probs[:1].repeat(3, axis=0), threshold=[0.5, 0.5])
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from time_copilot_demo.feature_cache import FeatureCache
+from time_copilot_demo.pipeline import _build_supervised_frame, synthetic_pjm_like
+
+
+def test_cached_supervised_frame_matches_fresh_build(tmp_path: Path):
+    cache = FeatureCache(tmp_path)
+    df = synthetic_pjm_like(24 * 40)
+
+    fresh, fresh_cols = _build_supervised_frame(df, horizon=24)
+    first, _ = _build_supervised_frame(df, horizon=24, cache=cache)
+    cached, cached_cols = _build_supervised_frame(df, horizon=24, cache=cache)
+
+    assert len(list(tmp_path.glob("*.parquet"))) == 1
+    assert cached_cols == fresh_cols
+    pd.testing.assert_frame_equal(first, fresh)
+    pd.testing.assert_frame_equal(cached, fresh)
+
+
+def test_cache_key_changes_with_data_and_parameters(tmp_path: Path):
+    cache = FeatureCache(tmp_path)
+    df = synthetic_pjm_like(24 * 10)
+    bumped = df.assign(price=df["price"] + 1.0)
+
+    base = cache.key(df, {"horizon": 24})
+    assert cache.key(df, {"horizon": 24}) == base
+    assert cache.key(df, {"horizon": 12}) != base
+    assert cache.key(bumped, {"horizon": 24}) != base
+
+
+def test_cache_evicts_oldest_entries_over_size_limit(tmp_path: Path):
+    frame = pd.DataFrame({"x": range(1000)})
+    cache = FeatureCache(tmp_path, max_bytes=1)
+
+    cache.put("old", frame)
+    cache.put("new", frame)
+
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_concurrent_puts_of_one_key_do_not_collide(tmp_path: Path):
+    # Markets with the same data (e.g. synthetic ones) write the same key from several threads.
+    cache = FeatureCache(tmp_path)
+    frame, _ = _build_supervised_frame(synthetic_pjm_like(24 * 20), horizon=24)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: cache.put("same", frame), range(64)))
+
+    pd.testing.assert_frame_equal(cache.get("same"), frame)
+    assert [path.name for path in tmp_path.iterdir()] == ["same.parquet"]
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
+import pytest
 
-from time_copilot_demo.features import build_features
+from time_copilot_demo.features import IncrementalFeatureState, build_features
 
 
 def test_build_features_uses_past_values_only():
@@ -17,3 +19,48 @@ def test_build_features_uses_past_values_only():
     assert row["lag_1"] == 30
     assert row["lag_2"] == 20
     assert row["roll_mean_3"] == (10 + 20 + 30) / 3
+
+
+def test_incremental_state_matches_build_features():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2020-01-01", periods=2000, freq="h"),
+            "price": 50 + rng.normal(0, 10, 2000),
+        }
+    )
+    lags, windows = (1, 2, 24), (3, 24)
+    expected = build_features(df, lags=lags, rolling_windows=windows)
+
+    state = IncrementalFeatureState(lags=lags, rolling_windows=windows)
+    streamed = state.update_batch(df["timestamp"], df["price"])
+
+    pd.testing.assert_frame_equal(streamed, expected[state.feature_names], check_dtype=False, rtol=1e-9)
+
+
+def test_incremental_state_from_history_continues_the_series():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2020-01-01", periods=60, freq="h"),
+            "price": np.arange(60, dtype=float) ** 1.5,
+        }
+    )
+    expected = build_features(df, lags=(1, 48), rolling_windows=(24,))
+
+    state = IncrementalFeatureState.from_history(df.iloc[:50], lags=(1, 48), rolling_windows=(24,))
+    row = state.feature_row(df["timestamp"].iloc[50])
+
+    for name in state.feature_names:
+        assert row[name] == pytest.approx(expected[name].iloc[50], rel=1e-9)
+
+
+def test_incremental_rolling_std_survives_a_tiny_spread_at_a_high_level():
+    rng = np.random.default_rng(5)
+    prices = 1e6 + rng.normal(0, 0.01, 500)
+    df = pd.DataFrame({"timestamp": pd.date_range("2020-01-01", periods=500, freq="h"), "price": prices})
+
+    state = IncrementalFeatureState(lags=(1,), rolling_windows=(24,))
+    streamed = state.update_batch(df["timestamp"], df["price"])
+
+    expected = [np.std(prices[i - 24 : i]) for i in range(24, 500)]
+    np.testing.assert_allclose(streamed["roll_std_24"].iloc[24:], expected, rtol=1e-6)
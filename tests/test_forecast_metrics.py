@@ -1,4 +1,7 @@
-from time_copilot_demo.evaluate import forecast_metrics
+import numpy as np
+import pandas as pd
+
+from time_copilot_demo.evaluate import batch_forecast_metrics, forecast_metrics
 
 
 def test_forecast_metrics_returns_mae_rmse_smape():
@@ -11,3 +14,19 @@ def test_forecast_metrics_returns_mae_rmse_smape():
     assert metrics["mae"] > 0
     assert metrics["rmse"] > 0
     assert metrics["smape"] > 0
+
+
+def test_batch_forecast_metrics_match_per_model_formulas():
+    rng = np.random.default_rng(0)
+    y_true = pd.Series(rng.normal(50, 10, 200))
+    preds = y_true.to_numpy() + rng.normal(0, [[1.0], [3.0], [5.0]], (3, 200))
+
+    batched = batch_forecast_metrics(y_true, preds)
+
+    y = y_true.to_numpy()
+    for i, pred in enumerate(preds):
+        assert np.isclose(batched["mae"][i], np.mean(np.abs(y - pred)), rtol=1e-12)
+        assert np.isclose(batched["rmse"][i], np.sqrt(np.mean((y - pred) ** 2)), rtol=1e-12)
+        smape = np.mean(2.0 * np.abs(y - pred) / (np.abs(y) + np.abs(pred))) * 100.0
+        assert np.isclose(batched["smape"][i], smape, rtol=1e-12)
+        assert forecast_metrics(y_true, pred)["smape"] == batched["smape"][i]
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from time_copilot_demo import history
+from time_copilot_demo.history import (
+    append_market_run,
+    champion_history,
+    compact_partition,
+    list_runs,
+    read_metrics,
+    read_predictions,
+    record_run,
+    run_tables,
+)
+from time_copilot_demo.pipeline import run_dual_market_benchmark, synthetic_pjm_like
+from time_copilot_demo.reporting import write_dual_market_report
+
+
+def _append(history_dir: Path, run_id: str, market: str, smape_a: float) -> None:
+    forecast_table = pd.DataFrame({"model": ["a", "b"], "smape": [smape_a, 9.0], "fit_seconds": [0.1, 0.2]})
+    rally_table = pd.DataFrame({"model": ["c"], "pr_auc": [0.4], "brier": [0.2]})
+    forecast_preds = pd.DataFrame(
+        {"timestamp": pd.date_range("2024-01-01", periods=3, freq="h"), "y_true": [1.0, 2.0, 3.0]}
+    ).assign(a_pred=[1.0, 2.0, 2.0], b_pred=[0.0, 0.0, 0.0])
+    rally_preds = forecast_preds[["timestamp"]].assign(y_true=[0, 1, 0], c_prob=[0.1, 0.9, 0.2])
+    append_market_run(
+        history_dir,
+        run_id=run_id,
+        market=market,
+        forecast_table=forecast_table,
+        rally_table=rally_table,
+        forecast_preds=forecast_preds,
+        rally_preds=rally_preds,
+        champions={"forecast": {"model": "a"}, "rally": {"model": "c"}},
+    )
+
+
+def test_history_filters_runs_and_round_trips_tables(tmp_path: Path):
+    for i, run_id in enumerate(["r1", "r2", "r3"]):
+        for market in ("PJM", "NP"):
+            _append(tmp_path, run_id, market, smape_a=float(i))
+        record_run(tmp_path, run_id, ["PJM", "NP"])
+
+    assert list_runs(tmp_path) == ["r1", "r2", "r3"]
+    assert list_runs(tmp_path, last=2) == ["r2", "r3"]
+
+    rows = read_metrics(tmp_path, runs=["r2"], markets=["PJM"], metrics=["smape"], columns=["model", "value"])
+    assert list(rows.columns) == ["model", "value"]
+    assert rows.set_index("model")["value"].to_dict() == {"a": 1.0, "b": 9.0}
+
+    tables = run_tables(tmp_path, "r3", markets=["NP"])
+    assert list(tables["forecast"].columns) == ["market", "model", "smape", "fit_seconds"]
+    assert tables["forecast"]["smape"].tolist() == [2.0, 9.0]
+    assert tables["rally"]["model"].tolist() == ["c"]
+
+    champions = champion_history(tmp_path, last=2)
+    assert set(champions["run_id"]) == {"r2", "r3"}
+    assert set(zip(champions["task"], champions["model"], champions["metric"])) == {
+        ("forecast", "a", "smape"),
+        ("rally", "c", "pr_auc"),
+    }
+
+    preds = read_predictions(tmp_path, run_id="r1", market="PJM", task="rally")
+    assert preds["model"].unique().tolist() == ["c"]
+    assert preds["value"].tolist() == [0.1, 0.9, 0.2]
+
+
+def test_history_compacts_metric_partitions(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(history, "COMPACT_AFTER_FILES", 3)
+    for i in range(5):
+        _append(tmp_path, f"r{i}", "PJM", smape_a=float(i))
+
+    files = list((tmp_path / "metrics" / "market=PJM" / "task=forecast").glob("*.parquet"))
+    assert len(files) < 3
+    rows = read_metrics(tmp_path, tasks=["forecast"], models=["a"], metrics=["smape"])
+    assert rows["run_id"].tolist() == [f"r{i}" for i in range(5)]
+    assert rows["value"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+
+def test_interrupted_compaction_neither_duplicates_rows_nor_breaks_tables(tmp_path: Path, monkeypatch):
+    for run_id in ["r1", "r2", "r3"]:
+        _append(tmp_path, run_id, "PJM", smape_a=1.0)
+    partition = tmp_path / "metrics" / "market=PJM" / "task=forecast"
+
+    def crash(path: Path) -> None:
+        raise OSError("killed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Path, "unlink", crash)
+        with pytest.raises(OSError):
+            compact_partition(partition)
+    assert len(list(partition.glob("*.parquet"))) == 4
+
+    rows = read_metrics(tmp_path, tasks=["forecast"], metrics=["smape"], columns=["run_id", "value"])
+    assert rows["run_id"].tolist() == ["r1", "r1", "r2", "r2", "r3", "r3"]
+    assert run_tables(tmp_path, "r2")["forecast"]["smape"].tolist() == [1.0, 9.0]
+
+    compact_partition(partition)
+    assert [path.name for path in partition.glob("*.parquet")] == ["r3.compact.parquet"]
+    assert len(read_metrics(tmp_path, tasks=["forecast"])) == 12
+
+
+def test_predictions_of_old_runs_are_pruned(tmp_path: Path):
+    for run_id in ["r1", "r2", "r3"]:
+        _append(tmp_path, run_id, "PJM", smape_a=1.0)
+        record_run(tmp_path, run_id, ["PJM"], keep_runs=2)
+    # Not in the index yet, so possibly still being written.
+    _append(tmp_path, "r4", "PJM", smape_a=1.0)
+
+    assert sorted(path.name for path in (tmp_path / "predictions").iterdir()) == [
+        "run_id=r2",
+        "run_id=r3",
+        "run_id=r4",
+    ]
+    assert read_metrics(tmp_path, runs=["r1"])["metric"].nunique() == 4
+
+
+def test_concurrent_runs_all_reach_the_run_index(tmp_path: Path):
+    run_ids = [f"r{i:02d}" for i in range(16)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda run_id: record_run(tmp_path, run_id, ["PJM"]), run_ids))
+
+    assert list_runs(tmp_path) == run_ids
+
+def test_dual_market_runs_accumulate_history_for_the_report(tmp_path: Path):
+    frames = {"PJM": synthetic_pjm_like(24 * 60), "NP": synthetic_pjm_like(24 * 60)}
+    for _ in range(2):
+        summary = run_dual_market_benchmark(
+            market_frames=frames, artifacts_dir=tmp_path, markets=["PJM", "NP"], bootstrap_resamples=0
+        )
+
+    history_dir = tmp_path / "history"
+    runs = list_runs(history_dir)
+    assert len(runs) == 2
+    assert summary["run_id"].unique().tolist() == [runs[-1]]
+
+    tables = run_tables(history_dir, runs[-1], markets=["PJM"])
+    csv = pd.read_csv(tmp_path / "PJM" / "forecast_benchmark.csv")
+    pd.testing.assert_frame_equal(tables["forecast"].drop(columns="market"), csv, check_dtype=False)
+
+    report = tmp_path / "report.md"
+    write_dual_market_report(tmp_path, report)
+    text = report.read_text(encoding="utf-8")
+    assert "## Run History" in text
+    assert all(run_id in text for run_id in runs)
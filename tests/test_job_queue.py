@@ -0,0 +1,168 @@
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from time_copilot_demo import parallel
+from time_copilot_demo.job_queue import JobQueue, QueueExecutor, start_local_workers, stop_workers, work
+from time_copilot_demo.parallel import thread_budget
+from time_copilot_demo.pipeline import COST_COLUMNS, run_dual_market_benchmark, synthetic_pjm_like
+
+
+def _add(a: int, b: int) -> int:
+    return a + b
+
+
+def _crash_once(marker: str) -> int:
+    if not os.path.exists(marker):
+        Path(marker).touch()
+        os._exit(1)
+    return 42
+
+
+def _refuse_to_load() -> None:
+    raise ImportError("job module missing on this worker")
+
+
+class _Unloadable:
+    def __reduce__(self):
+        return _refuse_to_load, ()
+
+
+def test_expired_lease_goes_to_another_worker(tmp_path: Path):
+    queue = JobQueue(tmp_path)
+    job_id = queue.enqueue(_add, 1, 2)
+
+    assert queue.claim("a", lease_seconds=0.05)[0] == job_id
+    assert queue.claim("b") is None
+    time.sleep(0.1)
+    claimed_id, fn, args = queue.claim("b")
+    assert claimed_id == job_id
+
+    assert not queue.complete(job_id, "a", 0)
+    assert queue.complete(job_id, "b", fn(*args))
+    assert queue.collect([job_id]) == {job_id: ("done", 3)}
+    assert queue.counts() == {}
+
+
+def test_job_whose_workers_keep_dying_is_failed(tmp_path: Path):
+    queue = JobQueue(tmp_path, max_attempts=2)
+    job_id = queue.enqueue(_add, 1, 2)
+    for worker in ["a", "b"]:
+        assert queue.claim(worker, lease_seconds=0.0) is not None
+        time.sleep(0.01)
+
+    assert queue.claim("c") is None
+    status, error = queue.collect([job_id])[job_id]
+    assert status == "failed" and "lease expired" in error
+
+
+def test_job_that_cannot_be_unpickled_is_failed_not_retried(tmp_path: Path):
+    queue = JobQueue(tmp_path)
+    broken = queue.enqueue(_add, _Unloadable(), 1)
+    fine = queue.enqueue(_add, 1, 2)
+
+    assert queue.claim("a")[0] == fine
+    status, error = queue.collect([broken])[broken]
+    assert status == "failed" and "job module missing" in error
+
+
+def test_shutdown_cancels_jobs_no_worker_claimed(tmp_path: Path):
+    queue = JobQueue(tmp_path)
+    executor = QueueExecutor(queue, poll_seconds=0.01)
+    running = executor.submit(_add, 1, 2)
+    waiting = executor.submit(_add, 3, 4)
+    job_id, fn, args = queue.claim("a")
+    queue.complete(job_id, "a", fn(*args))
+
+    executor.shutdown(cancel_futures=True)
+
+    assert running.result() == 3
+    assert waiting.cancelled()
+    assert queue.counts() == {}
+
+
+def test_workers_cap_threads_from_their_own_cores(tmp_path: Path, monkeypatch):
+    # The worker's host has 8 cores shared by 2 worker processes, whatever the coordinator has.
+    monkeypatch.setattr(parallel, "cpu_count", lambda: 8)
+    queue = JobQueue(tmp_path)
+    job_id = queue.enqueue(thread_budget)
+
+    assert work(tmp_path, max_jobs=1, host_workers=2) == 1
+    assert queue.collect([job_id]) == {job_id: ("done", 4)}
+
+
+def test_crashed_worker_job_is_rerun(tmp_path: Path):
+    executor = QueueExecutor(JobQueue(tmp_path / "queue"), poll_seconds=0.05)
+    future = executor.submit(_crash_once, str(tmp_path / "crashed"))
+    workers = start_local_workers(tmp_path / "queue", 2, lease_seconds=1.0, poll_seconds=0.1)
+    try:
+        assert future.result(timeout=60) == 42
+    finally:
+        stop_workers(workers)
+        executor.shutdown()
+    assert (tmp_path / "crashed").exists()
+
+
+def test_failed_job_raises_in_the_caller(tmp_path: Path):
+    executor = QueueExecutor(JobQueue(tmp_path / "queue"), poll_seconds=0.05)
+    future = executor.submit(_add, 1, "x")
+    workers = start_local_workers(tmp_path / "queue", 1, poll_seconds=0.1)
+    try:
+        with pytest.raises(RuntimeError, match="TypeError"):
+            future.result(timeout=60)
+    finally:
+        stop_workers(workers)
+        executor.shutdown()
+
+
+def test_queue_paths_are_absolute_and_journal_is_not_wal(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    executor = QueueExecutor(JobQueue(Path("queue")))
+
+    assert executor.queue.root == tmp_path / "queue"
+    assert executor.shared_dir.is_absolute()
+    assert not (tmp_path / "queue" / "jobs.sqlite-wal").exists()
+
+
+def test_poller_error_fails_pending_futures(tmp_path: Path, monkeypatch):
+    queue = JobQueue(tmp_path)
+    executor = QueueExecutor(queue, poll_seconds=0.01)
+
+    def broken_collect(job_ids: list[int]) -> dict:
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(queue, "collect", broken_collect)
+    future = executor.submit(_add, 1, 2)
+
+    with pytest.raises(RuntimeError, match="database is locked"):
+        future.result(timeout=10)
+    executor.shutdown()
+
+
+def test_queued_benchmark_matches_local_run(tmp_path: Path):
+    frames = {"PJM": synthetic_pjm_like(24 * 60), "NP": synthetic_pjm_like(24 * 50)}
+    options = dict(
+        market_frames=frames,
+        markets=["PJM", "NP"],
+        backtest_folds=2,
+        bootstrap_resamples=0,
+        record_history=False,
+    )
+    local = run_dual_market_benchmark(artifacts_dir=tmp_path / "local", **options)
+    workers = start_local_workers(tmp_path / "queue", 2, poll_seconds=0.1)
+    try:
+        queued = run_dual_market_benchmark(artifacts_dir=tmp_path / "queued", job_queue=tmp_path / "queue", **options)
+    finally:
+        stop_workers(workers)
+
+    pd.testing.assert_frame_equal(queued, local)
+    for market in ["PJM", "NP"]:
+        for name in ["forecast_benchmark.csv", "rally_benchmark.csv", "backtest_forecast.csv"]:
+            expected = pd.read_csv(tmp_path / "local" / market / name)
+            actual = pd.read_csv(tmp_path / "queued" / market / name)
+            cost = [c for c in COST_COLUMNS if c in expected]
+            pd.testing.assert_frame_equal(actual.drop(columns=cost), expected.drop(columns=cost))
+    assert not any((tmp_path / "queue" / "shared").iterdir())
@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 
-from time_copilot_demo.labels import build_rally_labels
+from time_copilot_demo.labels import build_rally_label_grid, build_rally_labels
 
 
 def test_build_rally_labels_uses_trailing_quantile():
@@ -10,3 +11,15 @@ def test_build_rally_labels_uses_trailing_quantile():
 
     # At index 4, trailing window is [10,12,15,20], q80 ~= 17 -> 45 is rally
     assert labels.iloc[4] == 1
+
+
+def test_rally_label_grid_matches_single_setting_labels():
+    price = pd.Series(np.random.default_rng(5).normal(40, 8, 300))
+
+    grid = build_rally_label_grid(price, quantiles=(0.8, 0.95), lookbacks=(12, 48))
+
+    assert grid.shape == (300, 4)
+    for lookback in (12, 48):
+        for q in (0.8, 0.95):
+            expected = build_rally_labels(price, quantile=q, lookback=lookback)
+            assert grid[f"rally_q{q:g}_lb{lookback}"].tolist() == expected.tolist()
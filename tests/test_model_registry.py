@@ -1,9 +1,13 @@
+import numpy as np
 import pandas as pd
+import pytest
 
 from time_copilot_demo.model_registry import (
     available_forecast_models,
     available_rally_models,
+    fit_model,
     predict_forecast,
+    predict_model,
     predict_rally_probability,
 )
 
@@ -39,3 +43,27 @@ def test_predict_forecast_and_rally_probability_shapes():
         pred = predict_rally_probability(model, X, y_cls, X)
         assert len(pred) == len(X)
         assert ((pred >= 0) & (pred <= 1)).all()
+
+
+def test_fit_then_predict_matches_one_shot_prediction():
+    X, y_reg, _ = _toy_data()
+
+    model = fit_model("forecast", "gbdt_reg", X, y_reg)
+
+    np.testing.assert_array_equal(predict_model("forecast", model, X), predict_forecast("gbdt_reg", X, y_reg, X))
+
+
+def test_unknown_model_is_rejected():
+    X, y_reg, _ = _toy_data()
+
+    with pytest.raises(ValueError, match="Unknown forecast model"):
+        fit_model("forecast", "prophet", X, y_reg)
+
+
+def test_fit_model_applies_param_overrides():
+    X, y_reg, _ = _toy_data()
+
+    model = fit_model("forecast", "lear", X, y_reg, {"alpha": 0.5})
+
+    assert model.named_steps["reg"].alpha == 0.5
+    assert model.named_steps["reg"].l1_ratio == 0.9
@@ -0,0 +1,94 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from time_copilot_demo.model_registry import predict_model
+from time_copilot_demo.model_store import ModelStore, load_champion_model
+from time_copilot_demo.pipeline import run_market_benchmark, synthetic_pjm_like
+
+
+def _toy_data():
+    X = pd.DataFrame({"lag_1": np.arange(40, dtype=float), "hour": np.arange(40) % 24})
+    y = pd.Series(np.arange(40, dtype=float) + 1.0)
+    return X, y
+
+
+def test_get_or_fit_reuses_stored_model(tmp_path: Path):
+    X, y = _toy_data()
+    store = ModelStore(tmp_path)
+
+    model, path = store.get_or_fit("forecast", "gbdt_reg", X, y)
+    assert path.exists()
+
+    def _refit(*args, **kwargs):
+        raise AssertionError("stored model should have been loaded")
+
+    loaded, loaded_path = store.get_or_fit("forecast", "gbdt_reg", X, y, fit=_refit)
+
+    assert loaded_path == path
+    np.testing.assert_array_equal(predict_model("forecast", loaded, X), predict_model("forecast", model, X))
+
+
+def test_store_key_tracks_training_data(tmp_path: Path):
+    X, y = _toy_data()
+    store = ModelStore(tmp_path)
+
+    _, path = store.get_or_fit("forecast", "naive", X, y)
+    _, other = store.get_or_fit("forecast", "naive", X, y + 1.0)
+
+    assert path != other
+
+
+def test_store_key_tracks_param_overrides(tmp_path: Path):
+    X, y = _toy_data()
+    store = ModelStore(tmp_path)
+
+    _, default = store.get_or_fit("forecast", "lear", X, y)
+    _, same = store.get_or_fit("forecast", "lear", X, y, params={"alpha": 0.001})
+    _, tuned = store.get_or_fit("forecast", "lear", X, y, params={"alpha": 0.01})
+
+    assert same == default
+    assert tuned != default
+
+
+def test_champions_reference_persisted_models(tmp_path: Path):
+    champions = run_market_benchmark(
+        market="PJM",
+        df=synthetic_pjm_like(24 * 45),
+        artifacts_dir=tmp_path,
+        forecast_models=["naive", "lear"],
+        rally_models=["naive", "logreg"],
+        persist_models=True,
+    )
+
+    market_dir = tmp_path / "PJM"
+    saved = json.loads((market_dir / "champions.json").read_text(encoding="utf-8"))
+    assert saved["artifacts"] == champions["artifacts"]
+    assert (market_dir / saved["artifacts"]["rally"]).exists()
+    assert hasattr(load_champion_model(market_dir, "rally"), "predict_proba")
+
+
+def test_load_champion_model_requires_persisted_artifacts(tmp_path: Path):
+    (tmp_path / "champions.json").write_text(json.dumps({"market": "PJM"}), encoding="utf-8")
+
+    with pytest.raises(FileNotFoundError):
+        load_champion_model(tmp_path, "forecast")
+
+
+def test_store_evicts_least_recently_used_models_beyond_its_cap(tmp_path: Path):
+    X, y = _toy_data()
+    store = ModelStore(tmp_path)
+    _, first = store.get_or_fit("forecast", "lear", X, y)
+    _, second = store.get_or_fit("forecast", "lear", X, y + 1.0)
+    store.max_bytes = int(2.5 * first.stat().st_size)
+
+    # Reusing the first model makes the second the least recently used.
+    os.utime(second, (1, 1))
+    store.get_or_fit("forecast", "lear", X, y)
+    _, third = store.get_or_fit("forecast", "lear", X, y + 2.0)
+
+    assert sorted(tmp_path.glob("*.joblib")) == sorted([first, third])
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from time_copilot_demo.parallel import MemoryBudget, run_jobs, thread_budget, threads_per_worker
+from time_copilot_demo.pipeline import COST_COLUMNS, run_market_benchmark, synthetic_pjm_like
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def test_run_jobs_preserves_submission_order():
+    jobs = [(i,) for i in range(6)]
+
+    assert run_jobs(_square, jobs) == [0, 1, 4, 9, 16, 25]
+    assert run_jobs(_square, jobs, max_workers=2) == [0, 1, 4, 9, 16, 25]
+
+
+def test_threads_per_worker_is_at_least_one():
+    assert threads_per_worker(10_000) == 1
+
+
+def test_pool_workers_report_their_share_of_the_cores():
+    assert thread_budget() == threads_per_worker(1)
+    assert run_jobs(thread_budget, [(), ()], max_workers=2) == [threads_per_worker(2)] * 2
+
+
+def test_parallel_market_benchmark_matches_serial(tmp_path: Path):
+    df = synthetic_pjm_like(24 * 60)
+    serial = run_market_benchmark(market="PJM", df=df, artifacts_dir=tmp_path / "serial")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = run_market_benchmark(market="PJM", df=df, artifacts_dir=tmp_path / "threaded", executor=pool)
+    pooled = run_market_benchmark(market="PJM", df=df, artifacts_dir=tmp_path / "pooled", max_workers=2)
+
+    for other in [threaded, pooled]:
+        assert other["forecast"]["model"] == serial["forecast"]["model"]
+        assert other["rally"]["model"] == serial["rally"]["model"]
+
+    # Accuracy must match exactly; the timing and memory columns legitimately differ.
+    for name in ["forecast_benchmark.csv", "rally_benchmark.csv"]:
+        expected = pd.read_csv(tmp_path / "serial" / "PJM" / name).drop(columns=list(COST_COLUMNS))
+        for run in ["threaded", "pooled"]:
+            actual = pd.read_csv(tmp_path / run / "PJM" / name).drop(columns=list(COST_COLUMNS))
+            pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_memory_budget_admits_oversized_item_when_idle():
+    budget = MemoryBudget(limit_bytes=10)
+
+    with budget.reserve(50):
+        assert budget.in_use == 50
+    assert budget.in_use == 0
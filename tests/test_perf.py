@@ -0,0 +1,69 @@
+from time_copilot_demo.perf import compare_to_baseline, measure_stage, run_perf_suite, track_resources
+
+
+def _doc(seconds: float, growth: float) -> dict:
+    stage = {"rows": 10, "seconds": seconds, "peak_rss_mb": 300.0, "rss_growth_mb": growth}
+    return {"results": {"2y": {"build_features": stage}}}
+
+
+def test_measure_stage_records_time_and_memory():
+    results = []
+    with measure_stage("tiny", "alloc", 5, results):
+        block = bytearray(64 * 2**20)
+        block[::4096] = b"x" * len(block[::4096])
+
+    (result,) = results
+    assert result.stage == "alloc" and result.rows == 5
+    assert result.seconds > 0
+    assert result.rss_growth_mb >= 32
+    assert result.peak_rss_mb >= result.rss_growth_mb
+
+
+def test_overlapping_blocks_do_not_reset_each_others_peak():
+    # measure_stage first returns freed heap to the OS, so the allocation below shows as growth.
+    results = []
+    with measure_stage("tiny", "outer", 5, results):
+        block = bytearray(64 * 2**20)
+        block[::4096] = b"x" * len(block[::4096])
+        del block
+        # A second block starting mid-way (e.g. a fit on another thread) must not clear the mark.
+        with track_resources() as inner:
+            pass
+
+    (outer,) = results
+    assert outer.rss_growth_mb >= 32
+    assert inner.peak_rss_mb >= outer.peak_rss_mb - 1
+
+
+def test_compare_to_baseline_flags_only_regressions_beyond_tolerance():
+    baseline = _doc(seconds=1.0, growth=100.0)
+
+    assert compare_to_baseline(_doc(1.2, 110.0), baseline, tolerance=0.25) == []
+    slower = compare_to_baseline(_doc(1.5, 100.0), baseline, tolerance=0.25)
+    hungrier = compare_to_baseline(_doc(1.0, 200.0), baseline, tolerance=0.25)
+    assert len(slower) == 1 and "seconds" in slower[0]
+    assert len(hungrier) == 1 and "rss_growth_mb" in hungrier[0]
+
+
+def test_compare_to_baseline_ignores_noise_on_fast_stages():
+    assert compare_to_baseline(_doc(0.004, 0.0), _doc(0.001, 0.0), tolerance=0.25) == []
+
+
+def test_run_perf_suite_times_every_stage():
+    document = run_perf_suite({"tiny": 24 * 60}, forecast_models=["naive"], rally_models=["naive"])
+
+    stages = document["results"]["tiny"]
+    assert {
+        "build_features",
+        "build_rally_labels",
+        "label_future_rally",
+        "rally_label_grid",
+        "rally_label_grid.pandas",
+        "fit.forecast.naive",
+        "predict.rally.naive",
+        "forecast_metrics",
+        "classification_metrics",
+        "write_dual_market_report",
+        "generate_chart_pack",
+    } <= set(stages)
+    assert compare_to_baseline(document, document) == []
@@ -1,6 +1,12 @@
+import json
 from pathlib import Path
 
-from time_copilot_demo.pipeline import run_benchmark_pipeline
+import pandas as pd
+import pytest
+
+from time_copilot_demo import pipeline
+from time_copilot_demo.pipeline import COST_COLUMNS, run_benchmark_pipeline, run_market_benchmark, synthetic_pjm_like
+from time_copilot_demo.summaries import CALIBRATION_FILE, CURVES_FILE, RESIDUALS_FILE
 
 
 def test_run_benchmark_pipeline_writes_artifacts(tmp_path: Path):
@@ -9,3 +15,110 @@ def test_run_benchmark_pipeline_writes_artifacts(tmp_path: Path):
     assert (tmp_path / "metrics.json").exists()
     assert (tmp_path / "predictions.parquet").exists()
     assert (tmp_path / "benchmark_table.csv").exists()
+
+
+def test_market_champions_report_dnn_training(tmp_path: Path):
+    champions = run_market_benchmark(
+        market="PJM",
+        df=synthetic_pjm_like(24 * 45),
+        artifacts_dir=tmp_path,
+        forecast_models=["naive", "dnn_reg"],
+        rally_models=["naive", "dnn_cls"],
+    )
+
+    assert set(champions["training"]["forecast"]) == {"dnn_reg"}
+    assert champions["training"]["rally"]["dnn_cls"]["best_epoch"] >= 1
+
+
+def test_benchmark_tables_and_champions_carry_cost_columns(tmp_path: Path):
+    champions = run_market_benchmark(
+        market="PJM",
+        df=synthetic_pjm_like(24 * 45),
+        artifacts_dir=tmp_path,
+        forecast_models=["naive", "lear"],
+        rally_models=["naive", "logreg"],
+    )
+
+    for name in ["forecast_benchmark.csv", "rally_benchmark.csv"]:
+        table = pd.read_csv(tmp_path / "PJM" / name)
+        assert set(COST_COLUMNS) <= set(table.columns)
+        assert (table[list(COST_COLUMNS)] > 0).all().all()
+    saved = json.loads((tmp_path / "PJM" / "champions.json").read_text(encoding="utf-8"))
+    for task in ["forecast", "rally"]:
+        assert set(COST_COLUMNS) <= set(saved[task])
+        assert champions[task]["predict_rows_per_sec"] > 0
+
+
+def test_champions_report_bootstrap_intervals_for_every_model(tmp_path: Path):
+    champions = run_market_benchmark(
+        market="PJM",
+        df=synthetic_pjm_like(24 * 45),
+        artifacts_dir=tmp_path,
+        forecast_models=["naive", "lear"],
+        rally_models=["naive", "logreg"],
+        bootstrap_resamples=200,
+    )
+
+    spread = json.loads((tmp_path / "PJM" / "champions.json").read_text(encoding="utf-8"))["bootstrap"]
+    assert spread == champions["bootstrap"]
+    assert spread["n_resamples"] == 200
+    assert set(spread["forecast"]) == {"naive", "lear"}
+    low, high = spread["forecast"][champions["forecast"]["model"]]["smape_ci"]
+    assert low <= champions["forecast"]["smape"] <= high
+    assert abs(sum(entry["win_prob"] for entry in spread["forecast"].values()) - 1.0) < 1e-9
+
+
+def test_market_benchmark_writes_prediction_summaries(tmp_path: Path):
+    run_market_benchmark(
+        market="PJM",
+        df=synthetic_pjm_like(24 * 45),
+        artifacts_dir=tmp_path,
+        forecast_models=["naive", "lear"],
+        rally_models=["naive", "logreg"],
+        bootstrap_resamples=0,
+    )
+
+    market_dir = tmp_path / "PJM"
+    calibration = pd.read_csv(market_dir / CALIBRATION_FILE)
+    assert set(calibration["model"]) == {"naive", "logreg"}
+    assert set(pd.read_csv(market_dir / CURVES_FILE)["curve"]) == {"pr", "roc"}
+    residuals = pd.read_csv(market_dir / RESIDUALS_FILE)
+    n_test = len(pd.read_parquet(market_dir / "forecast_predictions.parquet"))
+    assert residuals.groupby("model")["count"].sum().tolist() == [n_test, n_test]
+
+
+def test_resumed_run_reuses_checkpoints_and_matches_uninterrupted_run(tmp_path: Path, monkeypatch):
+    options = dict(
+        market="PJM",
+        df=synthetic_pjm_like(24 * 45),
+        forecast_models=["naive", "lear"],
+        rally_models=["naive", "logreg"],
+        bootstrap_resamples=100,
+    )
+    expected = run_market_benchmark(artifacts_dir=tmp_path / "clean", **options)
+
+    fit_model = pipeline.fit_model
+    fitted: list[str] = []
+
+    def crash_on_logreg(task, model_name, *args, **kwargs):
+        if model_name == "logreg":
+            raise MemoryError("simulated OOM")
+        return fit_model(task, model_name, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "fit_model", crash_on_logreg)
+    with pytest.raises(MemoryError):
+        run_market_benchmark(artifacts_dir=tmp_path / "crashed", **options)
+    assert len(list((tmp_path / "crashed" / "PJM" / "checkpoints").glob("*.joblib"))) == 3
+
+    def record_fit(task, model_name, *args, **kwargs):
+        fitted.append(f"{task}.{model_name}")
+        return fit_model(task, model_name, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "fit_model", record_fit)
+    resumed = run_market_benchmark(artifacts_dir=tmp_path / "crashed", resume=True, **options)
+
+    assert fitted == ["rally.logreg"]
+    for task, metric in [("forecast", "smape"), ("rally", "pr_auc")]:
+        assert resumed[task]["model"] == expected[task]["model"]
+        assert resumed[task][metric] == expected[task][metric]
+    assert resumed["bootstrap"]["rally"] == expected["bootstrap"]["rally"]
@@ -0,0 +1,61 @@
+import pstats
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from time_copilot_demo.profiling import (
+    COLLAPSED_STACKS_FILE,
+    SUMMARY_FILE,
+    profile_session,
+    profile_span,
+)
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def test_profile_span_is_noop_without_session(tmp_path: Path):
+    with profile_span("fit.forecast.naive"):
+        _busy(0.01)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profile_session_writes_stage_profiles_and_collapsed_stacks(tmp_path: Path):
+    out = tmp_path / "profile"
+
+    with profile_session(out, sample_interval=0.001):
+        with profile_span("supervised_frame.PJM"):
+            _busy(0.05)
+            with profile_span("fit.forecast.lear"):
+                _busy(0.05)
+
+    (fit_prof,) = out.glob("*_fit.forecast.lear_*.prof")
+    (frame_prof,) = out.glob("*_supervised_frame.PJM_*.prof")
+    assert pstats.Stats(str(fit_prof)).total_tt > 0
+    # The parent's profile excludes time spent in the nested span.
+    assert pstats.Stats(str(frame_prof)).total_tt < 0.09
+
+    summary = pd.read_csv(out / SUMMARY_FILE).set_index("span")
+    assert {"session", "supervised_frame.PJM", "fit.forecast.lear"} <= set(summary.index)
+    assert summary.loc["supervised_frame.PJM", "total_seconds"] >= summary.loc["fit.forecast.lear", "total_seconds"]
+
+    stacks = (out / COLLAPSED_STACKS_FILE).read_text(encoding="utf-8").splitlines()
+    assert any(line.startswith("session;supervised_frame.PJM;fit.forecast.lear;") for line in stacks)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+
+
+def test_profile_session_clears_previous_capture(tmp_path: Path):
+    out = tmp_path / "profile"
+    out.mkdir()
+    (out / "0001_stale_1.prof").write_text("old", encoding="utf-8")
+
+    with profile_session(out):
+        pass
+
+    assert not (out / "0001_stale_1.prof").exists()
+    assert (out / SUMMARY_FILE).exists()
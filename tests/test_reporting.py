@@ -18,6 +18,10 @@ def test_write_dual_market_report_contains_both_markets(tmp_path: Path):
             {"model": "naive", "pr_auc": 0.4, "roc_auc": 0.5, "f1": 0.5, "brier": 0.2},
             {"model": "gbdt_cls", "pr_auc": 0.8, "roc_auc": 0.9, "f1": 0.7, "brier": 0.12},
         ]).to_csv(d / "rally_benchmark.csv", index=False)
+        pd.DataFrame([
+            {"model": "gbdt_cls", "bin": 0, "mean_pred": 0.1, "frac_pos": 0.15, "count": 50},
+            {"model": "gbdt_cls", "bin": 1, "mean_pred": 0.7, "frac_pos": 0.65, "count": 50},
+        ]).to_csv(d / "rally_calibration.csv", index=False)
 
     pd.DataFrame([
         {"market": "PJM", "task": "forecast", "model": "gbdt_reg", "primary_metric": "smape", "primary_value": 8.0},
@@ -34,3 +38,4 @@ def test_write_dual_market_report_contains_both_markets(tmp_path: Path):
     assert "NP" in text
     assert "Champion" in text
     assert "freight" in text.lower()
+    assert "| gbdt_cls | 0.05 |" in text
@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+from time_copilot_demo.rolling import trailing_quantile_grid
+
+
+def test_trailing_quantile_grid_matches_pandas_exactly():
+    rng = np.random.default_rng(11)
+    values = np.round(rng.normal(50, 10, 600), 1)  # rounding forces ties
+    values[[100, 101, 350]] = np.nan
+    series = pd.Series(values)
+
+    grid = trailing_quantile_grid(values, quantiles=(0.0, 0.5, 0.95, 1.0), lookbacks=(7, 48))
+
+    for (lookback, q), out in grid.items():
+        expected = series.shift(1).rolling(lookback, min_periods=lookback).quantile(q).to_numpy()
+        np.testing.assert_array_equal(out, expected)
@@ -0,0 +1,111 @@
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from time_copilot_demo.pipeline import run_market_benchmark, synthetic_pjm_like
+from time_copilot_demo.serving import ForecastService, ServiceClient
+
+
+def _benchmark(tmp_path: Path) -> tuple[pd.DataFrame, dict]:
+    df = synthetic_pjm_like(24 * 60)
+    champions = run_market_benchmark(
+        market="PJM",
+        df=df,
+        artifacts_dir=tmp_path,
+        forecast_models=["naive", "lear"],
+        rally_models=["naive", "logreg"],
+        bootstrap_resamples=0,
+        persist_models=True,
+    )
+    return df, champions
+
+
+def test_service_matches_benchmark_predictions_and_follows_new_prints(tmp_path: Path):
+    df, champions = _benchmark(tmp_path)
+    forecasts = pd.read_parquet(tmp_path / "PJM" / "forecast_predictions.parquet")
+    rallies = pd.read_parquet(tmp_path / "PJM" / "rally_predictions.parquet")
+    k = int(np.flatnonzero(df["timestamp"] == forecasts["timestamp"].iloc[10])[0])
+    service = ForecastService(tmp_path, {"PJM": df.iloc[:k]})
+
+    async def scenario() -> list[dict]:
+        first = await service.predict("PJM")
+        service.observe("PJM", df["timestamp"].iloc[k], df["price"].iloc[k])
+        second = await service.predict("PJM")
+        await service.close()
+        return [first, second]
+
+    for offset, result in zip([10, 11], asyncio.run(scenario())):
+        assert pd.Timestamp(result["timestamp"]) == forecasts["timestamp"].iloc[offset]
+        assert result["forecast"] == pytest.approx(forecasts[f"{champions['forecast']['model']}_pred"].iloc[offset])
+        assert result["rally_prob"] == pytest.approx(rallies[f"{champions['rally']['model']}_prob"].iloc[offset])
+    with pytest.raises(ValueError, match="not the next step"):
+        service.observe("PJM", df["timestamp"].iloc[0], 1.0)
+    with pytest.raises(ValueError, match="not the next step"):
+        service.observe("PJM", df["timestamp"].iloc[k + 2], 1.0)
+
+
+def test_rows_other_than_the_next_one_are_rejected(tmp_path: Path):
+    df, _ = _benchmark(tmp_path)
+    service = ForecastService(tmp_path, {"PJM": df.iloc[:-30]})
+    socket_path = str(tmp_path / "service.sock")
+    later = df["timestamp"].iloc[-10].isoformat()
+
+    async def scenario() -> list[int]:
+        await service.start(unix_socket=socket_path)
+        client = await ServiceClient.connect(unix_socket=socket_path)
+        statuses = [
+            (await client.request("GET", f"/forecast?market=PJM&timestamp={later}"))[0],
+            (await client.request("POST", "/observe", {"market": "PJM", "timestamp": later, "price": 50.0}))[0],
+        ]
+        service.markets["PJM"].models["forecast"] = None
+        statuses.append((await client.request("GET", "/forecast?market=PJM"))[0])
+        await client.close()
+        await service.close()
+        return statuses
+
+    assert asyncio.run(scenario()) == [400, 400, 500]
+
+
+def test_concurrent_http_requests_are_micro_batched(tmp_path: Path):
+    df, _ = _benchmark(tmp_path)
+    service = ForecastService(tmp_path, {"PJM": df}, max_wait_ms=20)
+    socket_path = str(tmp_path / "service.sock")
+
+    async def scenario() -> tuple[list[int], int, dict]:
+        await service.start(unix_socket=socket_path)
+        clients = [await ServiceClient.connect(unix_socket=socket_path) for _ in range(32)]
+        responses = await asyncio.gather(*(client.request("GET", "/forecast?market=PJM") for client in clients))
+        missing, _ = await clients[0].request("GET", "/forecast?market=XX")
+        _, stats = await clients[0].request("GET", "/stats")
+        for client in clients:
+            await client.close()
+        await service.close()
+        return [status for status, _ in responses], missing, stats
+
+    statuses, missing, stats = asyncio.run(scenario())
+
+    assert statuses == [200] * 32
+    assert missing == 404
+    assert stats["requests"] == 32
+    assert stats["batches"] < 32
+    assert stats["p50_ms"] <= stats["p99_ms"]
+    assert stats["throughput_rps"] > 0
+
+
+def test_full_queue_rejects_requests(tmp_path: Path):
+    df, _ = _benchmark(tmp_path)
+    service = ForecastService(tmp_path, {"PJM": df}, queue_size=2, max_wait_ms=50)
+
+    async def scenario() -> list:
+        results = await asyncio.gather(*(service.predict("PJM") for _ in range(10)), return_exceptions=True)
+        await service.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    rejected = [r for r in results if isinstance(r, asyncio.QueueFull)]
+    assert rejected and len(rejected) < len(results)
+    assert service.stats()["rejected"] == len(rejected)
@@ -0,0 +1,113 @@
+import mmap
+import os
+import pickle
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.utils import check_array
+
+from time_copilot_demo.model_registry import predict_task
+from time_copilot_demo.parallel import run_jobs
+from time_copilot_demo.pipeline import _build_supervised_frame, synthetic_pjm_like
+from time_copilot_demo.shared_frame import FrameView, SharedFrame, materialize, shared_inputs
+
+
+def _frame(n: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "lag_1": rng.normal(size=n),
+            "hour": (np.arange(n) % 24).astype("int32"),
+            "lag_24": rng.normal(size=n),
+            "target_price": rng.normal(size=n),
+            "target_rally": rng.integers(0, 2, size=n),
+        }
+    )
+
+
+def _is_mapped(values: np.ndarray) -> bool:
+    base = values
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return isinstance(base, mmap.mmap)
+
+
+def test_views_load_zero_copy_with_original_dtypes(tmp_path):
+    frame = _frame()
+    columns = ["lag_1", "hour", "lag_24"]
+    with SharedFrame(frame, root=tmp_path) as shared:
+        view = shared.view(columns).iloc[100:300]
+        loaded = view.load()
+
+        pd.testing.assert_frame_equal(loaded, frame[columns].iloc[100:300])
+        assert all(_is_mapped(loaded[column].to_numpy()) for column in columns)
+        pd.testing.assert_series_equal(materialize(shared.view("target_rally", 0, 50)), frame["target_rally"].iloc[:50])
+        # Jobs carry the view, not the rows.
+        assert len(pickle.dumps(view)) < 1000
+    assert not shared.root.exists()
+
+
+def test_view_rows_must_be_a_contiguous_slice(tmp_path):
+    with SharedFrame(_frame(), root=tmp_path) as shared:
+        with pytest.raises(ValueError, match="contiguous"):
+            shared.view("lag_1").iloc[::2]
+
+
+def test_registry_models_give_identical_predictions_on_views(tmp_path):
+    frame = _frame()
+    features = ["lag_1", "hour", "lag_24"]
+    columns = {"X": features, "forecast": "target_price", "rally": "target_rally"}
+    with shared_inputs(frame, columns, max_workers=2) as views:
+        for task, model in [("forecast", "lear"), ("rally", "logreg")]:
+            expected = predict_task(
+                task, model, frame[features].iloc[:400], frame[columns[task]].iloc[:400], frame[features].iloc[400:]
+            )
+            actual = predict_task(task, model, views["X"].iloc[:400], views[task].iloc[:400], views["X"].iloc[400:])
+            np.testing.assert_array_equal(actual, expected)
+
+
+def _rss_anon_bytes() -> int:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("RssAnon:"):
+            return int(line.split()[1]) * 1024
+    raise RuntimeError("no RssAnon in /proc/self/status")
+
+
+def _private_bytes_to_use(view: FrameView) -> tuple[int, bool]:
+    before = _rss_anon_bytes()
+    X = check_array(view.load())
+    X.sum()
+    return _rss_anon_bytes() - before, _is_mapped(X)
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="needs /proc RssAnon")
+def test_workers_use_the_shared_feature_matrix_without_private_copies():
+    frame, features = _build_supervised_frame(synthetic_pjm_like(24 * 2000), horizon=24)
+    feature_bytes = frame[features].memory_usage(index=False).sum()
+    with shared_inputs(frame, {"X": features}, max_workers=4) as views:
+        results = run_jobs(_private_bytes_to_use, [(views["X"],)] * 8, max_workers=4)
+
+    assert all(mapped for _, mapped in results)
+    # Each worker's private memory grows by far less than the matrix, so 4 workers hold one copy, not 4.
+    assert max(growth for growth, _ in results) < 0.1 * feature_bytes
+
+
+def test_directories_of_dead_processes_are_removed(tmp_path: Path):
+    host = socket.gethostname()
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    stale = tmp_path / f"shared_frame_{host}_{int(dead.stdout)}_abc"
+    live = tmp_path / f"shared_frame_{host}_{os.getppid()}_abc"
+    other_host = tmp_path / f"shared_frame_{host}x_{int(dead.stdout)}_abc"
+    for path in [stale, live, other_host]:
+        path.mkdir()
+
+    with SharedFrame(_frame(), root=tmp_path) as shared:
+        assert shared.root.name.startswith(f"shared_frame_{host}_{os.getpid()}_")
+
+    assert not stale.exists()
+    assert live.exists() and other_host.exists()
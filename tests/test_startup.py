@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+# Generous wall-clock budget for a cold interpreter; pandas alone takes a few hundred ms.
+STARTUP_LIMIT_SECONDS = 3.0
+HEAVY_MODULES = ("matplotlib", "seaborn", "sklearn", "torch")
+
+
+def _run(args: list[str]) -> tuple[float, str]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, out.stdout
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["-c", "import time_copilot_demo"],
+        ["scripts/generate_report.py", "--help"],
+    ],
+)
+def test_cli_startup_stays_under_limit(args):
+    elapsed, _ = _run(args)
+
+    assert elapsed < STARTUP_LIMIT_SECONDS
+
+
+def test_pipeline_and_report_imports_defer_heavy_libraries():
+    code = (
+        "import json, sys\n"
+        "import time_copilot_demo.pipeline, time_copilot_demo.reporting, time_copilot_demo.charts\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    _, stdout = _run(["-c", code])
+
+    assert json.loads(stdout) == []
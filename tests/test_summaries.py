@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from sklearn.calibration import calibration_curve
+from sklearn.metrics import precision_recall_curve, roc_curve
+
+from time_copilot_demo.summaries import (
+    calibration_bins,
+    curve_points,
+    expected_calibration_error,
+    residual_histograms,
+)
+
+
+def _rally_data(n: int = 400):
+    rng = np.random.default_rng(5)
+    y = (rng.random(n) < 0.25).astype(int)
+    probs = np.vstack([np.clip(0.5 * y + rng.normal(0.25, 0.15, n), 0, 1), np.round(rng.random(n), 1)])
+    return y, probs
+
+
+def test_calibration_bins_match_sklearn_quantile_curve():
+    y, probs = _rally_data()
+
+    bins = calibration_bins(y, probs, ["good", "coarse"])
+
+    for model, prob in zip(["good", "coarse"], probs):
+        frac_pos, mean_pred = calibration_curve(y, prob, n_bins=10, strategy="quantile")
+        rows = bins[bins["model"] == model]
+        np.testing.assert_allclose(rows["frac_pos"], frac_pos)
+        np.testing.assert_allclose(rows["mean_pred"], mean_pred)
+        assert rows["count"].sum() == len(y)
+
+
+def test_curve_points_lie_on_sklearn_curves_and_are_thinned():
+    y, probs = _rally_data()
+
+    points = curve_points(y, probs, ["good", "coarse"], max_points=50)
+
+    good = points[points["model"] == "good"]
+    assert len(good[good["curve"] == "pr"]) <= 50
+    precision, recall, thresholds = precision_recall_curve(y, probs[0])
+    pr = good[good["curve"] == "pr"]
+    lookup = dict(zip(thresholds, zip(recall[:-1], precision[:-1])))
+    for threshold, x, y_value in pr[["threshold", "x", "y"]].itertuples(index=False):
+        assert np.allclose(lookup[threshold], (x, y_value))
+
+    coarse_roc = points[(points["model"] == "coarse") & (points["curve"] == "roc")]
+    fpr, tpr, _ = roc_curve(y, probs[1], drop_intermediate=False)
+    np.testing.assert_allclose(coarse_roc["x"], fpr)
+    np.testing.assert_allclose(coarse_roc["y"], tpr)
+
+
+def test_residual_histograms_share_edges_and_count_every_row():
+    rng = np.random.default_rng(0)
+    y = rng.normal(50, 5, 300)
+    preds = np.vstack([y + rng.normal(0, 1, 300), y + rng.normal(0, 4, 300)])
+
+    hist = residual_histograms(y, preds, ["a", "b"], n_bins=20)
+
+    assert hist.groupby("model")["count"].sum().tolist() == [300, 300]
+    edges = hist.groupby("model")["bin_left"].apply(list)
+    assert edges["a"] == edges["b"]
+
+
+def test_expected_calibration_error_weights_bins_by_count():
+    bins = pd.DataFrame(
+        {
+            "model": ["m", "m"],
+            "bin": [0, 1],
+            "mean_pred": [0.1, 0.8],
+            "frac_pos": [0.2, 0.8],
+            "count": [30, 10],
+        }
+    )
+
+    assert np.isclose(expected_calibration_error(bins)["m"], 0.075)
@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from time_copilot_demo import pipeline
+from time_copilot_demo.backtest import walk_forward_folds
+from time_copilot_demo.pipeline import _build_supervised_frame, run_market_benchmark, synthetic_pjm_like
+from time_copilot_demo.tuning import (
+    TUNED_PARAMS_FILE,
+    load_tuned_params,
+    sample_candidates,
+    successive_halving,
+)
+
+
+def test_sample_candidates_start_with_defaults_and_are_distinct():
+    candidates = sample_candidates("forecast", "lear", 9)
+
+    assert candidates[0] == {"alpha": 0.001, "l1_ratio": 0.9}
+    assert len(candidates) == 9
+    assert len({json.dumps(c, sort_keys=True) for c in candidates}) == 9
+
+
+def test_successive_halving_drops_losers_each_rung():
+    frame, feature_cols = _build_supervised_frame(synthetic_pjm_like(24 * 60), horizon=24)
+    folds = walk_forward_folds(frame["timestamp"], n_folds=2, gap=24)
+
+    best, trials = successive_halving(
+        "forecast", "lear", frame[feature_cols], frame["target_price"], folds, n_candidates=9, eta=3
+    )
+
+    assert trials.groupby("rung").size().tolist() == [9, 3, 1]
+    assert trials["train_fraction"].max() == 1.0
+    assert json.dumps(best, sort_keys=True) == trials[trials["rung"] == 2]["params"].item()
+
+
+def test_tuned_params_are_saved_and_reused_without_searching(tmp_path: Path, monkeypatch):
+    df = synthetic_pjm_like(24 * 60)
+    kwargs = dict(market="PJM", df=df, artifacts_dir=tmp_path, forecast_models=["naive", "lear"], rally_models=["logreg"])
+
+    champions = run_market_benchmark(**kwargs, tune=True)
+
+    tuned = load_tuned_params(tmp_path / "PJM")
+    assert set(tuned["forecast"]) == {"lear"} and set(tuned["rally"]) == {"logreg"}
+    assert champions["tuned_params"]["rally"] == tuned["rally"]["logreg"]["params"]
+
+    def no_search(*args, **kwargs):
+        raise AssertionError("tuned params should be reused")
+
+    monkeypatch.setattr(pipeline, "tune_models", no_search)
+    again = run_market_benchmark(**kwargs, tune=True)
+    assert again["tuned_params"] == champions["tuned_params"]
+
+
+def test_stale_tuned_params_are_ignored(tmp_path: Path):
+    entry = {"params": {"alpha": 0.1}, "metric": "smape", "score": 1.0, "n_trials": 1, "space": "old"}
+    (tmp_path / TUNED_PARAMS_FILE).write_text(json.dumps({"forecast": {"lear": entry}}), encoding="utf-8")
+
+    assert load_tuned_params(tmp_path) == {"forecast": {}, "rally": {}}
+
+
+def test_successive_halving_rejects_eta_below_two():
+    with pytest.raises(ValueError):
+        successive_halving("forecast", "lear", None, None, [], eta=1)